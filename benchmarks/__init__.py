@@ -0,0 +1 @@
+"""Offline benchmarks: a mock Riot API server, recorded fixtures and a stub LLM."""
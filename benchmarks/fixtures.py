@@ -0,0 +1,193 @@
+"""Recorded and synthetic match payloads replayed by the mock Riot server.
+
+Record real payloads once with a live key::
+
+    python -m benchmarks.fixtures record "Name#TAG" --count 20
+
+Without recorded fixtures, synthetic payloads with the match-v5 shape are
+generated instead.
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+
+from lol_coach.record_schema import GAME_RECORD_FIELDS
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+BENCH_PUUID = "bench-player-puuid"
+POSITIONS = ("TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY")
+
+
+def _synthetic_value(kind: str, rng: random.Random):
+    if kind == "bool":
+        return rng.random() < 0.5
+    if kind == "float":
+        return rng.random() * 10
+    if kind == "str":
+        return f"Value{rng.randint(0, 20)}"
+    return rng.randint(0, 5000)
+
+
+def synthetic_match(seed: int, duration: int = 1800) -> dict:
+    """Return a match-v5 payload with every field the record schema reads; BENCH_PUUID is participant 1."""
+    rng = random.Random(seed)
+    participants = []
+    for team_index, team_id in enumerate((100, 200)):
+        for slot, position in enumerate(POSITIONS):
+            participant_id = team_index * 5 + slot + 1
+            participant: dict = {"challenges": {}}
+            for spec in GAME_RECORD_FIELDS:
+                if not spec.source:
+                    continue
+                scope, _, key = spec.source.rpartition(".")
+                target = participant["challenges"] if scope == "challenges" else participant
+                target[key] = _synthetic_value(spec.column_kind, rng)
+            participant.update(
+                totalMinionsKilled=rng.randint(0, 300),
+                neutralMinionsKilled=rng.randint(0, 150),
+                participantId=participant_id,
+                puuid=BENCH_PUUID if participant_id == 1 else f"puuid-{seed}-{participant_id}",
+                teamId=team_id,
+                teamPosition=position,
+                championName=f"Champion{rng.randint(0, 160)}",
+                win=team_id == 100,
+            )
+            participants.append(participant)
+    return {
+        "metadata": {"matchId": f"SYNTH_{seed}", "participants": [p["puuid"] for p in participants]},
+        "info": {
+            "gameDuration": duration,
+            "gameStartTimestamp": 1_700_000_000_000 + seed * 3_600_000,
+            "gameVersion": "14.3.555.1234",
+            "queueId": 420,
+            "participants": participants,
+        },
+    }
+
+
+def synthetic_timeline(match: dict, seed: int) -> dict:
+    """Return a match-v5 timeline payload with one frame per minute of *match*."""
+    rng = random.Random(seed)
+    participants = match["info"]["participants"]
+    frames = []
+    for minute in range(match["info"]["gameDuration"] // 60 + 1):
+        frames.append(
+            {
+                "timestamp": minute * 60_000,
+                "events": [{"type": "ITEM_PURCHASED", "timestamp": minute * 60_000}] * 8,
+                "participantFrames": {
+                    str(p["participantId"]): {
+                        "participantId": p["participantId"],
+                        "totalGold": 500 + minute * rng.randint(250, 450),
+                        "xp": minute * rng.randint(300, 500),
+                        "minionsKilled": minute * rng.randint(4, 9),
+                        "jungleMinionsKilled": rng.randint(0, minute + 1),
+                        "position": {"x": rng.randint(0, 14_800), "y": rng.randint(0, 14_800)},
+                    }
+                    for p in participants
+                },
+            }
+        )
+    return {
+        "metadata": match["metadata"],
+        "info": {
+            "frameInterval": 60_000,
+            "frames": frames,
+            "participants": [{"participantId": p["participantId"], "puuid": p["puuid"]} for p in participants],
+        },
+    }
+
+
+class FixtureSet:
+    """Match and timeline templates replayed under any requested match ID."""
+
+    def __init__(self, matches: list[dict], timelines: list[dict | None], puuid: str) -> None:
+        if not matches:
+            raise ValueError("A fixture set needs at least one match")
+        self.matches = matches
+        self.timelines = timelines
+        self.puuid = puuid
+
+    def __len__(self) -> int:
+        return len(self.matches)
+
+    def match(self, index: int, match_id: str) -> dict:
+        template = self.matches[index % len(self.matches)]
+        return {**template, "metadata": {**template["metadata"], "matchId": match_id}}
+
+    def timeline(self, index: int, match_id: str) -> dict | None:
+        template = self.timelines[index % len(self.timelines)]
+        if template is None:
+            return None
+        return {**template, "metadata": {**template["metadata"], "matchId": match_id}}
+
+
+def synthetic_fixtures(count: int = 8) -> FixtureSet:
+    matches = [synthetic_match(seed, duration=1500 + seed * 60) for seed in range(count)]
+    timelines = [synthetic_timeline(match, seed) for seed, match in enumerate(matches)]
+    return FixtureSet(matches, timelines, BENCH_PUUID)
+
+
+def load_fixtures(path: str = FIXTURE_DIR) -> FixtureSet:
+    """Load recorded fixtures from *path*, falling back to synthetic ones when there are none."""
+    manifest_path = os.path.join(path, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return synthetic_fixtures()
+    with open(manifest_path, "r", encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    matches: list[dict] = []
+    timelines: list[dict | None] = []
+    for match_path in sorted(glob.glob(os.path.join(path, "*.match.json"))):
+        with open(match_path, "r", encoding="utf-8") as fh:
+            matches.append(json.load(fh))
+        timeline_path = match_path.replace(".match.json", ".timeline.json")
+        if os.path.exists(timeline_path):
+            with open(timeline_path, "r", encoding="utf-8") as fh:
+                timelines.append(json.load(fh))
+        else:
+            timelines.append(None)
+    return FixtureSet(matches, timelines, manifest["puuid"])
+
+
+def record_fixtures(riot_id: str, count: int, path: str = FIXTURE_DIR, region_routing: str = "europe") -> None:
+    """Download *count* recent matches (and timelines) of *riot_id* from the live API into *path*."""
+    from lol_coach.config import get_required_env_var, load_env
+    from lol_coach.riot_api import RiotClient
+
+    load_env()
+    game_name, _, tag_line = riot_id.rpartition("#")
+    os.makedirs(path, exist_ok=True)
+    with RiotClient(get_required_env_var("RIOT_API_KEY"), region_routing=region_routing) as client:
+        puuid = client.get_puuid(game_name, tag_line)
+        for match_id in client.get_match_ids(puuid, total_games=count):
+            match = client.fetch_match(match_id)
+            if not match:
+                continue
+            response = client.get(f"/lol/match/v5/matches/{match_id}/timeline", "timeline-by-match-id")
+            with open(os.path.join(path, f"{match_id}.match.json"), "w", encoding="utf-8") as fh:
+                json.dump(match, fh)
+            if response.status_code == 200:
+                with open(os.path.join(path, f"{match_id}.timeline.json"), "w", encoding="utf-8") as fh:
+                    fh.write(response.text)
+            print(f"Recorded {match_id}")
+    with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as fh:
+        json.dump({"riot_id": riot_id, "puuid": puuid}, fh)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record match fixtures for the offline benchmarks.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    record = subcommands.add_parser("record", help="download recent matches of a Riot ID")
+    record.add_argument("riot_id", help="Name#TAG")
+    record.add_argument("--count", type=int, default=20)
+    record.add_argument("--path", default=FIXTURE_DIR)
+    record.add_argument("--region", default="europe")
+    args = parser.parse_args()
+    record_fixtures(args.riot_id, args.count, args.path, args.region)
+
+
+if __name__ == "__main__":
+    main()
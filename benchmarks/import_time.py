@@ -0,0 +1,78 @@
+"""Import-time benchmark for the lol_coach package and its entry points.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --repeat 10 lol_coach.riot_api lol_coach.prompting
+
+Each target is imported in a fresh interpreter. The report shows the median
+wall time of the import and which heavy dependencies it loaded.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_TARGETS = (
+    "lol_coach",
+    "lol_coach.config",
+    "lol_coach.text_utils",
+    "lol_coach.riot_api",
+    "lol_coach.export_service",
+    "lol_coach.prompting",
+    "lol_coach.prompt_compaction",
+)
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "py_toon_format", "dotenv", "google.generativeai", "discord")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(target: str, repeat: int = 5) -> dict:
+    """Import *target* in *repeat* fresh interpreters; return the median time and loaded heavy modules."""
+    samples = []
+    heavy: list[str] = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(target=target, heavy=HEAVY_MODULES)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if completed.returncode != 0:
+            return {"target": target, "error": completed.stderr.strip().splitlines()[-1]}
+        result = json.loads(completed.stdout)
+        samples.append(result["seconds"])
+        heavy = result["heavy"]
+    return {"target": target, "median_ms": round(statistics.median(samples) * 1000, 1), "heavy": heavy}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the import time of lol_coach modules.")
+    parser.add_argument("targets", nargs="*", default=list(DEFAULT_TARGETS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    results = [measure(target, args.repeat) for target in args.targets]
+    print(f"{'module':<32}{'median ms':>10}  heavy dependencies loaded")
+    for result in results:
+        if "error" in result:
+            print(f"{result['target']:<32}{'error':>10}  {result['error']}")
+        else:
+            print(f"{result['target']:<32}{result['median_ms']:>10.1f}  {', '.join(result['heavy']) or '-'}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
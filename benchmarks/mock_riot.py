@@ -0,0 +1,195 @@
+"""Local stand-in for the Riot API used by the offline benchmarks.
+
+The server replays fixture payloads under any match ID, advertises and
+enforces application and method rate limits through the usual headers,
+answers 429 with Retry-After when a limit is exceeded, can inject random
+429s, and adds a fixed latency to every response. It runs in its own
+process so its work does not compete with the measured client for the GIL.
+"""
+
+import gzip
+import json
+import multiprocessing
+import random
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lol_coach.rate_limit import RateWindow, parse_rate_limit_header
+
+from .fixtures import FIXTURE_DIR, load_fixtures
+
+_ROUTES = (
+    (re.compile(r"^/riot/account/v1/accounts/by-riot-id/[^/]+/[^/]+$"), "account-by-riot-id"),
+    (re.compile(r"^/lol/match/v5/matches/by-puuid/[^/]+/ids$"), "match-ids-by-puuid"),
+    (re.compile(r"^/lol/match/v5/matches/[^/]+/timeline$"), "timeline-by-match-id"),
+    (re.compile(r"^/lol/match/v5/matches/[^/]+$"), "match-by-id"),
+)
+
+
+@dataclass
+class MockRiotConfig:
+    total_matches: int = 300
+    app_limits: str = "5000:10,300000:600"
+    method_limits: dict[str, str] = field(
+        default_factory=lambda: {
+            "account-by-riot-id": "1000:60",
+            "match-ids-by-puuid": "2000:10",
+            "match-by-id": "2000:10",
+            "timeline-by-match-id": "2000:10",
+        }
+    )
+    latency: float = 0.02
+    throttle_rate: float = 0.0
+    retry_after: int = 1
+    fixture_path: str = FIXTURE_DIR
+    seed: int = 0
+
+
+class _Limits:
+    def __init__(self, config: MockRiotConfig) -> None:
+        self._lock = threading.Lock()
+        self._app = [RateWindow(count, seconds) for count, seconds in parse_rate_limit_header(config.app_limits)]
+        self._methods = {
+            method: [RateWindow(count, seconds) for count, seconds in parse_rate_limit_header(limits)]
+            for method, limits in config.method_limits.items()
+        }
+
+    def check(self, method: str) -> tuple[str | None, float]:
+        """Record a request; return (exceeded scope or None, seconds until it would fit)."""
+        with self._lock:
+            now = time.monotonic()
+            for scope, windows in (("application", self._app), ("method", self._methods.get(method, []))):
+                wait = max((window.wait_time(now) for window in windows), default=0.0)
+                if wait > 0:
+                    return scope, wait
+            for window in self._app + self._methods.get(method, []):
+                window.record(now)
+            return None, 0.0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_MockServer"
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers: dict | None = None) -> None:
+        if body and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=1)
+            headers = {**(headers or {}), "Content-Encoding": "gzip"}
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        path, _, query = self.path.partition("?")
+        if path == "/__stats":
+            self._send(200, json.dumps(self.server.stats).encode())
+            return
+        method = next((name for pattern, name in _ROUTES if pattern.match(path)), None)
+        if method is None:
+            self._send(404, b'{"status":{"message":"Not found","status_code":404}}')
+            return
+
+        config = self.server.config
+        time.sleep(config.latency)
+        self.server.count("requests")
+        headers = {"X-App-Rate-Limit": config.app_limits}
+        if method in config.method_limits:
+            headers["X-Method-Rate-Limit"] = config.method_limits[method]
+
+        scope, wait = self.server.limits.check(method)
+        if scope is None and self.server.rng.random() < config.throttle_rate:
+            scope, wait = "service", config.retry_after
+        if scope is not None:
+            self.server.count("throttled")
+            headers["X-Rate-Limit-Type"] = scope
+            headers["Retry-After"] = str(max(1, int(wait + 0.999)))
+            self._send(429, b'{"status":{"message":"Rate limit exceeded","status_code":429}}', headers)
+            return
+
+        self._send(200, json.dumps(self._payload(method, path, query)).encode(), headers)
+
+    def _payload(self, method: str, path: str, query: str):
+        fixtures = self.server.fixtures
+        if method == "account-by-riot-id":
+            return {"puuid": fixtures.puuid, "gameName": "Bench", "tagLine": "MOCK"}
+        if method == "match-ids-by-puuid":
+            params = dict(part.partition("=")[::2] for part in query.split("&") if part)
+            start = int(params.get("start", 0))
+            count = int(params.get("count", 20))
+            end = min(start + count, self.server.config.total_matches)
+            # Newest first, like the real endpoint.
+            return [f"MOCK_{self.server.config.total_matches - i}" for i in range(start, end)]
+        match_id = path.split("/")[5]
+        index = int(match_id.rpartition("_")[2]) if match_id.rpartition("_")[2].isdigit() else 0
+        if method == "timeline-by-match-id":
+            return fixtures.timeline(index, match_id)
+        return fixtures.match(index, match_id)
+
+
+class _MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, config: MockRiotConfig) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.config = config
+        self.fixtures = load_fixtures(config.fixture_path)
+        self.limits = _Limits(config)
+        self.rng = random.Random(config.seed)
+        self.stats = {"requests": 0, "throttled": 0}
+        self._stats_lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+
+def _serve(config: dict, ready) -> None:
+    server = _MockServer(MockRiotConfig(**config))
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+class MockRiotServer:
+    """Run the stand-in Riot API in a child process; use as a context manager."""
+
+    def __init__(self, config: MockRiotConfig | None = None) -> None:
+        self.config = config or MockRiotConfig()
+        self.base_url = ""
+        self._process: multiprocessing.Process | None = None
+
+    def start(self) -> str:
+        ready = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target=_serve, args=(asdict(self.config), ready), daemon=True)
+        self._process.start()
+        self.base_url = f"http://127.0.0.1:{ready.get(timeout=30)}"
+        return self.base_url
+
+    def stats(self) -> dict:
+        """Return the number of requests served and throttled so far."""
+        from urllib.request import urlopen
+
+        with urlopen(f"{self.base_url}/__stats", timeout=5) as response:
+            return json.loads(response.read())
+
+    def stop(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    def __enter__(self) -> "MockRiotServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,275 @@
+"""Offline benchmarks of the match pipeline against the local mock Riot server.
+
+    python -m benchmarks.run                            # every benchmark at 20, 300 and 10000 matches
+    python -m benchmarks.run --scales 20,300 --output results.json
+    python -m benchmarks.run --compare results.json     # exit 1 when throughput regressed
+
+No Riot or Gemini key is needed: the Riot API is replaced by
+benchmarks.mock_riot and Gemini by benchmarks.stub_llm.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+
+from lol_coach.export_service import collect_games_data, export_records
+from lol_coach.lobby import LobbyIndex, build_lobby_records
+from lol_coach.match_processing import build_game_record
+from lol_coach.prompt_compaction import estimate_tokens
+from lol_coach.prompting import build_prompt
+from lol_coach.rate_limit import RateLimiter
+from lol_coach.riot_api import RiotClient
+from lol_coach.text_utils import TextChunker
+
+from .fixtures import FIXTURE_DIR, FixtureSet, load_fixtures
+from .mock_riot import MockRiotConfig, MockRiotServer
+from .stub_llm import StubModel
+
+DEFAULT_SCALES = (20, 300, 10_000)
+PROMPT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prompt_lol.md")
+BENCHMARKS = ("get_match_ids", "collect_games_data", "collect_with_timelines", "build_game_record", "writers", "coach")
+
+
+@dataclass
+class Result:
+    name: str
+    scale: int
+    seconds: float
+    items: int
+    latencies: list[float] = field(default_factory=list, repr=False)
+    extra: dict = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.seconds if self.seconds else 0.0
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        if len(self.latencies) == 1:
+            return self.latencies[0]
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[int(q) - 1]
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        del data["latencies"]
+        data.update(
+            throughput=round(self.throughput, 2),
+            p50_ms=round(self.percentile(50) * 1000, 2),
+            p95_ms=round(self.percentile(95) * 1000, 2),
+        )
+        return data
+
+
+class TimedRiotClient(RiotClient):
+    """RiotClient recording the wall time of every request, rate-limit waits included."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.latencies: list[float] = []
+
+    def get(self, path: str, method: str, region_routing: str | None = None):
+        start = time.perf_counter()
+        try:
+            return super().get(path, method, region_routing)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+
+def make_client(server: MockRiotServer, workers: int) -> TimedRiotClient:
+    return TimedRiotClient("bench-key", limiter=RateLimiter(), max_workers=workers, base_url=server.base_url)
+
+
+def bench_get_match_ids(server: MockRiotServer, fixtures: FixtureSet, scale: int, workers: int) -> Result:
+    with make_client(server, workers) as client:
+        start = time.perf_counter()
+        match_ids = client.get_match_ids(fixtures.puuid, total_games=scale)
+        seconds = time.perf_counter() - start
+    return Result("get_match_ids", scale, seconds, len(match_ids), client.latencies)
+
+
+def bench_collect(
+    server: MockRiotServer, fixtures: FixtureSet, scale: int, workers: int, with_timelines: bool = False
+) -> Result:
+    with make_client(server, workers) as client:
+        match_ids = client.get_match_ids(fixtures.puuid, total_games=scale)
+        client.latencies.clear()
+        start = time.perf_counter()
+        games = collect_games_data(match_ids, fixtures.puuid, client, with_timelines=with_timelines)
+        seconds = time.perf_counter() - start
+    name = "collect_with_timelines" if with_timelines else "collect_games_data"
+    return Result(name, scale, seconds, len(games), client.latencies)
+
+
+def bench_build_game_record(fixtures: FixtureSet, scale: int) -> Result:
+    participants = []
+    for index in range(scale):
+        info = fixtures.match(index, f"MOCK_{index}")["info"]
+        participants.extend((participant, info["gameDuration"]) for participant in info["participants"])
+    start = time.perf_counter()
+    for participant, duration in participants:
+        build_game_record(participant, duration)
+    seconds = time.perf_counter() - start
+    return Result("build_game_record", scale, seconds, len(participants))
+
+
+def bench_writers(fixtures: FixtureSet, scale: int) -> list[Result]:
+    records = []
+    for index in range(scale):
+        match_id = f"MOCK_{index}"
+        lobby = build_lobby_records(match_id, fixtures.match(index, match_id)["info"])
+        records.append(lobby[fixtures.puuid])
+
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for fmt in ("csv", "ndjson", "parquet"):
+                start = time.perf_counter()
+                count = export_records(iter(records), "Bench", "MOCK", (fmt,), dataset_root="dataset")
+                results.append(Result(f"writer_{fmt}", scale, time.perf_counter() - start, count))
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def bench_coach(server: MockRiotServer, fixtures: FixtureSet, scale: int, workers: int) -> Result:
+    """Time the /coach pipeline: Riot ID to the last Discord-sized chunk of a streamed answer."""
+    model = StubModel()
+    with make_client(server, workers) as client:
+        start = time.perf_counter()
+        puuid = client.get_puuid("Bench", "MOCK")
+        match_ids = client.get_match_ids(puuid, total_games=scale)
+        games = collect_games_data(match_ids, puuid, client, LobbyIndex())
+        prompt = build_prompt(games, PROMPT_PATH)
+        prompt_ready = time.perf_counter() - start
+
+        chunker = TextChunker()
+        first_chunk = None
+        chunks = 0
+        for part in model.generate_content(prompt, stream=True):
+            ready = chunker.feed(part.text)
+            if ready and first_chunk is None:
+                first_chunk = time.perf_counter() - start
+            chunks += len(ready)
+        chunks += len(chunker.flush())
+        seconds = time.perf_counter() - start
+    return Result(
+        "coach",
+        scale,
+        seconds,
+        len(games),
+        client.latencies,
+        extra={
+            "prompt_ready_s": round(prompt_ready, 3),
+            "first_chunk_s": round(first_chunk if first_chunk is not None else seconds, 3),
+            "prompt_tokens": estimate_tokens(prompt),
+            "chunks": chunks,
+        },
+    )
+
+
+def run_benchmarks(args: argparse.Namespace) -> list[Result]:
+    fixtures = load_fixtures(args.fixtures)
+    selected = set(args.only.split(",")) if args.only else set(BENCHMARKS)
+    results: list[Result] = []
+    for scale in args.scales:
+        config = MockRiotConfig(
+            total_matches=scale,
+            app_limits=args.app_limits,
+            latency=args.latency,
+            throttle_rate=args.throttle_rate,
+            fixture_path=args.fixtures,
+        )
+        with MockRiotServer(config) as server:
+            if "get_match_ids" in selected:
+                results.append(bench_get_match_ids(server, fixtures, scale, args.workers))
+            if "collect_games_data" in selected:
+                results.append(bench_collect(server, fixtures, scale, args.workers))
+            if "collect_with_timelines" in selected:
+                results.append(bench_collect(server, fixtures, scale, args.workers, with_timelines=True))
+            if "coach" in selected:
+                results.append(bench_coach(server, fixtures, scale, args.workers))
+            stats = server.stats()
+        if "build_game_record" in selected:
+            results.append(bench_build_game_record(fixtures, scale))
+        if "writers" in selected:
+            results.extend(bench_writers(fixtures, scale))
+        print(f"scale {scale}: mock server served {stats['requests']} requests, throttled {stats['throttled']}")
+    return results
+
+
+def print_results(results: list[Result]) -> None:
+    print(f"{'benchmark':<24}{'scale':>7}{'seconds':>10}{'items/s':>12}{'p50 ms':>9}{'p95 ms':>9}  extra")
+    for result in results:
+        data = result.to_dict()
+        extra = " ".join(f"{key}={value}" for key, value in result.extra.items())
+        print(
+            f"{result.name:<24}{result.scale:>7}{result.seconds:>10.3f}{data['throughput']:>12.1f}"
+            f"{data['p50_ms']:>9.1f}{data['p95_ms']:>9.1f}  {extra}"
+        )
+
+
+def compare_results(results: list[Result], baseline_path: str, tolerance: float) -> list[str]:
+    """Return a message for every benchmark whose throughput fell more than *tolerance* below the baseline."""
+    with open(baseline_path, "r", encoding="utf-8") as fh:
+        baseline = {(entry["name"], entry["scale"]): entry for entry in json.load(fh)["results"]}
+    regressions = []
+    for result in results:
+        previous = baseline.get((result.name, result.scale))
+        if previous is None or not previous["throughput"]:
+            continue
+        change = result.throughput / previous["throughput"] - 1
+        if change < -tolerance:
+            regressions.append(
+                f"{result.name} @ {result.scale}: {result.throughput:.1f}/s vs {previous['throughput']:.1f}/s "
+                f"({change:+.0%})"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the offline pipeline benchmarks.")
+    parser.add_argument(
+        "--scales",
+        type=lambda value: [int(part) for part in value.split(",")],
+        default=list(DEFAULT_SCALES),
+        help="comma-separated match counts (default: 20,300,10000)",
+    )
+    parser.add_argument("--only", help=f"comma-separated subset of: {','.join(BENCHMARKS)}")
+    parser.add_argument("--workers", type=int, default=8, help="RiotClient fetch workers")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock server latency per request, seconds")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered 429")
+    parser.add_argument(
+        "--app-limits",
+        default=MockRiotConfig.app_limits,
+        help='advertised application limits, e.g. "20:1,100:120" for a development key',
+    )
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="recorded fixtures (synthetic when absent)")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --output run")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed throughput drop vs the baseline")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"args": vars(args), "results": [result.to_dict() for result in results]}, fh, indent=2)
+    if args.compare:
+        regressions = compare_results(results, args.compare, args.tolerance)
+        for message in regressions:
+            print(f"Regression: {message}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Stand-in for the Gemini model with a fixed answer and simulated generation speed."""
+
+import time
+
+_PARAGRAPH = (
+    "**Laning:** Your CS per minute trails the role average, mostly in games longer than thirty "
+    "minutes; prioritise side-lane waves after the first tower falls.\n"
+    "**Vision:** Control ward purchases stay low in losses, so contest river vision before objectives.\n"
+)
+
+
+class _Part:
+    __slots__ = ("text",)
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+class StubModel:
+    """Mimics ``GenerativeModel.generate_content`` (optionally streamed) without any network call.
+
+    The answer is *answer_chars* long and is produced after *first_token_latency*
+    seconds, then at *chars_per_second*. Prompt sizes are recorded in ``prompts``.
+    """
+
+    def __init__(
+        self,
+        first_token_latency: float = 0.5,
+        chars_per_second: float = 2000.0,
+        answer_chars: int = 6000,
+        part_chars: int = 200,
+    ) -> None:
+        self.first_token_latency = first_token_latency
+        self.chars_per_second = chars_per_second
+        self.answer = (_PARAGRAPH * (answer_chars // len(_PARAGRAPH) + 1))[:answer_chars]
+        self.part_chars = part_chars
+        self.prompts: list[int] = []
+
+    def _parts(self):
+        time.sleep(self.first_token_latency)
+        for start in range(0, len(self.answer), self.part_chars):
+            part = self.answer[start : start + self.part_chars]
+            time.sleep(len(part) / self.chars_per_second)
+            yield _Part(part)
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        self.prompts.append(len(prompt))
+        if stream:
+            return self._parts()
+        return _Part("".join(part.text for part in self._parts()))
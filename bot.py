@@ -1,245 +1,265 @@
 import os
-import json
-import time
 import asyncio
-import requests
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
 import discord
 from discord import app_commands
 from dotenv import load_dotenv
 import google.generativeai as genai
 
+from lol_coach.account_cache import DEFAULT_PUUID_CACHE_PATH, PuuidCache
+from lol_coach.export_service import collect_games_data
+from lol_coach.jobs import JobRejectedError, JobScheduler
+from lol_coach.lobby import LobbyIndex
+from lol_coach.match_cache import DEFAULT_CACHE_PATH, open_match_cache
+from lol_coach.match_filter import QUEUE_PRESETS, MatchFilter, parse_match_filter
+from lol_coach.metrics import METRICS, serve_metrics
+from lol_coach.percentiles import DEFAULT_PERCENTILE_PATH, open_percentile_index
+from lol_coach.prefetch import DEFAULT_PREFETCH_PATH, Prefetcher, RequestBudget
+from lol_coach.prompting import build_prompt, prompt_version
+from lol_coach.request_cache import SingleFlight, TTLCache, match_set_digest
+from lol_coach.riot_api import DEFAULT_LIMITER, RiotClient
+from lol_coach.shared_rate_limit import DEFAULT_RATE_LIMIT_PATH, open_rate_limiter
+from lol_coach.stats_store import DEFAULT_STATS_PATH, open_stats_store
+from lol_coach.text_utils import TextChunker, chunk_text
+
 load_dotenv()
 
+logger = logging.getLogger("lol_coach.bot")
+
 DISCORD_BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN", "")
 RIOT_API_KEY = os.getenv("RIOT_API_KEY", "")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 DEFAULT_GAME_NAME = os.getenv("DEFAULT_GAME_NAME", "")
 DEFAULT_TAG_LINE = os.getenv("DEFAULT_TAG_LINE", "")
 TOTAL_GAMES = int(os.getenv("TOTAL_GAMES", "20"))
+# Queue preset analysed when /coach is called without a queue option (see lol_coach.match_filter)
+COACH_QUEUES = os.getenv("COACH_QUEUES", "all")
 REGION_ROUTING = os.getenv("REGION_ROUTING", "europe")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 PROMPT_PATH = os.getenv("PROMPT_PATH", "prompt_lol.md")
-
-HEADERS = {"X-Riot-Token": RIOT_API_KEY}
-
-
-def read_prompt_template() -> str:
-    if not os.path.exists(PROMPT_PATH):
-        raise FileNotFoundError(f"Prompt file not found: {PROMPT_PATH}")
-    with open(PROMPT_PATH, "r", encoding="utf-8") as f:
-        return f.read()
-
-
-def build_prompt(games_data: list[dict]) -> str:
-    template = read_prompt_template()
-    data_text = json.dumps(games_data, ensure_ascii=True)
-    marker = "[DATA]"
-    if marker in template:
-        return template.replace(marker, data_text)
-    return f"{template}\n\n{data_text}"
-
-
-def get_account_puuid(game_name: str, tag_line: str) -> str:
-    url = (
-        f"https://{REGION_ROUTING}.api.riotgames.com/riot/account/v1/accounts"
-        f"/by-riot-id/{game_name}/{tag_line}"
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "4000"))
+MAX_FETCH_WORKERS = int(os.getenv("MAX_FETCH_WORKERS", "8"))
+RATE_LIMIT_PATH = os.getenv("RATE_LIMIT_PATH", DEFAULT_RATE_LIMIT_PATH)
+MATCH_CACHE_PATH = os.getenv("MATCH_CACHE_PATH", DEFAULT_CACHE_PATH)
+MATCH_CACHE_MAX_MB = int(os.getenv("MATCH_CACHE_MAX_MB", "512"))
+LOBBY_INDEX_MAX_MATCHES = int(os.getenv("LOBBY_INDEX_MAX_MATCHES", "1000"))
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "128"))
+ANALYSIS_CACHE_TTL_MINUTES = int(os.getenv("ANALYSIS_CACHE_TTL_MINUTES", "360"))
+COACH_WORKERS = int(os.getenv("COACH_WORKERS", "2"))
+COACH_MAX_QUEUE = int(os.getenv("COACH_MAX_QUEUE", "20"))
+COACH_MAX_PER_USER = int(os.getenv("COACH_MAX_PER_USER", "1"))
+PUUID_CACHE_PATH = os.getenv("PUUID_CACHE_PATH", DEFAULT_PUUID_CACHE_PATH)
+PUUID_CACHE_TTL_HOURS = int(os.getenv("PUUID_CACHE_TTL_HOURS", "720"))
+STATS_DB_PATH = os.getenv("STATS_DB_PATH", DEFAULT_STATS_PATH)
+STATS_HISTORY_DAYS = int(os.getenv("STATS_HISTORY_DAYS", "30"))
+PERCENTILE_INDEX_PATH = os.getenv("PERCENTILE_INDEX_PATH", DEFAULT_PERCENTILE_PATH)
+# Background prefetching for players who opted in with /prefetch (0 disables it)
+PREFETCH_INTERVAL_MINUTES = int(os.getenv("PREFETCH_INTERVAL_MINUTES", "0"))
+PREFETCH_MAX_INTERVAL_HOURS = int(os.getenv("PREFETCH_MAX_INTERVAL_HOURS", "24"))
+PREFETCH_BUDGET_PER_HOUR = int(os.getenv("PREFETCH_BUDGET_PER_HOUR", "300"))
+PREFETCH_MAX_PLAYERS = int(os.getenv("PREFETCH_MAX_PLAYERS", "50"))
+PREFETCH_PATH = os.getenv("PREFETCH_PATH", DEFAULT_PREFETCH_PATH)
+METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+RIOT_CLIENT = RiotClient(
+    RIOT_API_KEY,
+    region_routing=REGION_ROUTING,
+    limiter=open_rate_limiter(RATE_LIMIT_PATH, "interactive"),
+    cache=open_match_cache(MATCH_CACHE_PATH, MATCH_CACHE_MAX_MB),
+    puuid_cache=PuuidCache(ttl=PUUID_CACHE_TTL_HOURS * 3600, path=PUUID_CACHE_PATH or None),
+    timeout=30,
+    max_workers=MAX_FETCH_WORKERS,
+)
+# Every analysed game is kept so the prompt can compare recent form with the period before.
+STATS_STORE = open_stats_store(STATS_DB_PATH)
+# Every extracted lobby feeds per champion x role distributions that players are ranked against.
+PERCENTILE_INDEX = open_percentile_index(PERCENTILE_INDEX_PATH)
+# Lobbies extracted for one player also answer later /coach calls for the other nine.
+LOBBY_INDEX = LobbyIndex(max_matches=LOBBY_INDEX_MAX_MATCHES)
+# Registered players' new matches are fetched ahead of /coach at the lowest rate-limit priority,
+# through a second client sharing the caches and capped to its own hourly request budget.
+PREFETCHER: Prefetcher | None = None
+if PREFETCH_INTERVAL_MINUTES > 0:
+    _prefetch_budget = RequestBudget(
+        open_rate_limiter(RATE_LIMIT_PATH, "prefetch") or DEFAULT_LIMITER, PREFETCH_BUDGET_PER_HOUR
     )
-    response = requests.get(url, headers=HEADERS, timeout=30)
-    response.raise_for_status()
-    data = response.json()
-    return data["puuid"]
-
-
-def get_match_ids(puuid: str, total_games: int = 20) -> list[str]:
-    match_ids: list[str] = []
-    start = 0
-
-    while len(match_ids) < total_games:
-        url = (
-            f"https://{REGION_ROUTING}.api.riotgames.com/lol/match/v5/matches"
-            f"/by-puuid/{puuid}/ids?start={start}&count=100"
+    PREFETCHER = Prefetcher(
+        RiotClient(
+            RIOT_API_KEY,
+            region_routing=REGION_ROUTING,
+            limiter=_prefetch_budget,
+            cache=RIOT_CLIENT.cache,
+            puuid_cache=RIOT_CLIENT.puuid_cache,
+            timeout=30,
+            max_workers=2,
+        ),
+        _prefetch_budget,
+        LOBBY_INDEX,
+        on_lobby=PERCENTILE_INDEX.add_lobby if PERCENTILE_INDEX is not None else None,
+        total_games=TOTAL_GAMES,
+        interval=PREFETCH_INTERVAL_MINUTES * 60,
+        max_interval=PREFETCH_MAX_INTERVAL_HOURS * 3600,
+        max_players=PREFETCH_MAX_PLAYERS,
+        path=PREFETCH_PATH or None,
+    )
+# Concurrent /coach calls for the same analysis share one job; finished ones are reused.
+ANALYSIS_JOBS: SingleFlight[str] = SingleFlight()
+ANALYSIS_CACHE: TTLCache[str] = TTLCache(
+    max_entries=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL_MINUTES * 60
+)
+
+
+class AnalysisError(Exception):
+    """Raised with a user-facing message when an analysis cannot be produced."""
+
+
+class ProgressReporter:
+    """Edits a deferred interaction response with the latest progress text, at most every *interval* seconds.
+
+    Call stop() before sending the first followup: that followup replaces the
+    deferred response, so a later progress edit would overwrite it.
+    """
+
+    def __init__(self, interaction: discord.Interaction, interval: float = 3.0) -> None:
+        self._interaction = interaction
+        self._interval = interval
+        self._text = ""
+        self._sent = ""
+        self._task: asyncio.Task | None = None
+        self._stopped = False
+        # Held during an edit, so stop() returns only once no edit is in flight.
+        self._editing = asyncio.Lock()
+
+    def update(self, text: str) -> None:
+        # Called from worker threads too: a single attribute store, picked up by the edit loop.
+        self._text = text
+
+    async def _edit_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            async with self._editing:
+                text = self._text
+                if self._stopped or not text or text == self._sent:
+                    continue
+                self._sent = text
+                try:
+                    await self._interaction.edit_original_response(content=text)
+                except discord.HTTPException as e:
+                    logger.debug("Progress edit failed: %s", e)
+
+    async def stop(self) -> None:
+        """Stop editing the response, waiting for an edit in flight to finish."""
+        if self._stopped:
+            return
+        self._stopped = True
+        async with self._editing:
+            if self._task is not None:
+                self._task.cancel()
+
+    async def __aenter__(self) -> "ProgressReporter":
+        self._task = asyncio.create_task(self._edit_loop())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+
+async def stream_generation(model, prompt: str, on_chunk: Callable[[str], Awaitable[None]]) -> str:
+    """Stream the model's answer, handing each Discord-sized chunk to *on_chunk* as soon as it fills."""
+    loop = asyncio.get_running_loop()
+    parts: asyncio.Queue[str | None] = asyncio.Queue()
+
+    def produce() -> None:
+        # Timed here rather than around the consumer, so Discord delivery is not counted as model time.
+        start = time.perf_counter()
+        first = True
+        try:
+            with METRICS.timer("llm"):
+                for part in model.generate_content(prompt, stream=True):
+                    if first:
+                        METRICS.observe("llm_first_token", time.perf_counter() - start)
+                        first = False
+                    loop.call_soon_threadsafe(parts.put_nowait, part.text)
+        finally:
+            loop.call_soon_threadsafe(parts.put_nowait, None)
+
+    producer = asyncio.create_task(asyncio.to_thread(produce))
+    chunker = TextChunker()
+    pieces: list[str] = []
+    while (part := await parts.get()) is not None:
+        pieces.append(part)
+        for chunk in chunker.feed(part):
+            await on_chunk(chunk)
+    await producer
+    for chunk in chunker.flush():
+        await on_chunk(chunk)
+    return "".join(pieces)
+
+
+async def run_analysis(
+    puuid: str,
+    match_ids: list[str],
+    progress: ProgressReporter,
+    on_chunk: Callable[[str], Awaitable[None]],
+    match_filter: MatchFilter | None = None,
+) -> str:
+    progress.update(f"Fetching {len(match_ids)} matches...")
+    try:
+        games_data = await asyncio.to_thread(
+            collect_games_data,
+            match_ids,
+            puuid,
+            RIOT_CLIENT,
+            LOBBY_INDEX,
+            lambda done, total: progress.update(f"Fetched {done}/{total} matches..."),
+            on_lobby=PERCENTILE_INDEX.add_lobby if PERCENTILE_INDEX is not None else None,
         )
-        response = requests.get(url, headers=HEADERS, timeout=30)
-        response.raise_for_status()
-        batch = response.json()
-        if not batch:
-            break
-        match_ids.extend(batch)
-        start += 100
-        time.sleep(1.2)
+    except Exception:
+        logger.exception("Collecting games failed for %s", puuid)
+        games_data = []
+    if match_filter:
+        games_data = list(match_filter.filter_records(games_data))
 
-    return match_ids[:total_games]
+    if not games_data:
+        raise AnalysisError("No games data found for this player.")
 
+    history = None
+    if STATS_STORE is not None:
+        try:
+            await asyncio.to_thread(STATS_STORE.add_records, puuid, games_data)
+            history = await asyncio.to_thread(STATS_STORE.compare_periods, puuid, STATS_HISTORY_DAYS)
+        except Exception:
+            logger.exception("Updating the stats store failed for %s", puuid)
 
-def fetch_match(match_id: str, retries: int = 3) -> dict | None:
-    url = f"https://{REGION_ROUTING}.api.riotgames.com/lol/match/v5/matches/{match_id}"
-    for attempt in range(retries):
+    percentiles = None
+    if PERCENTILE_INDEX is not None:
         try:
-            response = requests.get(url, headers=HEADERS, timeout=30)
-            if response.status_code == 429:
-                time.sleep(2 + attempt * 2)
-                continue
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.Timeout:
-            time.sleep(2 + attempt * 2)
-            continue
-        except requests.exceptions.RequestException:
-            if attempt == retries - 1:
-                return None
-            time.sleep(2 + attempt * 2)
-            continue
-    return None
-
-
-def extract_player_data(info: dict, puuid: str) -> dict | None:
-    duration = info.get("gameDuration", 0)
-    for p in info.get("participants", []):
-        if p.get("puuid") != puuid:
-            continue
-
-        kda = (p.get("kills", 0) + p.get("assists", 0)) / max(1, p.get("deaths", 0))
-        cs = p.get("totalMinionsKilled", 0) + p.get("neutralMinionsKilled", 0)
-        cs_per_min = cs / (duration / 60) if duration else 0
-
-        items = [p.get(f"item{i}", 0) for i in range(7)]
-        challenges = p.get("challenges", {})
-
-        return {
-            "champion": p.get("championName", ""),
-            "role": p.get("role", ""),
-            "lane": p.get("lane", ""),
-            "team_position": p.get("teamPosition", ""),
-            "individual_position": p.get("individualPosition", ""),
-            "win": p.get("win", False),
-            "kills": p.get("kills", 0),
-            "deaths": p.get("deaths", 0),
-            "assists": p.get("assists", 0),
-            "kda": round(kda, 2),
-            "cs": cs,
-            "cs_per_min": round(cs_per_min, 2),
-            "gold": p.get("goldEarned", 0),
-            "gold_spent": p.get("goldSpent", 0),
-            "damage_dealt": p.get("totalDamageDealtToChampions", 0),
-            "damage_dealt_to_objectives": p.get("damageDealtToObjectives", 0),
-            "damage_dealt_to_buildings": p.get("damageDealtToBuildings", 0),
-            "physical_damage_dealt": p.get("physicalDamageDealt", 0),
-            "magic_damage_dealt": p.get("magicDamageDealt", 0),
-            "true_damage_dealt": p.get("trueDamageDealt", 0),
-            "physical_damage_to_champs": p.get("physicalDamageDealtToChampions", 0),
-            "magic_damage_to_champs": p.get("magicDamageDealtToChampions", 0),
-            "true_damage_to_champs": p.get("trueDamageDealtToChampions", 0),
-            "damage_taken": p.get("totalDamageTaken", 0),
-            "physical_damage_taken": p.get("physicalDamageTaken", 0),
-            "magic_damage_taken": p.get("magicDamageTaken", 0),
-            "true_damage_taken": p.get("trueDamageTaken", 0),
-            "damage_self_mitigated": p.get("damageSelfMitigated", 0),
-            "total_heal": p.get("totalHeal", 0),
-            "total_heal_on_teammates": p.get("totalHealsOnTeammates", 0),
-            "damage_shielded_on_teammates": p.get("totalDamageShieldedOnTeammates", 0),
-            "total_cc_dealt": p.get("timeCCingOthers", 0),
-            "total_time_cc_dealt": p.get("totalTimeCCDealt", 0),
-            "vision_score": p.get("visionScore", 0),
-            "wards_placed": p.get("wardsPlaced", 0),
-            "wards_killed": p.get("wardsKilled", 0),
-            "sight_wards_bought": p.get("sightWardsBoughtInGame", 0),
-            "vision_wards_bought": p.get("visionWardsBoughtInGame", 0),
-            "detector_wards_placed": p.get("detectorWardsPlaced", 0),
-            "pentakills": p.get("pentaKills", 0),
-            "quadrakills": p.get("quadraKills", 0),
-            "triplekills": p.get("tripleKills", 0),
-            "doublekills": p.get("doubleKills", 0),
-            "multikills": p.get("largestMultiKill", 0),
-            "dragon_kills": p.get("dragonKills", 0),
-            "baron_kills": p.get("baronKills", 0),
-            "turret_kills": p.get("turretKills", 0),
-            "turret_takedowns": p.get("turretTakedowns", 0),
-            "turrets_lost": p.get("turretsLost", 0),
-            "inhibitor_kills": p.get("inhibitorKills", 0),
-            "inhibitor_takedowns": p.get("inhibitorTakedowns", 0),
-            "inhibitors_lost": p.get("inhibitorsLost", 0),
-            "nexus_kills": p.get("nexusKills", 0),
-            "nexus_takedowns": p.get("nexusTakedowns", 0),
-            "total_ally_jungle_minions": p.get("totalAllyJungleMinionsKilled", 0),
-            "total_enemy_jungle_minions": p.get("totalEnemyJungleMinionsKilled", 0),
-            "true_mitigated_damage": p.get("damageSelfMitigated", 0),
-            "longest_time_alive": p.get("longestTimeSpentLiving", 0),
-            "total_time_dead": p.get("totalTimeSpentDead", 0),
-            "killing_sprees": p.get("killingSprees", 0),
-            "largest_killing_spree": p.get("largestKillingSpree", 0),
-            "first_blood_kill": p.get("firstBloodKill", False),
-            "first_blood_assist": p.get("firstBloodAssist", False),
-            "first_tower_kill": p.get("firstTowerKill", False),
-            "first_tower_assist": p.get("firstTowerAssist", False),
-            "champ_level": p.get("champLevel", 0),
-            "champ_experience": p.get("champExperience", 0),
-            "summoner1_id": p.get("summoner1Id", 0),
-            "summoner2_id": p.get("summoner2Id", 0),
-            "summoner1_casts": p.get("summoner1Casts", 0),
-            "summoner2_casts": p.get("summoner2Casts", 0),
-            "spell1_casts": p.get("spell1Casts", 0),
-            "spell2_casts": p.get("spell2Casts", 0),
-            "spell3_casts": p.get("spell3Casts", 0),
-            "spell4_casts": p.get("spell4Casts", 0),
-            "item0": items[0],
-            "item1": items[1],
-            "item2": items[2],
-            "item3": items[3],
-            "item4": items[4],
-            "item5": items[5],
-            "item6": items[6],
-            "items_purchased": p.get("itemsPurchased", 0),
-            "consumables_purchased": p.get("consumablesPurchased", 0),
-            "bounce_level": p.get("bountyLevel", 0),
-            "unrealized_kills": p.get("unrealKills", 0),
-            "time_played": p.get("timePlayed", 0),
-            "game_ended_in_surrender": p.get("gameEndedInSurrender", False),
-            "game_ended_in_early_surrender": p.get("gameEndedInEarlySurrender", False),
-            "team_early_surrendered": p.get("teamEarlySurrendered", False),
-            "gold_per_minute": round(challenges.get("goldPerMinute", 0), 2),
-            "damage_per_minute": round(challenges.get("damagePerMinute", 0), 2),
-            "vision_score_per_minute": round(challenges.get("visionScorePerMinute", 0), 2),
-            "kill_participation": round(challenges.get("killParticipation", 0), 3),
-            "kda_challenge": round(challenges.get("kda", 0), 2),
-            "largest_critical_strike": p.get("largestCriticalStrike", 0),
-            "damage_taken_on_team_percentage": round(
-                challenges.get("damageTakenOnTeamPercentage", 0), 3
-            ),
-            "max_level_lead_lane_opponent": challenges.get("maxLevelLeadLaneOpponent", 0),
-            "max_cs_advantage_on_lane_opponent": round(
-                challenges.get("maxCsAdvantageOnLaneOpponent", 0), 2
-            ),
-            "takedowns": challenges.get("takedowns", 0),
-            "takedowns_first_25_minutes": challenges.get("takedownsFirst25Minutes", 0),
-            "deaths_by_enemy_champs": challenges.get("deathsByEnemyChamps", 0),
-            "enemy_champ_immobilizations": challenges.get("enemyChampionImmobilizations", 0),
-            "solo_kills": challenges.get("soloKills", 0),
-            "outnumbered_kills": challenges.get("outnumberedKills", 0),
-            "game_duration": duration,
-        }
-
-    return None
-
-
-def chunk_text(text: str, limit: int = 1900) -> list[str]:
-    chunks: list[str] = []
-    current = []
-    current_len = 0
-
-    for line in text.splitlines():
-        line_len = len(line) + 1
-        if current_len + line_len > limit:
-            chunks.append("\n".join(current))
-            current = [line]
-            current_len = line_len
-        else:
-            current.append(line)
-            current_len += line_len
-
-    if current:
-        chunks.append("\n".join(current))
-
-    return chunks
+            # Saving first merges this run's lobbies, and picks up other processes' on the next reads.
+            await asyncio.to_thread(PERCENTILE_INDEX.save)
+            percentiles = await asyncio.to_thread(PERCENTILE_INDEX.player_percentiles, games_data)
+        except Exception:
+            logger.exception("Ranking against the percentile index failed for %s", puuid)
+
+    progress.update(f"Analyzing {len(games_data)} games with Gemini...")
+    try:
+        genai.configure(api_key=GEMINI_API_KEY)
+        model = genai.GenerativeModel(GEMINI_MODEL)
+        with METRICS.timer("prompt_build"):
+            prompt = build_prompt(
+                games_data, PROMPT_PATH, token_budget=PROMPT_TOKEN_BUDGET, history=history, percentiles=percentiles
+            )
+        text = await stream_generation(model, prompt, on_chunk)
+    except Exception as e:
+        logger.exception("Analysis failed for %s", puuid)
+        raise AnalysisError(f"Gemini request failed: {e}") from e
+    if not text:
+        # Raised rather than returned, so an empty answer is never cached for the player.
+        raise AnalysisError("No response text returned. Please try again.")
+    return text
 
 
 class LolCoachBot(discord.Client):
@@ -247,8 +267,25 @@ class LolCoachBot(discord.Client):
         intents = discord.Intents.default()
         super().__init__(intents=intents)
         self.tree = app_commands.CommandTree(self)
+        self.scheduler = JobScheduler(
+            workers=COACH_WORKERS, max_queued=COACH_MAX_QUEUE, max_per_user=COACH_MAX_PER_USER
+        )
+        self.prefetch_task: asyncio.Task | None = None
+
+    def coach_busy(self) -> bool:
+        """Return whether /coach jobs are running or waiting; prefetching pauses meanwhile."""
+        return self.scheduler.running > 0 or self.scheduler.queued > 0
 
     async def setup_hook(self) -> None:
+        self.scheduler.start()
+        if PREFETCHER is not None:
+            self.prefetch_task = asyncio.create_task(PREFETCHER.run(self.coach_busy))
+            logger.info(
+                "Prefetching %d registered players every %d minutes", len(PREFETCHER), PREFETCH_INTERVAL_MINUTES
+            )
+        if METRICS_PORT:
+            await serve_metrics(METRICS, METRICS_HOST, METRICS_PORT)
+            logger.info("Serving metrics on %s:%d/metrics", METRICS_HOST, METRICS_PORT)
         await self.tree.sync()
 
 
@@ -256,11 +293,22 @@ client = LolCoachBot()
 
 
 @client.tree.command(name="coach", description="Analyze recent games and provide coaching insights with Gemini AI.")
-@app_commands.describe(game_name="Riot game name", tag_line="Riot tagline")
+@app_commands.describe(
+    game_name="Riot game name",
+    tag_line="Riot tagline",
+    queue="Which games to analyze",
+    days="Only games from the last N days",
+)
+@app_commands.choices(queue=[app_commands.Choice(name=name, value=name) for name in QUEUE_PRESETS])
 async def coach_command(
-    interaction: discord.Interaction, game_name: str | None = None, tag_line: str | None = None
+    interaction: discord.Interaction,
+    game_name: str | None = None,
+    tag_line: str | None = None,
+    queue: app_commands.Choice[str] | None = None,
+    days: app_commands.Range[int, 1, 365] | None = None,
 ) -> None:
     await interaction.response.defer(thinking=True)
+    METRICS.incr("coach_requests")
 
     if not DISCORD_BOT_TOKEN or not RIOT_API_KEY or not GEMINI_API_KEY:
         await interaction.followup.send("Missing API keys. Check .env configuration.")
@@ -275,43 +323,146 @@ async def coach_command(
         )
         return
 
+    queue_name = queue.value if queue else COACH_QUEUES
+    try:
+        match_filter = parse_match_filter(queue_name, since_days=days)
+    except ValueError as e:
+        await interaction.followup.send(str(e))
+        return
+
     try:
-        puuid = await asyncio.to_thread(get_account_puuid, game_name, tag_line)
-        match_ids = await asyncio.to_thread(get_match_ids, puuid, TOTAL_GAMES)
+        puuid = await asyncio.to_thread(RIOT_CLIENT.get_puuid, game_name, tag_line)
+        match_ids = await asyncio.to_thread(
+            RIOT_CLIENT.get_match_ids, puuid, TOTAL_GAMES, match_filter=match_filter
+        )
     except Exception as e:
+        logger.warning("Failed to fetch match list for %s#%s: %s", game_name, tag_line, e)
         await interaction.followup.send(f"Failed to fetch match list: {e}")
         return
 
-    games_data: list[dict] = []
-    for idx, match_id in enumerate(match_ids, start=1):
-        try:
-            match_data = await asyncio.to_thread(fetch_match, match_id)
-        except Exception:
-            match_data = None
-        if not match_data or "info" not in match_data:
-            continue
-        player_data = extract_player_data(match_data["info"], puuid)
-        if player_data:
-            games_data.append(player_data)
-        await asyncio.sleep(1.5)
+    try:
+        # The filter is keyed by its options; its start time moves with the clock.
+        key = (
+            puuid,
+            queue_name,
+            days,
+            match_set_digest(match_ids),
+            GEMINI_MODEL,
+            prompt_version(PROMPT_PATH),
+            PROMPT_TOKEN_BUDGET,
+        )
+    except OSError as e:
+        await interaction.followup.send(f"Prompt template unavailable: {e}")
+        return
 
-    if not games_data:
-        await interaction.followup.send("No games data found for this player.")
+    # A finished analysis stays valid until the player has a new match (which changes the key).
+    analysis_text = ANALYSIS_CACHE.get(key)
+    METRICS.incr("cache_hits" if analysis_text is not None else "cache_misses", cache="analysis")
+    # Set once this request's own run has streamed the answer; coalesced followers get it in one go below.
+    delivered = False
+    if analysis_text is None:
+
+        async def deliver(chunk: str) -> None:
+            nonlocal delivered
+            if not delivered:
+                await progress.stop()
+            delivered = True
+            # Caught here, outside the Gemini request: this user's Discord failure must not fail the
+            # analysis shared with coalesced requests and the cache.
+            try:
+                with METRICS.timer("discord_delivery"):
+                    await interaction.followup.send(chunk)
+            except Exception as e:
+                logger.warning("Delivering a chunk to %s failed: %s", interaction.user, e)
+                METRICS.incr("failures", stage="discord_delivery")
+
+        async with ProgressReporter(interaction) as progress:
+            job = None
+            if key in ANALYSIS_JOBS:
+                METRICS.incr("coalesced_requests")
+                progress.update("Joining an identical analysis already in progress...")
+            else:
+                try:
+                    # Admitted before the flight is shared, so a rejection only ever reaches this user.
+                    job = client.scheduler.enqueue(
+                        interaction.guild_id,
+                        interaction.user.id,
+                        lambda: run_analysis(puuid, match_ids, progress, deliver, match_filter),
+                        on_queued=lambda ahead: progress.update(f"Queued ({ahead} requests ahead)..."),
+                    )
+                except JobRejectedError as e:
+                    METRICS.incr("rejected_jobs")
+                    await progress.stop()
+                    await interaction.followup.send(str(e))
+                    return
+
+            try:
+                # Nothing is awaited since the membership check, so a follower always finds the flight.
+                analysis_text = await ANALYSIS_JOBS.run(key, lambda: job)
+            except AnalysisError as e:
+                await progress.stop()
+                await interaction.followup.send(str(e))
+                return
+        ANALYSIS_CACHE.put(key, analysis_text)
+
+    if delivered:
+        return
+    for chunk in chunk_text(analysis_text):
+        with METRICS.timer("discord_delivery"):
+            await interaction.followup.send(chunk)
+
+
+@client.tree.command(name="prefetch", description="Keep a player's recent games fetched ahead of /coach.")
+@app_commands.describe(
+    action="Start or stop prefetching",
+    game_name="Riot game name",
+    tag_line="Riot tagline",
+)
+@app_commands.choices(
+    action=[app_commands.Choice(name="start", value="start"), app_commands.Choice(name="stop", value="stop")]
+)
+async def prefetch_command(
+    interaction: discord.Interaction,
+    action: app_commands.Choice[str],
+    game_name: str | None = None,
+    tag_line: str | None = None,
+) -> None:
+    await interaction.response.defer(ephemeral=True, thinking=True)
+
+    if PREFETCHER is None:
+        await interaction.followup.send("Prefetching is disabled on this bot.")
+        return
+
+    game_name = game_name or DEFAULT_GAME_NAME
+    tag_line = tag_line or DEFAULT_TAG_LINE
+    if not game_name or not tag_line:
+        await interaction.followup.send("Please provide game_name and tag_line or set defaults in .env.")
         return
 
     try:
-        genai.configure(api_key=GEMINI_API_KEY)
-        model = genai.GenerativeModel(GEMINI_MODEL)
-        prompt = build_prompt(games_data)
-        response = await asyncio.to_thread(model.generate_content, prompt)
-        analysis_text = response.text or "No response text returned."
+        puuid = await asyncio.to_thread(RIOT_CLIENT.get_puuid, game_name, tag_line)
     except Exception as e:
-        await interaction.followup.send(f"Gemini request failed: {e}")
+        logger.warning("Failed to resolve %s#%s: %s", game_name, tag_line, e)
+        await interaction.followup.send(f"Failed to resolve Riot ID: {e}")
         return
 
-    chunks = chunk_text(analysis_text)
-    for chunk in chunks:
-        await interaction.followup.send(chunk)
+    riot_id = f"{game_name}#{tag_line}"
+    if action.value == "stop":
+        removed = PREFETCHER.unregister(puuid)
+        await interaction.followup.send(
+            f"Stopped prefetching {riot_id}." if removed else f"{riot_id} was not being prefetched."
+        )
+        return
+    try:
+        added = PREFETCHER.register(puuid, riot_id)
+    except ValueError as e:
+        await interaction.followup.send(str(e))
+        return
+    await interaction.followup.send(
+        f"New games of {riot_id} will be fetched in the background, so /coach answers faster."
+        if added
+        else f"{riot_id} is already being prefetched."
+    )
 
 
 if __name__ == "__main__":
@@ -1,48 +1,343 @@
-from lol_coach.config import get_int_env_var, get_optional_env_var, get_required_env_var
-from lol_coach.export_service import (
-    collect_games_data,
-    export_tabular_files,
-    export_toon_file,
-)
-from lol_coach.riot_api import build_headers, get_match_ids, get_puuid
-
-
-API_KEY = get_required_env_var("RIOT_API_KEY")
-GAME_NAME = get_required_env_var("GAME_NAME")
-TAG_LINE = get_required_env_var("TAG_LINE")
-TOTAL_GAMES = get_int_env_var("TOTAL_GAMES", 20)
-REGION_ROUTING = get_optional_env_var("REGION_ROUTING", "europe")
-
-
-def run_export(game_name, tag_line, total_games):
-    headers = build_headers(API_KEY)
-
-    puuid = get_puuid(game_name, tag_line, headers, region_routing=REGION_ROUTING)
-    print(f"PUUID for {game_name}#{tag_line}: {puuid}")
-
-    match_ids = get_match_ids(
-        puuid,
-        headers,
-        total_games=total_games,
-        region_routing=REGION_ROUTING,
-    )
-    print(f"Found {len(match_ids)} recent matches for {game_name}#{tag_line}.")
-
-    games_data = collect_games_data(
-        match_ids,
-        puuid,
-        headers,
-        region_routing=REGION_ROUTING,
-    )
-    export_tabular_files(games_data, game_name, tag_line)
-    export_toon_file(games_data, game_name, tag_line)
-
-    print(f"Export completed for {game_name}#{tag_line}. ({len(games_data)} games exported)")
-
-
-def main():
-    run_export(GAME_NAME, TAG_LINE, TOTAL_GAMES)
-
-
-if __name__ == "__main__":
-    main()
+import argparse
+import json
+import logging
+import os
+
+from lol_coach.account_cache import DEFAULT_PUUID_CACHE_PATH, PuuidCache
+from lol_coach.checkpoint import DEFAULT_CHECKPOINT_DIR, ExportJournal
+from lol_coach.config import (
+    get_bool_env_var,
+    get_int_env_var,
+    get_optional_env_var,
+    get_required_env_var,
+    load_env,
+)
+from lol_coach.export_service import (
+    collect_roster_records,
+    export_base_name,
+    export_records,
+    export_toon_file,
+    iter_games_data,
+    merge_games_data,
+    newest_known_match_id,
+    read_exported_games,
+    set_aside_previous_export,
+)
+from lol_coach.match_cache import DEFAULT_CACHE_PATH, open_match_cache
+from lol_coach.match_filter import QUEUE_PRESETS, parse_match_filter
+from lol_coach.metrics import METRICS
+from lol_coach.percentiles import DEFAULT_PERCENTILE_PATH, open_percentile_index
+from lol_coach.riot_api import RiotClient
+from lol_coach.shared_rate_limit import DEFAULT_RATE_LIMIT_PATH, open_rate_limiter
+from lol_coach.stats_store import DEFAULT_STATS_PATH, open_stats_store, record_stream
+from lol_coach.timeline import DEFAULT_TIMELINE_DIR, open_timeline_store
+
+logger = logging.getLogger("export")
+
+load_env()
+
+API_KEY = get_required_env_var("RIOT_API_KEY")
+# Comma-separated Riot IDs ("Name#TAG,Other#TAG"); when set it replaces GAME_NAME/TAG_LINE.
+ROSTER = get_optional_env_var("ROSTER")
+TOTAL_GAMES = get_int_env_var("TOTAL_GAMES", 20)
+REGION_ROUTING = get_optional_env_var("REGION_ROUTING", "europe")
+MAX_FETCH_WORKERS = get_int_env_var("MAX_FETCH_WORKERS", 8)
+# Rate-limit windows shared with the bot and other exports on the same key (empty: this process only)
+RATE_LIMIT_PATH = get_optional_env_var("RATE_LIMIT_PATH", DEFAULT_RATE_LIMIT_PATH)
+MATCH_CACHE_PATH = get_optional_env_var("MATCH_CACHE_PATH", DEFAULT_CACHE_PATH)
+MATCH_CACHE_MAX_MB = get_int_env_var("MATCH_CACHE_MAX_MB", 512)
+PUUID_CACHE_PATH = get_optional_env_var("PUUID_CACHE_PATH", DEFAULT_PUUID_CACHE_PATH)
+PUUID_CACHE_TTL_HOURS = get_int_env_var("PUUID_CACHE_TTL_HOURS", 720)
+INCREMENTAL = get_bool_env_var("INCREMENTAL", False)
+# Match discovery filters: queue preset or IDs, match type, and start/end as ISO dates or epoch seconds
+MATCH_QUEUES = get_optional_env_var("MATCH_QUEUES", "")
+MATCH_TYPE = get_optional_env_var("MATCH_TYPE", "")
+MATCH_START = get_optional_env_var("MATCH_START", "")
+MATCH_END = get_optional_env_var("MATCH_END", "")
+EXPORT_FORMATS = [fmt.strip() for fmt in get_optional_env_var("EXPORT_FORMATS", "csv,ndjson").split(",")]
+DATASET_ROOT = get_optional_env_var("DATASET_ROOT", "dataset")
+DATASET_PARTITION = get_optional_env_var("DATASET_PARTITION", "date")
+FETCH_TIMELINES = get_bool_env_var("FETCH_TIMELINES", False)
+TIMELINE_STORE_PATH = get_optional_env_var("TIMELINE_STORE_PATH", DEFAULT_TIMELINE_DIR)
+EXTRACT_PROCESSES = get_int_env_var("EXTRACT_PROCESSES", 0)
+# Exported games are also added to this local history store (empty to disable)
+STATS_DB_PATH = get_optional_env_var("STATS_DB_PATH", DEFAULT_STATS_PATH)
+# Every extracted lobby is added to the per champion x role percentile index used by the bot (empty to disable)
+PERCENTILE_INDEX_PATH = get_optional_env_var("PERCENTILE_INDEX_PATH", DEFAULT_PERCENTILE_PATH)
+# Journals of finished matches, used by --resume to continue an interrupted export
+CHECKPOINT_DIR = get_optional_env_var("CHECKPOINT_DIR", DEFAULT_CHECKPOINT_DIR)
+# Per-stage timings and counters of the run are written here as JSON (empty to disable)
+RUN_SUMMARY_PATH = get_optional_env_var("RUN_SUMMARY_PATH", "export_run_summary.json")
+
+
+def parse_roster(value: str) -> list[tuple[str, str]]:
+    """Parse comma-separated Riot IDs ("Name#TAG") into (game_name, tag_line) pairs."""
+    players = []
+    for riot_id in value.split(","):
+        riot_id = riot_id.strip()
+        if not riot_id:
+            continue
+        game_name, separator, tag_line = riot_id.rpartition("#")
+        if not separator or not game_name or not tag_line:
+            raise ValueError(f"Invalid Riot ID in ROSTER: {riot_id!r} (expected Name#TAG)")
+        players.append((game_name, tag_line))
+    return players
+
+
+def build_client():
+    return RiotClient(
+        API_KEY,
+        region_routing=REGION_ROUTING,
+        # Exports are batch traffic: they leave headroom whenever /coach requests are active.
+        limiter=open_rate_limiter(RATE_LIMIT_PATH, "batch"),
+        cache=open_match_cache(MATCH_CACHE_PATH, MATCH_CACHE_MAX_MB),
+        puuid_cache=PuuidCache(ttl=PUUID_CACHE_TTL_HOURS * 3600, path=PUUID_CACHE_PATH or None),
+        timeline_store=open_timeline_store(TIMELINE_STORE_PATH) if FETCH_TIMELINES else None,
+        max_workers=MAX_FETCH_WORKERS,
+    )
+
+
+def open_journal(name, resume):
+    """Open the checkpoint journal of the export called *name*, keeping its content if *resume*."""
+    return ExportJournal(os.path.join(CHECKPOINT_DIR, f"{name}.ndjson"), resume=resume)
+
+
+def find_new_match_ids(client, puuid, game_name, tag_line, total_games, incremental, match_filter=None):
+    """Return (match_ids, previous_export) for a player, setting the previous export aside if incremental."""
+    previous_export = set_aside_previous_export(game_name, tag_line) if incremental else None
+    stop_at = newest_known_match_id(previous_export)
+
+    match_ids = client.get_match_ids(puuid, total_games=total_games, stop_at=stop_at, match_filter=match_filter)
+    if stop_at:
+        logger.info("Found %d new matches since %s for %s#%s.", len(match_ids), stop_at, game_name, tag_line)
+    else:
+        logger.info("Found %d recent matches for %s#%s.", len(match_ids), game_name, tag_line)
+    return match_ids, previous_export
+
+
+def check_formats(formats, incremental):
+    """Raise ValueError for format combinations that would lose data."""
+    if incremental and "ndjson" not in formats:
+        # The NDJSON export is the history an incremental run merges new games into.
+        raise ValueError("INCREMENTAL exports need the ndjson format in EXPORT_FORMATS.")
+
+
+def collect_into(records, sink):
+    """Yield *records* unchanged while appending each one to *sink*."""
+    for record in records:
+        sink.append(record)
+        yield record
+
+
+def write_exports(records, game_name, tag_line, total_games, previous_export, formats, puuid=None):
+    if previous_export:
+        records = merge_games_data(records, read_exported_games(previous_export), total_games)
+    # TOON needs the whole list at once: the merged records are kept as they stream by, so memory
+    # grows with the number of games. That is why it is not one of the default formats.
+    toon_records = [] if "toon" in formats else None
+    if toon_records is not None:
+        records = collect_into(records, toon_records)
+    stats_store = open_stats_store(STATS_DB_PATH) if puuid else None
+    if stats_store is not None:
+        records = record_stream(stats_store, puuid, records, riot_id=f"{game_name}#{tag_line}")
+    try:
+        exported = export_records(
+            records,
+            game_name,
+            tag_line,
+            formats,
+            dataset_root=DATASET_ROOT,
+            partition_by=DATASET_PARTITION,
+        )
+    finally:
+        if stats_store is not None:
+            stats_store.close()
+    # Only a completely rewritten NDJSON export replaces the history that was set aside.
+    if previous_export and "ndjson" in formats:
+        os.remove(previous_export)
+
+    if toon_records is not None:
+        export_toon_file(toon_records, game_name, tag_line)
+
+    logger.info("Export completed for %s#%s. (%d games exported)", game_name, tag_line, exported)
+    return exported
+
+
+def run_export(
+    game_name,
+    tag_line,
+    total_games,
+    incremental=False,
+    formats=("csv", "ndjson"),
+    resume=False,
+    match_filter=None,
+):
+    check_formats(formats, incremental)
+    client = build_client()
+    journal = open_journal(export_base_name(game_name, tag_line), resume)
+
+    if journal.run:
+        # The match list is taken from the interrupted run, so the export finishes what it started.
+        puuid, match_ids = journal.run["puuid"], journal.run["match_ids"]
+        previous_export = set_aside_previous_export(game_name, tag_line) if incremental else None
+        logger.info(
+            "Resuming export for %s#%s: %d/%d matches already done.", game_name, tag_line, len(journal), len(match_ids)
+        )
+    else:
+        puuid = client.get_puuid(game_name, tag_line)
+        logger.info("PUUID for %s#%s: %s", game_name, tag_line, puuid)
+        match_ids, previous_export = find_new_match_ids(
+            client, puuid, game_name, tag_line, total_games, incremental, match_filter
+        )
+        journal.start(puuid=puuid, match_ids=match_ids)
+
+    percentile_index = open_percentile_index(PERCENTILE_INDEX_PATH)
+    records = iter_games_data(
+        match_ids,
+        puuid,
+        client,
+        with_timelines=FETCH_TIMELINES,
+        journal=journal,
+        on_lobby=percentile_index.add_lobby if percentile_index is not None else None,
+    )
+    if match_filter:
+        # Matches without cached metadata are only known to be off-filter once extracted.
+        records = match_filter.filter_records(records)
+    try:
+        exported = write_exports(records, game_name, tag_line, total_games, previous_export, formats, puuid)
+    finally:
+        client.close()
+        journal.close()
+        if percentile_index is not None:
+            percentile_index.close()
+    journal.discard()
+    return {f"{game_name}#{tag_line}": exported}
+
+
+def run_roster_export(
+    players,
+    total_games,
+    incremental=False,
+    formats=("csv", "ndjson"),
+    resume=False,
+    match_filter=None,
+):
+    """Export every player of *players*, fetching and parsing each shared match only once."""
+    check_formats(formats, incremental)
+    client = build_client()
+    journal = open_journal("roster", resume)
+    riot_ids = [f"{game_name}#{tag_line}" for game_name, tag_line in players]
+
+    roster = []
+    if journal.run.get("riot_ids") == riot_ids:
+        for (game_name, tag_line), (puuid, match_ids) in zip(players, journal.run["match_ids"]):
+            previous_export = set_aside_previous_export(game_name, tag_line) if incremental else None
+            roster.append((game_name, tag_line, puuid, match_ids, previous_export))
+        logger.info("Resuming roster export: %d matches already done.", len(journal))
+    else:
+        if journal.run:
+            logger.warning("The roster changed since the interrupted export; starting over.")
+            journal.close()
+            journal = open_journal("roster", resume=False)
+        for game_name, tag_line in players:
+            puuid = client.get_puuid(game_name, tag_line)
+            logger.info("PUUID for %s#%s: %s", game_name, tag_line, puuid)
+            match_ids, previous_export = find_new_match_ids(
+                client, puuid, game_name, tag_line, total_games, incremental, match_filter
+            )
+            roster.append((game_name, tag_line, puuid, match_ids, previous_export))
+        journal.start(riot_ids=riot_ids, match_ids=[(puuid, match_ids) for _, _, puuid, match_ids, _ in roster])
+
+    unique_ids = list(dict.fromkeys(match_id for *_, match_ids, _ in roster for match_id in match_ids))
+    requested = sum(len(match_ids) for *_, match_ids, _ in roster)
+    logger.info("Fetching %d unique matches for %d player matches.", len(unique_ids), requested)
+    percentile_index = open_percentile_index(PERCENTILE_INDEX_PATH)
+    try:
+        records = collect_roster_records(
+            unique_ids,
+            [puuid for _, _, puuid, _, _ in roster],
+            client,
+            processes=EXTRACT_PROCESSES or None,
+            with_timelines=FETCH_TIMELINES,
+            journal=journal,
+            on_lobby=percentile_index.add_lobby if percentile_index is not None else None,
+        )
+    finally:
+        client.close()
+        journal.close()
+        if percentile_index is not None:
+            percentile_index.close()
+
+    exported = {}
+    for game_name, tag_line, puuid, match_ids, previous_export in roster:
+        player_records = (
+            records[match_id][puuid]
+            for match_id in match_ids
+            if match_id in records and puuid in records[match_id]
+        )
+        if match_filter:
+            player_records = match_filter.filter_records(player_records)
+        exported[f"{game_name}#{tag_line}"] = write_exports(
+            player_records, game_name, tag_line, total_games, previous_export, formats, puuid
+        )
+    # The journal is only dropped once every player's files are written.
+    journal.discard()
+    return exported
+
+
+def write_run_summary(path, exported):
+    """Write the run's per-stage timings and counters as JSON to *path*."""
+    summary = {"exported_games": exported, **METRICS.summary()}
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(summary, fh, indent=2)
+    logger.info("Run summary written to %s", path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export recent match statistics for a player or a roster.")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue an interrupted export from its checkpoint journal instead of starting over",
+    )
+    parser.add_argument(
+        "--queue",
+        default=MATCH_QUEUES,
+        help=f"queue preset ({', '.join(QUEUE_PRESETS)}) or comma-separated queue IDs",
+    )
+    parser.add_argument("--type", default=MATCH_TYPE, help="match type: ranked, normal, tourney or tutorial")
+    parser.add_argument("--start", default=MATCH_START, help="only matches started after this ISO date or epoch time")
+    parser.add_argument("--end", default=MATCH_END, help="only matches started before this ISO date or epoch time")
+    args = parser.parse_args()
+    try:
+        match_filter = parse_match_filter(args.queue, args.type, args.start, args.end)
+        check_formats(EXPORT_FORMATS, INCREMENTAL)
+    except ValueError as e:
+        parser.error(str(e))
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if ROSTER:
+        exported = run_roster_export(
+            parse_roster(ROSTER),
+            TOTAL_GAMES,
+            incremental=INCREMENTAL,
+            formats=EXPORT_FORMATS,
+            resume=args.resume,
+            match_filter=match_filter,
+        )
+    else:
+        exported = run_export(
+            get_required_env_var("GAME_NAME"),
+            get_required_env_var("TAG_LINE"),
+            TOTAL_GAMES,
+            incremental=INCREMENTAL,
+            formats=EXPORT_FORMATS,
+            resume=args.resume,
+            match_filter=match_filter,
+        )
+    if RUN_SUMMARY_PATH:
+        write_run_summary(RUN_SUMMARY_PATH, exported)
+
+
+if __name__ == "__main__":
+    main()
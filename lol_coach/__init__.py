@@ -1,21 +1,106 @@
-"""lol_coach — Riot Games API utilities and match data processing."""
-
-from .export_service import collect_games_data, export_tabular_files, export_toon_file
-from .match_processing import build_game_record, find_player_participant
-from .prompting import build_prompt
-from .riot_api import build_headers, fetch_match_info, get_match_ids, get_puuid
-from .text_utils import chunk_text
-
-__all__ = [
-    "build_headers",
-    "get_puuid",
-    "get_match_ids",
-    "fetch_match_info",
-    "find_player_participant",
-    "build_game_record",
-    "collect_games_data",
-    "export_tabular_files",
-    "export_toon_file",
-    "build_prompt",
-    "chunk_text",
-]
+"""lol_coach — Riot Games API utilities and match data processing.
+
+Public names are loaded on first access, so ``import lol_coach`` (or any
+one submodule) does not pull in pandas, numpy, pyarrow or py_toon_format.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+# Public name -> submodule defining it.
+_EXPORTS: dict[str, str] = {
+    "build_headers": "riot_api",
+    "RiotClient": "riot_api",
+    "RateLimiter": "rate_limit",
+    "SharedRateLimiter": "shared_rate_limit",
+    "MatchCache": "match_cache",
+    "PuuidCache": "account_cache",
+    "Metrics": "metrics",
+    "METRICS": "metrics",
+    "MatchFilter": "match_filter",
+    "parse_match_filter": "match_filter",
+    "find_player_participant": "match_processing",
+    "build_game_record": "match_processing",
+    "build_game_columns": "match_processing",
+    "ExportJournal": "checkpoint",
+    "FieldSpec": "record_schema",
+    "GAME_RECORD_FIELDS": "record_schema",
+    "GAME_RECORD_COLUMNS": "record_schema",
+    "LOBBY_COLUMNS": "lobby",
+    "RECORD_COLUMNS": "lobby",
+    "RECORD_KINDS": "lobby",
+    "build_lobby_records": "lobby",
+    "LobbyIndex": "lobby",
+    "LANING_COLUMNS": "timeline",
+    "MatchTimeline": "timeline",
+    "TimelineStore": "timeline",
+    "parse_timeline": "timeline",
+    "RecordRow": "record_table",
+    "RecordTable": "record_table",
+    "collect_games_data": "export_service",
+    "collect_games_table": "export_service",
+    "iter_games_data": "export_service",
+    "export_records": "export_service",
+    "export_toon_file": "export_service",
+    "PercentileIndex": "percentiles",
+    "QuantileSketch": "percentiles",
+    "Prefetcher": "prefetch",
+    "RequestBudget": "prefetch",
+    "build_prompt": "prompting",
+    "prompt_version": "prompting",
+    "compact_games_data": "prompt_compaction",
+    "summarize_games": "prompt_compaction",
+    "StatsStore": "stats_store",
+    "SingleFlight": "request_cache",
+    "JobScheduler": "jobs",
+    "JobRejectedError": "jobs",
+    "TTLCache": "request_cache",
+    "TextChunker": "text_utils",
+    "chunk_text": "text_utils",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
+
+
+if TYPE_CHECKING:
+    from .account_cache import PuuidCache
+    from .checkpoint import ExportJournal
+    from .export_service import (
+        collect_games_data,
+        collect_games_table,
+        export_records,
+        export_toon_file,
+        iter_games_data,
+    )
+    from .jobs import JobRejectedError, JobScheduler
+    from .lobby import LOBBY_COLUMNS, RECORD_COLUMNS, RECORD_KINDS, LobbyIndex, build_lobby_records
+    from .match_cache import MatchCache
+    from .match_filter import MatchFilter, parse_match_filter
+    from .match_processing import build_game_columns, build_game_record, find_player_participant
+    from .metrics import METRICS, Metrics
+    from .percentiles import PercentileIndex, QuantileSketch
+    from .prefetch import Prefetcher, RequestBudget
+    from .prompt_compaction import compact_games_data, summarize_games
+    from .prompting import build_prompt, prompt_version
+    from .rate_limit import RateLimiter
+    from .record_schema import GAME_RECORD_COLUMNS, GAME_RECORD_FIELDS, FieldSpec
+    from .record_table import RecordRow, RecordTable
+    from .request_cache import SingleFlight, TTLCache
+    from .riot_api import RiotClient, build_headers
+    from .shared_rate_limit import SharedRateLimiter
+    from .stats_store import StatsStore
+    from .text_utils import TextChunker, chunk_text
+    from .timeline import LANING_COLUMNS, MatchTimeline, TimelineStore, parse_timeline
@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PUUID_CACHE_PATH = os.path.join(".cache", "puuids.json")
+
+# Stored for Riot IDs the Account API reported as unknown (negative caching).
+UNKNOWN_RIOT_ID = ""
+
+
+def riot_id_key(game_name: str, tag_line: str) -> str:
+    """Return the normalized cache key of a Riot ID; Riot IDs are case-insensitive."""
+    return f"{game_name.strip().casefold()}#{tag_line.strip().casefold()}"
+
+
+class PuuidCache:
+    """In-memory Riot ID -> PUUID cache with TTLs and an optional JSON file backing.
+
+    Resolved IDs live for *ttl* seconds and unknown IDs for *negative_ttl*.
+    A PUUID maps to a single Riot ID: when it resolves under a new Riot ID
+    (the account was renamed), the stale entry for the old one is dropped.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 30 * 24 * 3600,
+        negative_ttl: float = 600,
+        path: str | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[str, float]] = {}
+        self._keys_by_puuid: dict[str, str] = {}
+        if path:
+            self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                raw = json.load(fh)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read PUUID cache %s: %s", self.path, e)
+            return
+        now = self._clock()
+        for key, (puuid, expires_at) in raw.items():
+            if expires_at > now:
+                self._entries[key] = (puuid, expires_at)
+                if puuid != UNKNOWN_RIOT_ID:
+                    self._keys_by_puuid[puuid] = key
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(self._entries, fh)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not write PUUID cache %s: %s", self.path, e)
+
+    def get(self, game_name: str, tag_line: str) -> str | None:
+        """Return the cached PUUID, UNKNOWN_RIOT_ID for a cached miss, or None if not cached."""
+        key = riot_id_key(game_name, tag_line)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            puuid, expires_at = entry
+            if expires_at <= self._clock():
+                self._drop(key)
+                return None
+            return puuid
+
+    def put(self, game_name: str, tag_line: str, puuid: str) -> None:
+        """Cache a successful resolution, invalidating any older Riot ID of the same account."""
+        key = riot_id_key(game_name, tag_line)
+        with self._lock:
+            previous_key = self._keys_by_puuid.get(puuid)
+            if previous_key is not None and previous_key != key:
+                self._drop(previous_key)
+            self._drop(key)
+            self._entries[key] = (puuid, self._clock() + self.ttl)
+            self._keys_by_puuid[puuid] = key
+            self._save()
+
+    def put_unknown(self, game_name: str, tag_line: str) -> None:
+        """Cache the fact that a Riot ID does not exist, for the negative TTL."""
+        key = riot_id_key(game_name, tag_line)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (UNKNOWN_RIOT_ID, self._clock() + self.negative_ttl)
+            self._save()
+
+    def invalidate(self, game_name: str, tag_line: str) -> None:
+        """Forget a Riot ID, e.g. after learning it was renamed or reassigned."""
+        with self._lock:
+            self._drop(riot_id_key(game_name, tag_line))
+            self._save()
+
+    def invalidate_puuid(self, puuid: str) -> None:
+        """Forget whichever Riot ID currently maps to *puuid*."""
+        with self._lock:
+            key = self._keys_by_puuid.get(puuid)
+            if key is not None:
+                self._drop(key)
+                self._save()
+
+    def observe(self, puuid: str, game_name: str, tag_line: str, seen_at: float) -> bool:
+        """Forget the cached Riot ID of *puuid* if a game played at *seen_at* shows another one.
+
+        Match participants carry the Riot ID a player had in that game, so a
+        different one seen after the entry was cached means the account was
+        renamed. Returns whether an entry was dropped.
+        """
+        key = riot_id_key(game_name, tag_line)
+        with self._lock:
+            cached_key = self._keys_by_puuid.get(puuid)
+            if cached_key is None or cached_key == key:
+                return False
+            cached_at = self._entries[cached_key][1] - self.ttl
+            if seen_at <= cached_at:
+                # The game predates the resolution; its Riot ID may be the older one.
+                return False
+            self._drop(cached_key)
+            self._save()
+        return True
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None and self._keys_by_puuid.get(entry[0]) == key:
+            del self._keys_by_puuid[entry[0]]
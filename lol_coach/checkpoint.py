@@ -0,0 +1,93 @@
+import json
+import logging
+import os
+import threading
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(".cache", "checkpoints")
+
+logger = logging.getLogger(__name__)
+
+
+class ExportJournal:
+    """Append-only NDJSON journal of the matches an export run has finished.
+
+    The first line holds the run's parameters (e.g. the match IDs it set out
+    to export); every following line is one finished match with the records
+    extracted for the exported players. Lines are flushed as they are written,
+    so a crash, Ctrl-C or expired key loses at most the match in progress.
+    Matches whose fetch failed are not journaled and are retried on resume.
+    """
+
+    def __init__(self, path: str, resume: bool = False) -> None:
+        self.path = path
+        self.run: dict = {}
+        self._matches: dict[str, dict[str, dict]] = {}
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if resume and os.path.exists(path):
+            self._load()
+            self._fh = open(path, "a", encoding="utf-8", buffering=1)
+            if self._fh.tell() and not self._ends_with_newline():
+                # Terminate a torn last line so the next entry starts on a line of its own.
+                self._fh.write("\n")
+        else:
+            self._fh = open(path, "w", encoding="utf-8", buffering=1)
+
+    def _load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The run may have been killed halfway through its last line.
+                    logger.warning("Skipping unreadable line in %s", self.path)
+                    continue
+                if "run" in entry:
+                    self.run = entry["run"]
+                else:
+                    self._matches[entry["match_id"]] = entry["records"]
+        logger.info("Resuming from %s: %d matches already done.", self.path, len(self._matches))
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as fh:
+            fh.seek(-1, os.SEEK_END)
+            return fh.read(1) == b"\n"
+
+    def _write(self, entry: dict) -> None:
+        with self._lock:
+            self._fh.write(json.dumps(entry, ensure_ascii=True, separators=(",", ":")) + "\n")
+
+    def start(self, **run) -> None:
+        """Record the parameters of a new run."""
+        self.run = run
+        self._write({"run": run})
+
+    def __contains__(self, match_id: str) -> bool:
+        return match_id in self._matches
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    def add(self, match_id: str, records: dict[str, dict]) -> None:
+        """Mark *match_id* as finished with its *records* by PUUID (empty for a match without any)."""
+        self._matches[match_id] = records
+        self._write({"match_id": match_id, "records": records})
+
+    def records(self, match_id: str) -> dict[str, dict]:
+        """Return the journaled records of *match_id* by PUUID."""
+        return self._matches.get(match_id, {})
+
+    def get(self, match_id: str, puuid: str) -> dict | None:
+        return self._matches.get(match_id, {}).get(puuid)
+
+    def close(self) -> None:
+        with self._lock:
+            self._fh.close()
+
+    def discard(self) -> None:
+        """Close and delete the journal once the export it covers has completed."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,174 @@
+import os
+import shutil
+from collections.abc import Iterable, Sequence
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+from .lobby import RECORD_COLUMNS, RECORD_KINDS
+from .record_table import RecordTable
+
+DEFAULT_DATASET_ROOT = "dataset"
+PARTITION_KEYS = ("date", "patch")
+
+_ARROW_TYPES = {
+    "int": pa.int64(),
+    "float": pa.float64(),
+    "bool": pa.bool_(),
+    "str": pa.string(),
+}
+_PY_TYPES = {"int": int, "float": float, "bool": bool, "str": str}
+
+RECORD_SCHEMA = pa.schema(
+    [pa.field(name, _ARROW_TYPES[RECORD_KINDS[name]]) for name in RECORD_COLUMNS]
+    + [pa.field("player", pa.string()), pa.field("date", pa.string())]
+)
+
+# Partition values are always read back as strings, never inferred (e.g. patch "14.10" as a float).
+_PARTITIONING = ds.HivePartitioning.discover(
+    schema=pa.schema([("player", pa.string()), ("date", pa.string()), ("patch", pa.string())])
+)
+
+
+def game_date(game_start_ms: int) -> str:
+    """Return the UTC calendar date (YYYY-MM-DD) of a game start timestamp in milliseconds."""
+    return datetime.fromtimestamp(game_start_ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def player_key(game_name: str, tag_line: str) -> str:
+    """Return the partition value identifying a player in the dataset."""
+    return f"{game_name}_{tag_line}"
+
+
+def records_to_table(records: Sequence[dict], player: str) -> pa.Table:
+    """Convert records to an Arrow table typed by the record schema."""
+    columns = {}
+    for name in RECORD_COLUMNS:
+        cast = _PY_TYPES[RECORD_KINDS[name]]
+        columns[name] = pa.array(
+            [None if (value := record.get(name)) is None else cast(value) for record in records],
+            type=_ARROW_TYPES[RECORD_KINDS[name]],
+        )
+    columns["player"] = pa.array([player] * len(records), type=pa.string())
+    columns["date"] = pa.array([game_date(record.get("game_start") or 0) for record in records], type=pa.string())
+    return pa.table(columns, schema=RECORD_SCHEMA)
+
+
+def record_table_to_arrow(table: RecordTable, player: str) -> pa.Table:
+    """Convert a RecordTable to an Arrow table typed by the record schema, without going through dicts."""
+    days = table.column("game_start").astype("datetime64[ms]").astype("datetime64[D]")
+    arrow = table.to_arrow()
+    arrow = arrow.append_column("player", pa.array([player] * len(table), type=pa.string()))
+    arrow = arrow.append_column("date", pa.array(days.astype(str), type=pa.string()))
+    return arrow.select(RECORD_SCHEMA.names).cast(RECORD_SCHEMA)
+
+
+class ParquetRecordWriter:
+    """Write records for one player into a hive-partitioned Parquet dataset.
+
+    Files land under ``<root>/player=<player>/<partition>=<value>/`` where the
+    second level is the game date or the patch. Records are buffered into
+    row groups of *batch_size*, so memory stays bounded while streaming. The
+    player's previous partition is replaced on open.
+    """
+
+    def __init__(self, root: str, player: str, partition_by: str = "date", batch_size: int = 1000) -> None:
+        if partition_by not in PARTITION_KEYS:
+            raise ValueError(f"Unsupported partition key: {partition_by}")
+        self.root = root
+        self.player = player
+        self.partition_by = partition_by
+        self.batch_size = batch_size
+        self._buffer: list[dict] = []
+        player_dir = os.path.join(root, f"player={player}")
+        if os.path.isdir(player_dir):
+            shutil.rmtree(player_dir)
+
+    def write(self, record: dict) -> None:
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_table(self, table: RecordTable) -> None:
+        """Write a whole RecordTable at once, after any buffered records."""
+        self.flush()
+        if len(table):
+            self._write_arrow(record_table_to_arrow(table, self.player))
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        self._write_arrow(records_to_table(self._buffer, self.player))
+        self._buffer = []
+
+    def _write_arrow(self, table: pa.Table) -> None:
+        pq.write_to_dataset(table, root_path=self.root, partition_cols=["player", self.partition_by])
+
+    def close(self) -> None:
+        self.flush()
+
+
+def write_parquet_dataset(
+    records: Iterable[dict] | RecordTable,
+    root: str,
+    player: str,
+    partition_by: str = "date",
+) -> int:
+    """Write *records* for *player* into the dataset at *root*; return how many were written."""
+    writer = ParquetRecordWriter(root, player, partition_by=partition_by)
+    count = 0
+    try:
+        if isinstance(records, RecordTable):
+            writer.write_table(records)
+            count = len(records)
+        else:
+            for record in records:
+                writer.write(record)
+                count += 1
+    finally:
+        writer.close()
+    return count
+
+
+def open_dataset(root: str = DEFAULT_DATASET_ROOT) -> ds.Dataset:
+    """Open the Parquet dataset at *root*, memory-mapping its files instead of reading them."""
+    return ds.dataset(
+        root,
+        schema=RECORD_SCHEMA,
+        format="parquet",
+        partitioning=_PARTITIONING,
+        filesystem=pafs.LocalFileSystem(use_mmap=True),
+    )
+
+
+def read_dataset(
+    root: str = DEFAULT_DATASET_ROOT,
+    columns: Sequence[str] | None = None,
+    players: Sequence[str] | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    patches: Sequence[str] | None = None,
+) -> pa.Table:
+    """Load only *columns* of the matching rows from the dataset.
+
+    *players*, *since*/*until* (inclusive ``YYYY-MM-DD`` dates) and *patches*
+    are pushed down to the scan, so non-matching partitions and row groups
+    are never read. Use ``.to_pandas()`` on the result for a DataFrame.
+    """
+    dataset = open_dataset(root)
+    filters = []
+    if players:
+        filters.append(ds.field("player").isin(list(players)))
+    if since:
+        filters.append(ds.field("date") >= since)
+    if until:
+        filters.append(ds.field("date") <= until)
+    if patches:
+        filters.append(ds.field("patch").isin(list(patches)))
+    condition = None
+    for expression in filters:
+        condition = expression if condition is None else condition & expression
+    return dataset.to_table(columns=list(columns) if columns else None, filter=condition)
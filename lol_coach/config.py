@@ -1,8 +1,15 @@
 import os
 
-from dotenv import load_dotenv
 
-load_dotenv()
+def load_env(path: str | None = None) -> bool:
+    """Load a .env file (by default the nearest one) into the environment; existing variables win.
+
+    Returns whether a file was loaded. Entry points call this explicitly, so
+    importing the package never touches the environment.
+    """
+    from dotenv import load_dotenv
+
+    return load_dotenv(path)
 
 
 def get_required_env_var(name: str) -> str:
@@ -27,3 +34,11 @@ def get_int_env_var(name: str, default: int) -> int:
 def get_optional_env_var(name: str, default: str = "") -> str:
     """Return an optional environment variable, falling back to *default*."""
     return os.getenv(name, default) or default
+
+
+def get_bool_env_var(name: str, default: bool = False) -> bool:
+    """Return an environment variable as a boolean ("1", "true", "yes", "on"), falling back to *default*."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
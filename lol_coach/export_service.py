@@ -1,77 +1,384 @@
+import csv
+import json
+import logging
+import os
 import time
+from collections import deque
+from collections.abc import Callable, Collection, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import chain
+from typing import TYPE_CHECKING
 
-import pandas as pd
-from py_toon_format import encode
+from .checkpoint import ExportJournal
+from .lobby import RECORD_COLUMNS, LobbyIndex, build_lobby_records
+from .metrics import METRICS
+from .riot_api import RiotClient
+from .timeline import MatchTimeline
 
-from .match_processing import build_game_record, find_player_participant
-from .riot_api import fetch_match_info
+if TYPE_CHECKING:
+    from .record_table import RecordTable
+
+logger = logging.getLogger(__name__)
 
 
 def process_match(
     match_id: str,
+    info: dict | None,
     index: int,
     total_matches: int,
-    puuid: str,
-    headers: dict,
-    region_routing: str = "europe",
-) -> dict | None:
-    """Fetch and process a single match; return a stats record or None on failure."""
-    print(f"Processing match {index}/{total_matches}: {match_id}")
-    info = fetch_match_info(match_id, headers, region_routing=region_routing)
+    timeline: MatchTimeline | None = None,
+) -> dict[str, dict] | None:
+    """Extract every participant of a fetched match; return the lobby records or None on failure."""
+    logger.info("Processing match %d/%d: %s", index, total_matches, match_id)
     if info is None:
         return None
 
-    participant = find_player_participant(info, puuid)
-    if participant is None:
-        return None
-
-    duration = info.get("gameDuration")
-    if not duration:
+    if not info.get("gameDuration"):
         return None
 
     try:
-        return build_game_record(participant, duration)
+        with METRICS.timer("extraction"):
+            return build_lobby_records(match_id, info, timeline)
     except (KeyError, TypeError, ValueError) as e:
-        print(f"  Error processing participant data for match {match_id}: {e}")
+        logger.warning("Error processing match %s: %s", match_id, e)
         return None
 
 
+def iter_games_data(
+    match_ids: list[str],
+    puuid: str,
+    client: RiotClient,
+    lobby_index: LobbyIndex | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+    with_timelines: bool = False,
+    journal: ExportJournal | None = None,
+    on_lobby: Callable[[str, dict[str, dict]], None] | None = None,
+) -> Iterator[dict]:
+    """Yield the stats records of *puuid* for *match_ids*, newest first, as they are fetched.
+
+    Matches already in *lobby_index* (e.g. extracted for a teammate) are served
+    without a fetch or parse, and newly extracted lobbies are added to it.
+    Without an index nothing is retained, so memory does not grow with the
+    number of matches. *on_progress* is called with (processed, total) after
+    every fetched match. With *with_timelines*, each match's timeline is also
+    fetched to fill the laning diffs at 10 and 15 minutes. Matches already in
+    *journal* are replayed from it, and every newly fetched one is added to it.
+    *on_lobby* receives (match_id, records by PUUID) for every newly extracted
+    lobby, e.g. to feed a PercentileIndex.
+    """
+    missing = [
+        match_id
+        for match_id in match_ids
+        if (lobby_index is None or match_id not in lobby_index) and (journal is None or match_id not in journal)
+    ]
+    missing_ids = set(missing)
+    if with_timelines:
+        fetched = client.fetch_match_details(missing)
+    else:
+        fetched = ((match_id, info, None) for match_id, info in client.fetch_match_infos(missing))
+    index = 0
+
+    for match_id in match_ids:
+        if match_id in missing_ids:
+            _, info, timeline = next(fetched)
+            index += 1
+            lobby = process_match(match_id, info, index, len(missing), timeline)
+            if on_progress is not None:
+                on_progress(index, len(missing))
+            if journal is not None and info is not None:
+                journal.add(match_id, {puuid: lobby[puuid]} if lobby and puuid in lobby else {})
+            if lobby is None:
+                continue
+            if on_lobby is not None:
+                on_lobby(match_id, lobby)
+            if lobby_index is not None:
+                lobby_index.add(match_id, lobby)
+            record = lobby.get(puuid)
+        elif journal is not None and match_id in journal:
+            record = journal.get(match_id, puuid)
+        else:
+            METRICS.incr("cache_hits", cache="lobby")
+            record = lobby_index.get(match_id, puuid)
+        if record is not None:
+            yield record
+
+
 def collect_games_data(
     match_ids: list[str],
     puuid: str,
-    headers: dict,
-    region_routing: str = "europe",
-    sleep_seconds: float = 1.5,
+    client: RiotClient,
+    lobby_index: LobbyIndex | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+    with_timelines: bool = False,
+    on_lobby: Callable[[str, dict[str, dict]], None] | None = None,
 ) -> list[dict]:
-    """Process all matches and return a list of stats records."""
-    games_data: list[dict] = []
-    total_matches = len(match_ids)
+    """Return the stats records of *puuid* for *match_ids*, newest first."""
+    return list(
+        iter_games_data(match_ids, puuid, client, lobby_index, on_progress, with_timelines, on_lobby=on_lobby)
+    )
+
+
+def collect_games_table(
+    match_ids: list[str],
+    puuid: str,
+    client: RiotClient,
+    lobby_index: LobbyIndex | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+    with_timelines: bool = False,
+) -> "RecordTable":
+    """Like collect_games_data, but return the records as a compact RecordTable."""
+    # numpy is only loaded when a table is requested.
+    from .record_table import RecordTable
+
+    return RecordTable.from_records(
+        iter_games_data(match_ids, puuid, client, lobby_index, on_progress, with_timelines)
+    )
+
+
+def _extract_roster_records(
+    match_id: str,
+    info: dict | None,
+    timeline: MatchTimeline | None,
+    index: int,
+    total_matches: int,
+    puuids: frozenset[str] | None,
+) -> tuple[dict[str, dict], float]:
+    # Runs in a worker process; only the roster's records (all ten with puuids=None) and the time are sent back.
+    start = time.perf_counter()
+    lobby = process_match(match_id, info, index, total_matches, timeline) or {}
+    if puuids is not None:
+        lobby = {puuid: record for puuid, record in lobby.items() if puuid in puuids}
+    return lobby, time.perf_counter() - start
+
+
+def collect_roster_records(
+    match_ids: list[str],
+    puuids: Collection[str],
+    client: RiotClient,
+    processes: int | None = None,
+    with_timelines: bool = False,
+    journal: ExportJournal | None = None,
+    on_lobby: Callable[[str, dict[str, dict]], None] | None = None,
+) -> dict[str, dict[str, dict]]:
+    """Fetch and extract every match once for a whole roster; return records by match ID, then PUUID.
+
+    *match_ids* should be the union of the players' match lists, so a match
+    shared by several players costs one fetch and one parse. Fetching stays on
+    the client's thread pool while extraction runs in *processes* worker
+    processes (default: one per CPU), with a bounded number of matches in
+    flight. Matches already in *journal* are taken from it instead, and every
+    newly fetched one is added to it. With *on_lobby*, workers send back all
+    ten records of each match so it can be called as in iter_games_data.
+    """
+    roster = frozenset(puuids)
+    processes = processes or os.cpu_count() or 1
+    records: dict[str, dict[str, dict]] = {}
+    if journal is not None:
+        for match_id in match_ids:
+            if match_id in journal and journal.records(match_id):
+                records[match_id] = journal.records(match_id)
+        match_ids = [match_id for match_id in match_ids if match_id not in journal]
+    if with_timelines:
+        fetched = client.fetch_match_details(match_ids)
+    else:
+        fetched = ((match_id, info, None) for match_id, info in client.fetch_match_infos(match_ids))
+
+    pending: deque[tuple[str, bool, Future]] = deque()
+
+    def collect_next() -> None:
+        match_id, was_fetched, future = pending.popleft()
+        lobby, seconds = future.result()
+        # Worker processes have their own registry, so their timings are recorded here.
+        METRICS.observe("extraction", seconds)
+        if on_lobby is not None:
+            if lobby:
+                on_lobby(match_id, lobby)
+            lobby = {puuid: record for puuid, record in lobby.items() if puuid in roster}
+        if journal is not None and was_fetched:
+            journal.add(match_id, lobby)
+        if lobby:
+            records[match_id] = lobby
+
+    window = processes * 2
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for index, (match_id, info, timeline) in enumerate(fetched, start=1):
+            pending.append(
+                (
+                    match_id,
+                    info is not None,
+                    pool.submit(
+                        _extract_roster_records,
+                        match_id,
+                        info,
+                        timeline,
+                        index,
+                        len(match_ids),
+                        None if on_lobby is not None else roster,
+                    ),
+                )
+            )
+            if len(pending) >= window:
+                collect_next()
+        while pending:
+            collect_next()
+    return records
 
-    for index, match_id in enumerate(match_ids, start=1):
-        record = process_match(match_id, index, total_matches, puuid, headers, region_routing=region_routing)
-        if record is not None:
-            games_data.append(record)
-        time.sleep(sleep_seconds)
 
-    return games_data
+def export_base_name(game_name: str, tag_line: str) -> str:
+    """Return the file name stem shared by every export of a Riot ID."""
+    return f"recent_games_{game_name}_{tag_line}"
 
 
-def export_tabular_files(games_data: list[dict], game_name: str, tag_line: str) -> None:
-    """Export match data as CSV and JSON files."""
-    base_name = f"recent_games_{game_name}_{tag_line}"
-    df = pd.DataFrame(games_data)
-    df.to_csv(f"{base_name}.csv", index=False)
-    df.to_json(f"{base_name}.json", orient="records", indent=2)
+class CsvRecordWriter:
+    """Append records to a CSV file as they arrive, one flushed line per record."""
+
+    def __init__(self, path: str) -> None:
+        self._fh = open(path, "w", encoding="utf-8", newline="", buffering=1)
+        self._writer = csv.DictWriter(self._fh, fieldnames=RECORD_COLUMNS, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, record: dict) -> None:
+        self._writer.writerow(record)
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class NdjsonRecordWriter:
+    """Append records to a newline-delimited JSON file as they arrive."""
+
+    def __init__(self, path: str) -> None:
+        self._fh = open(path, "w", encoding="utf-8", buffering=1)
+
+    def write(self, record: dict) -> None:
+        self._fh.write(json.dumps(record, ensure_ascii=True, separators=(",", ":")) + "\n")
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+RECORD_FORMATS = ("csv", "ndjson", "parquet")
+
+
+def open_record_writer(
+    fmt: str,
+    game_name: str,
+    tag_line: str,
+    dataset_root: str = "dataset",
+    partition_by: str = "date",
+):
+    """Open the incremental writer for *fmt*; every writer exposes write(record) and close()."""
+    base_name = export_base_name(game_name, tag_line)
+    if fmt == "csv":
+        return CsvRecordWriter(f"{base_name}.csv")
+    if fmt == "ndjson":
+        return NdjsonRecordWriter(f"{base_name}.ndjson")
+    if fmt == "parquet":
+        # pyarrow is only required when the columnar output is requested.
+        from .columnar import ParquetRecordWriter, player_key
+
+        return ParquetRecordWriter(dataset_root, player_key(game_name, tag_line), partition_by=partition_by)
+    raise ValueError(f"Unsupported export format: {fmt}")
+
+
+def export_records(
+    records: Iterable[dict],
+    game_name: str,
+    tag_line: str,
+    formats: Iterable[str] = ("csv", "ndjson"),
+    dataset_root: str = "dataset",
+    partition_by: str = "date",
+) -> int:
+    """Stream *records* into one incremental writer per format; return how many were written.
+
+    Each record reaches disk as soon as it is produced (Parquet: per row
+    group), so an interrupted run keeps everything exported so far and memory
+    use does not depend on the number of games.
+    """
+    writers = [
+        open_record_writer(fmt, game_name, tag_line, dataset_root, partition_by)
+        for fmt in formats
+        if fmt in RECORD_FORMATS
+    ]
+    count = 0
+    try:
+        for record in records:
+            for writer in writers:
+                writer.write(record)
+            count += 1
+    finally:
+        for writer in writers:
+            writer.close()
+    return count
+
+
+def read_exported_games(path: str) -> Iterator[dict]:
+    """Stream the records of an NDJSON export, newest first."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A run interrupted mid-write can leave a truncated last line.
+                logger.warning("Skipping unreadable line in %s", path)
+
+
+def set_aside_previous_export(game_name: str, tag_line: str) -> str | None:
+    """Move the previous NDJSON export out of the way of new writers and return its new path.
+
+    If an earlier incremental run was interrupted, the copy it set aside is
+    still the last complete export, so it is reused rather than overwritten.
+    """
+    path = f"{export_base_name(game_name, tag_line)}.ndjson"
+    previous = f"{path}.prev"
+    if os.path.exists(previous):
+        return previous
+    if os.path.exists(path):
+        os.replace(path, previous)
+        return previous
+    return None
+
+
+def newest_known_match_id(path: str | None) -> str | None:
+    """Return the match ID of the newest record in an NDJSON export, or None."""
+    if path is None:
+        return None
+    return next((record.get("match_id") for record in read_exported_games(path)), None)
+
+
+def merge_games_data(
+    new_games: Iterable[dict], existing_games: Iterable[dict], total_games: int
+) -> Iterator[dict]:
+    """Yield *new_games* then *existing_games*, dropping duplicates and stopping after *total_games*."""
+    seen: set[str] = set()
+    remaining = total_games
+    for record in chain(new_games, existing_games):
+        if remaining <= 0:
+            return
+        match_id = record.get("match_id")
+        if match_id is not None:
+            if match_id in seen:
+                continue
+            seen.add(match_id)
+        remaining -= 1
+        yield record
 
 
 def export_toon_file(games_data: list[dict], game_name: str, tag_line: str) -> None:
     """Export match data in TOON format for compact LLM context usage."""
+    from py_toon_format import encode
+
     try:
         toon = encode(games_data)
         if isinstance(toon, str):
             toon = toon.encode("utf-8")
-        with open(f"recent_games_{game_name}_{tag_line}.txt", "wb") as fh:
+        with open(f"{export_base_name(game_name, tag_line)}.txt", "wb") as fh:
             fh.write(toon)
-        print("Toon format export successful.")
+        logger.info("Toon format export successful.")
     except (ValueError, TypeError, OSError, UnicodeEncodeError) as e:
-        print(f"Warning: Could not export toon format: {e}")
+        logger.warning("Could not export toon format: %s", e)
@@ -0,0 +1,134 @@
+import asyncio
+from collections import Counter, OrderedDict, deque
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+
+class JobRejectedError(Exception):
+    """Raised with a user-facing message when the scheduler refuses a job."""
+
+
+@dataclass
+class _Job:
+    user_id: Hashable
+    run: Callable[[], Awaitable[Any]]
+    future: asyncio.Future = field(repr=False)
+
+
+class JobScheduler:
+    """Bounded async worker pool with per-guild round-robin and per-user caps.
+
+    At most *workers* jobs run at once. Waiting jobs are queued per guild and
+    served round-robin across guilds, so one busy server cannot starve the
+    others. A user may have at most *max_per_user* jobs queued or running, and
+    submissions beyond *max_queued* waiting jobs are rejected outright.
+    """
+
+    def __init__(self, workers: int = 2, max_queued: int = 20, max_per_user: int = 1) -> None:
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_per_user = max_per_user
+        self._queues: OrderedDict[Hashable, deque[_Job]] = OrderedDict()
+        self._queued = 0
+        self._running = 0
+        self._per_user: Counter = Counter()
+        self._ready = asyncio.Semaphore(0)
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop."""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(
+        self,
+        guild_id: Hashable,
+        user_id: Hashable,
+        run: Callable[[], Awaitable[Any]],
+        on_queued: Callable[[int], None] | None = None,
+    ) -> asyncio.Future:
+        """Queue *run* and return a future of its result.
+
+        Admission is decided before this returns: JobRejectedError is raised
+        right away when the queue or the user's quota is full, so a caller can
+        share the returned future knowing the job was accepted. *on_queued* is
+        called with the number of jobs ahead of this one when it has to wait.
+        """
+        if self._per_user[user_id] >= self.max_per_user:
+            raise JobRejectedError("You already have a coaching request in progress. Please wait for it to finish.")
+        if self._queued >= self.max_queued:
+            raise JobRejectedError(
+                f"The coach is busy ({self._queued} requests waiting). Please try again in a few minutes."
+            )
+
+        job = _Job(user_id, run, asyncio.get_running_loop().create_future())
+        self._queues.setdefault(guild_id, deque()).append(job)
+        self._queued += 1
+        self._per_user[user_id] += 1
+        job.future.add_done_callback(lambda _: self._release(user_id))
+        if on_queued is not None and self._running + self._queued > self.workers:
+            on_queued(self._queued - 1)
+        self._ready.release()
+        return job.future
+
+    async def submit(
+        self,
+        guild_id: Hashable,
+        user_id: Hashable,
+        run: Callable[[], Awaitable[Any]],
+        on_queued: Callable[[int], None] | None = None,
+    ) -> Any:
+        """Queue *run* and return its result once a worker has executed it (see enqueue())."""
+        return await self.enqueue(guild_id, user_id, run, on_queued)
+
+    def _release(self, user_id: Hashable) -> None:
+        self._per_user[user_id] -= 1
+        if self._per_user[user_id] <= 0:
+            del self._per_user[user_id]
+
+    def _pop_next(self) -> _Job:
+        guild_id, queue = next(iter(self._queues.items()))
+        job = queue.popleft()
+        if queue:
+            self._queues.move_to_end(guild_id)
+        else:
+            del self._queues[guild_id]
+        self._queued -= 1
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            await self._ready.acquire()
+            job = self._pop_next()
+            if job.future.done():
+                # The submitter gave up while the job was waiting.
+                continue
+            self._running += 1
+            try:
+                result = await job.run()
+            except asyncio.CancelledError:
+                job.future.cancel()
+                raise
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self._running -= 1
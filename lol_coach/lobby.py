@@ -0,0 +1,164 @@
+import logging
+import threading
+from collections import OrderedDict
+
+from .match_processing import build_game_record
+from .record_schema import GAME_RECORD_COLUMNS, GAME_RECORD_KINDS
+from .timeline import LANING_COLUMNS, LANING_KINDS, MatchTimeline
+
+logger = logging.getLogger(__name__)
+
+# Match-level fields shared by the ten records of a lobby.
+MATCH_KINDS: dict[str, str] = {
+    "match_id": "str",
+    "game_start": "int",
+    "patch": "str",
+    "queue_id": "int",
+}
+
+LOBBY_KINDS: dict[str, str] = {
+    "team_damage_share": "float",
+    "team_gold_share": "float",
+    "team_kill_share": "float",
+    "lane_opponent": "str",
+    "lane_gold_diff": "int",
+    "lane_xp_diff": "int",
+    "lane_cs_diff": "int",
+    "lane_damage_diff": "int",
+}
+LOBBY_COLUMNS: tuple[str, ...] = tuple(LOBBY_KINDS)
+
+# Column order and types of every record produced by the lobby pipeline.
+RECORD_COLUMNS: tuple[str, ...] = (*MATCH_KINDS, *GAME_RECORD_COLUMNS, *LOBBY_COLUMNS, *LANING_COLUMNS)
+RECORD_KINDS: dict[str, str] = {**MATCH_KINDS, **GAME_RECORD_KINDS, **LOBBY_KINDS, **LANING_KINDS}
+
+
+def _share(value: float, total: float) -> float:
+    return round(value / total, 3) if total else 0.0
+
+
+def patch_from_version(game_version: str) -> str:
+    """Return the patch ("14.3") of a full game version string ("14.3.555.1234")."""
+    return ".".join(game_version.split(".")[:2])
+
+
+def _lane_opponent(
+    by_position: dict[tuple[int, str], tuple[dict, dict]], team_id: int, position: str
+) -> tuple[dict, dict] | None:
+    if not position:
+        return None
+    for (other_team, other_position), player in by_position.items():
+        if other_team != team_id and other_position == position:
+            return player
+    return None
+
+
+def build_lobby_records(match_id: str, info: dict, timeline: MatchTimeline | None = None) -> dict[str, dict]:
+    """Extract a record for every participant of a match in one pass, keyed by PUUID.
+
+    Besides the per-player fields, each record gets its share of the team's
+    damage, gold and kills, and its gold/XP/CS/damage difference with the
+    opponent holding the same position on the other team, at the end of the
+    game and, when *timeline* is given, at 10 and 15 minutes.
+    """
+    duration = info["gameDuration"]
+    match_fields = {
+        "match_id": match_id,
+        "game_start": info.get("gameStartTimestamp") or info.get("gameCreation", 0),
+        "patch": patch_from_version(info.get("gameVersion", "")),
+        "queue_id": info.get("queueId", 0),
+    }
+    players: list[tuple[dict, dict]] = []
+    for participant in info.get("participants", []):
+        try:
+            record = build_game_record(participant, duration)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning("Error processing participant data for match %s: %s", match_id, e)
+            continue
+        players.append((participant, {**match_fields, **record}))
+
+    team_totals: dict[int, list[float]] = {}
+    by_position: dict[tuple[int, str], tuple[dict, dict]] = {}
+    for participant, record in players:
+        team_id = participant.get("teamId", 0)
+        totals = team_totals.setdefault(team_id, [0, 0, 0])
+        totals[0] += record["damage_dealt"]
+        totals[1] += record["gold"]
+        totals[2] += record["kills"]
+        if record["team_position"]:
+            by_position[(team_id, record["team_position"])] = (participant, record)
+
+    lobby: dict[str, dict] = {}
+    for participant, record in players:
+        team_id = participant.get("teamId", 0)
+        damage, gold, kills = team_totals[team_id]
+        record["team_damage_share"] = _share(record["damage_dealt"], damage)
+        record["team_gold_share"] = _share(record["gold"], gold)
+        record["team_kill_share"] = _share(record["kills"], kills)
+
+        puuid = participant.get("puuid")
+        record.update(dict.fromkeys(LANING_COLUMNS, 0))
+        opponent = _lane_opponent(by_position, team_id, record["team_position"])
+        if opponent is None:
+            record["lane_opponent"] = ""
+            record["lane_gold_diff"] = record["lane_xp_diff"] = 0
+            record["lane_cs_diff"] = record["lane_damage_diff"] = 0
+        else:
+            opponent_participant, opponent = opponent
+            record["lane_opponent"] = opponent["champion"]
+            record["lane_gold_diff"] = record["gold"] - opponent["gold"]
+            record["lane_xp_diff"] = record["champ_experience"] - opponent["champ_experience"]
+            record["lane_cs_diff"] = record["cs"] - opponent["cs"]
+            record["lane_damage_diff"] = record["damage_dealt"] - opponent["damage_dealt"]
+            if timeline is not None:
+                record.update(timeline.laning_diffs(puuid, opponent_participant.get("puuid")))
+
+        if puuid:
+            lobby[puuid] = record
+    return lobby
+
+
+class LobbyIndex:
+    """Thread-safe LRU index of extracted lobby records keyed by (match_id, puuid).
+
+    Once a match has been parsed for one player, every other participant of
+    that lobby is served from memory without a new fetch or parse.
+    """
+
+    def __init__(self, max_matches: int = 1000) -> None:
+        self.max_matches = max_matches
+        self._lock = threading.Lock()
+        self._lobbies: OrderedDict[str, dict[str, dict]] = OrderedDict()
+
+    def __contains__(self, match_id: str) -> bool:
+        with self._lock:
+            return match_id in self._lobbies
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._lobbies)
+
+    def add(self, match_id: str, lobby: dict[str, dict]) -> None:
+        """Store the records of a whole lobby, evicting the least recently used lobbies."""
+        with self._lock:
+            self._lobbies[match_id] = lobby
+            self._lobbies.move_to_end(match_id)
+            while len(self._lobbies) > self.max_matches:
+                self._lobbies.popitem(last=False)
+
+    def get(self, match_id: str, puuid: str) -> dict | None:
+        """Return the record of *puuid* in *match_id*, or None if unknown."""
+        with self._lock:
+            lobby = self._lobbies.get(match_id)
+            if lobby is None:
+                return None
+            self._lobbies.move_to_end(match_id)
+            return lobby.get(puuid)
+
+    def lobby(self, match_id: str) -> dict[str, dict] | None:
+        """Return every record of *match_id* keyed by PUUID, or None if unknown."""
+        with self._lock:
+            lobby = self._lobbies.get(match_id)
+            if lobby is not None:
+                self._lobbies.move_to_end(match_id)
+            return lobby
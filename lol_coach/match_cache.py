@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "matches.sqlite3")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    match_id TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    queue_id INTEGER,
+    game_start INTEGER
+);
+CREATE INDEX IF NOT EXISTS matches_last_access ON matches (last_access);
+"""
+
+
+class MatchCache:
+    """SQLite store of finished match-v5 payloads keyed by match ID.
+
+    Payloads are stored zlib-compressed. Once the database holds more than
+    *max_bytes*, the least recently read matches are evicted; the size is
+    read from the file itself, so processes sharing it evict against their
+    combined writes. Each match's queue and start time are also kept
+    uncompressed, so match IDs can be filtered without reading payloads.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(matches)")}
+        for column in ("queue_id", "game_start"):
+            if column not in columns:
+                # Caches created before the metadata columns existed report those matches as unknown.
+                self._conn.execute(f"ALTER TABLE matches ADD COLUMN {column} INTEGER")
+        self._conn.commit()
+
+    def get(self, match_id: str) -> dict | None:
+        """Return the cached payload for *match_id*, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM matches WHERE match_id = ?", (match_id,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE matches SET last_access = ? WHERE match_id = ?", (time.time(), match_id))
+            self._conn.commit()
+        try:
+            return json.loads(zlib.decompress(row[0]))
+        except (zlib.error, ValueError):
+            self.delete(match_id)
+            return None
+
+    def put(self, match_id: str, payload: dict) -> None:
+        """Store *payload* under *match_id*, evicting old entries if over budget."""
+        blob = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        info = payload.get("info") or {}
+        game_start = info.get("gameStartTimestamp") or info.get("gameCreation")
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO matches"
+                " (match_id, payload, size, fetched_at, last_access, queue_id, game_start)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (match_id, blob, len(blob), now, now, info.get("queueId"), game_start),
+            )
+            # Measured inside the insert's write transaction, so no other process can change it meanwhile.
+            used = self._used_bytes()
+            if used > self.max_bytes:
+                self._evict(used)
+            self._conn.commit()
+
+    def metadata(self, match_ids: list[str]) -> dict[str, tuple[int | None, int | None]]:
+        """Return (queue_id, game_start) for the cached matches among *match_ids*."""
+        found: dict[str, tuple[int | None, int | None]] = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit.
+            for offset in range(0, len(match_ids), 500):
+                chunk = match_ids[offset : offset + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                for match_id, queue_id, game_start in self._conn.execute(
+                    f"SELECT match_id, queue_id, game_start FROM matches WHERE match_id IN ({placeholders})", chunk
+                ):
+                    found[match_id] = (queue_id, game_start)
+        return found
+
+    def delete(self, match_id: str) -> None:
+        """Remove a single match from the cache."""
+        with self._lock:
+            self._conn.execute("DELETE FROM matches WHERE match_id = ?", (match_id,))
+            self._conn.commit()
+
+    def _used_bytes(self) -> int:
+        # Pages in use rather than a running total: other processes writing to the file are counted too.
+        page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def _evict(self, used: int) -> None:
+        # Drop least recently read entries until the store is back under ~90% of its budget.
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT match_id, size FROM matches ORDER BY last_access").fetchall()
+        evicted: list[tuple[str]] = []
+        for match_id, size in rows:
+            if used <= target:
+                break
+            evicted.append((match_id,))
+            used -= size
+        self._conn.executemany("DELETE FROM matches WHERE match_id = ?", evicted)
+
+    def stats(self) -> dict:
+        """Return entry count, stored size and age range of the cache."""
+        with self._lock:
+            count, oldest, newest = self._conn.execute(
+                "SELECT COUNT(*), MIN(fetched_at), MAX(fetched_at) FROM matches"
+            ).fetchone()
+            used = self._used_bytes()
+        return {
+            "path": self.path,
+            "entries": count,
+            "size_bytes": used,
+            "max_bytes": self.max_bytes,
+            "oldest_fetch": oldest,
+            "newest_fetch": newest,
+        }
+
+    def purge(self) -> int:
+        """Delete every cached match and return how many were removed."""
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM matches").rowcount
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_match_cache(path: str = DEFAULT_CACHE_PATH, max_mb: int = 512) -> MatchCache | None:
+    """Open the match cache at *path*, or return None when caching is disabled (empty path or 0 MB)."""
+    if not path or max_mb <= 0:
+        return None
+    return MatchCache(path, max_bytes=max_mb * 1024 * 1024)
+
+
+def main() -> None:
+    from .config import get_int_env_var, get_optional_env_var, load_env
+
+    load_env()
+    parser = argparse.ArgumentParser(description="Inspect or purge the local match cache.")
+    parser.add_argument("action", choices=["stats", "purge"])
+    parser.add_argument("--path", default=get_optional_env_var("MATCH_CACHE_PATH", DEFAULT_CACHE_PATH))
+    args = parser.parse_args()
+
+    cache = MatchCache(args.path, max_bytes=get_int_env_var("MATCH_CACHE_MAX_MB", 512) * 1024 * 1024)
+    if args.action == "stats":
+        print(json.dumps(cache.stats(), indent=2))
+    else:
+        print(f"Removed {cache.purge()} cached matches from {args.path}.")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
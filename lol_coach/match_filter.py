@@ -0,0 +1,120 @@
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+
+RANKED_QUEUES = frozenset({420, 440})
+SUMMONERS_RIFT_QUEUES = frozenset({400, 420, 430, 440, 490})
+
+
+@dataclass(frozen=True)
+class MatchFilter:
+    """Which matches to discover: queue IDs, match type and a start/end time range (epoch seconds).
+
+    The match-v5 ID endpoint applies *match_type*, the time range and a
+    single queue itself, so several *queues* are listed with one query per
+    queue (see queries()). Cached match metadata and the extracted records
+    are still checked locally, as a safety net.
+    """
+
+    queues: frozenset[int] = frozenset()
+    match_type: str | None = None
+    start_time: int | None = None
+    end_time: int | None = None
+
+    def query_params(self) -> dict[str, int | str]:
+        """Return the match-v5 ``ids`` query parameters for this filter."""
+        params: dict[str, int | str] = {}
+        if len(self.queues) == 1:
+            params["queue"] = next(iter(self.queues))
+        if self.match_type:
+            params["type"] = self.match_type
+        if self.start_time is not None:
+            params["startTime"] = self.start_time
+        if self.end_time is not None:
+            params["endTime"] = self.end_time
+        return params
+
+    def queries(self) -> list[dict[str, int | str]]:
+        """Return the query parameters of each ``ids`` listing to make: one per queue when there are several."""
+        params = self.query_params()
+        if len(self.queues) <= 1:
+            return [params]
+        return [{**params, "queue": queue} for queue in sorted(self.queues)]
+
+    def accepts(self, queue_id: int | None, game_start_ms: int | None) -> bool:
+        """Return False when known metadata rules a match out; unknown values are accepted."""
+        if self.queues and queue_id is not None and queue_id not in self.queues:
+            return False
+        if game_start_ms is not None:
+            if self.start_time is not None and game_start_ms < self.start_time * 1000:
+                return False
+            if self.end_time is not None and game_start_ms > self.end_time * 1000:
+                return False
+        return True
+
+    def filter_records(self, records: Iterable[dict]) -> Iterator[dict]:
+        """Yield the extracted records that pass the filter."""
+        for record in records:
+            if self.accepts(record.get("queue_id"), record.get("game_start")):
+                yield record
+
+    def __bool__(self) -> bool:
+        return bool(self.queues or self.match_type or self.start_time is not None or self.end_time is not None)
+
+
+QUEUE_PRESETS: dict[str, MatchFilter] = {
+    "all": MatchFilter(),
+    "ranked": MatchFilter(RANKED_QUEUES, "ranked"),
+    "solo": MatchFilter(frozenset({420})),
+    "flex": MatchFilter(frozenset({440})),
+    "normal": MatchFilter(frozenset({400, 430, 490}), "normal"),
+    "summoners_rift": MatchFilter(SUMMONERS_RIFT_QUEUES),
+    "aram": MatchFilter(frozenset({450})),
+}
+
+
+def _parse_time(value: str) -> int:
+    """Parse epoch seconds or an ISO date/datetime (UTC unless an offset is given)."""
+    if value.isdigit():
+        return int(value)
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def parse_match_filter(
+    queues: str | None = None,
+    match_type: str | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    since_days: int | None = None,
+) -> MatchFilter:
+    """Build a MatchFilter from user input.
+
+    *queues* is a preset name (see QUEUE_PRESETS) or comma-separated queue
+    IDs; *start* and *end* are epoch seconds or ISO dates; *since_days*
+    sets the start to that many days ago.
+    """
+    queues = (queues or "").strip().lower()
+    if queues in QUEUE_PRESETS:
+        match_filter = QUEUE_PRESETS[queues]
+    elif queues:
+        try:
+            match_filter = MatchFilter(frozenset(int(part) for part in queues.split(",") if part.strip()))
+        except ValueError:
+            raise ValueError(
+                f"Invalid queue filter: {queues!r} (expected one of {', '.join(QUEUE_PRESETS)} or queue IDs)"
+            ) from None
+    else:
+        match_filter = MatchFilter()
+    if match_type:
+        match_filter = replace(match_filter, match_type=match_type)
+    if start:
+        match_filter = replace(match_filter, start_time=_parse_time(start))
+    if since_days:
+        match_filter = replace(match_filter, start_time=int(time.time()) - since_days * 86400)
+    if end:
+        match_filter = replace(match_filter, end_time=_parse_time(end))
+    return match_filter
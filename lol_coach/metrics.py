@@ -0,0 +1,162 @@
+import bisect
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the stage duration histogram buckets.
+DURATION_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_LabelKey = tuple[str, tuple[tuple[str, str], ...]]
+
+
+def _key(name: str, labels: dict) -> _LabelKey:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...], extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{label}="{value}"' for (label, _), value in zip(pairs, escaped)) + "}"
+
+
+class _Timing:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        index = bisect.bisect_left(DURATION_BUCKETS, seconds)
+        if index < len(self.buckets):
+            self.buckets[index] += 1
+
+
+class Metrics:
+    """Thread-safe registry of labelled counters and stage timings.
+
+    Counters are incremented with incr(); durations are recorded with
+    observe() or the timer() context manager and kept as count/sum/max plus a
+    fixed-bucket histogram, so memory does not grow with the number of events.
+    """
+
+    def __init__(self, namespace: str = "lol_coach") -> None:
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._counters: dict[_LabelKey, float] = {}
+        self._timings: dict[_LabelKey, _Timing] = {}
+        self._started = time.time()
+
+    def incr(self, name: str, amount: float = 1, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, stage: str, seconds: float, **labels) -> None:
+        key = _key(stage, labels)
+        with self._lock:
+            timing = self._timings.get(key)
+            if timing is None:
+                timing = self._timings[key] = _Timing()
+            timing.add(seconds)
+
+    @contextmanager
+    def timer(self, stage: str, **labels) -> Iterator[None]:
+        """Time the enclosed block as *stage*; failures are timed too and counted in ``failures``."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.incr("failures", stage=stage)
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start, **labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+            self._started = time.time()
+
+    def summary(self) -> dict:
+        """Return every counter and stage timing as a JSON-serializable dict."""
+        with self._lock:
+            counters = [
+                {"name": name, **dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            stages = [
+                {
+                    "stage": name,
+                    **dict(labels),
+                    "count": timing.count,
+                    "total_seconds": round(timing.total, 4),
+                    "mean_seconds": round(timing.total / timing.count, 4) if timing.count else 0.0,
+                    "max_seconds": round(timing.max, 4),
+                }
+                for (name, labels), timing in sorted(self._timings.items())
+            ]
+        return {
+            "started_at": self._started,
+            "elapsed_seconds": round(time.time() - self._started, 3),
+            "stages": stages,
+            "counters": counters,
+        }
+
+    def render_prometheus(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        prefix = self.namespace
+        lines: list[str] = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timings = sorted(self._timings.items())
+            timings = [(key, (t.count, t.total, list(t.buckets))) for key, t in timings]
+
+        seen: set[str] = set()
+        for (name, labels), value in counters:
+            metric = f"{prefix}_{name}_total"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels)} {value:g}")
+
+        metric = f"{prefix}_stage_seconds"
+        if timings:
+            lines.append(f"# TYPE {metric} histogram")
+        for (stage, labels), (count, total, buckets) in timings:
+            labels = (("stage", stage),) + labels
+            cumulative = 0
+            for bound, bucket in zip(DURATION_BUCKETS, buckets):
+                cumulative += bucket
+                lines.append(f"{metric}_bucket{_format_labels(labels, (('le', f'{bound:g}'),))} {cumulative}")
+            lines.append(f"{metric}_bucket{_format_labels(labels, (('le', '+Inf'),))} {count}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry shared by the client, the export pipeline and the bot.
+METRICS = Metrics()
+
+
+async def serve_metrics(metrics: Metrics = METRICS, host: str = "0.0.0.0", port: int = 9108):
+    """Serve ``/metrics`` in the Prometheus text format on the running event loop; return the runner."""
+    from aiohttp import web
+
+    async def handle(_request: "web.Request") -> "web.Response":
+        return web.Response(text=metrics.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
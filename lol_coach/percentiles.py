@@ -0,0 +1,346 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from statistics import median
+
+DEFAULT_PERCENTILE_PATH = os.path.join(".cache", "percentiles.sqlite3")
+
+# Metrics benchmarked per champion x role; every one is "higher is better" except deaths.
+PERCENTILE_METRICS: tuple[str, ...] = (
+    "cs_per_min",
+    "gold_per_minute",
+    "damage_per_minute",
+    "vision_score_per_minute",
+    "kill_participation",
+    "kda",
+    "deaths",
+    "team_damage_share",
+    "lane_gold_diff",
+    "lane_cs_diff",
+    "gold_diff_at_10",
+    "cs_diff_at_10",
+)
+# Key used for the distribution of a role across all champions.
+ANY_CHAMPION = "*"
+# Below this many games a distribution is not used for lookups.
+MIN_SAMPLES = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    match_id TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS sketches (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+class QuantileSketch:
+    """Streaming quantile sketch in the style of a merging t-digest.
+
+    Values are buffered and periodically merged into weighted centroids whose
+    size is bounded by the k1 scale function, so the tails stay accurate while
+    memory stays around *compression* centroids whatever the number of values.
+    """
+
+    __slots__ = ("compression", "count", "min", "max", "_means", "_weights", "_buffer", "_xs", "_ranks")
+
+    def __init__(self, compression: int = 100) -> None:
+        self.compression = compression
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._means: list[float] = []
+        self._weights: list[float] = []
+        self._buffer: list[float] = []
+        # Interpolation table for cdf/quantile, rebuilt after every merge.
+        self._xs: list[float] = []
+        self._ranks: list[float] = []
+
+    def add(self, value: float) -> None:
+        self._buffer.append(value)
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self._buffer) >= 4 * self.compression:
+            self._merge()
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _merge(self) -> None:
+        points = sorted([*zip(self._means, self._weights), *((value, 1.0) for value in self._buffer)])
+        self._buffer = []
+        total = sum(weight for _, weight in points)
+        means: list[float] = []
+        weights: list[float] = []
+        mean, weight = points[0]
+        before = 0.0
+        k_lower = self._k(0.0)
+        for next_mean, next_weight in points[1:]:
+            if self._k((before + weight + next_weight) / total) - k_lower <= 1.0:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                before += weight
+                k_lower = self._k(before / total)
+                mean, weight = next_mean, next_weight
+        means.append(mean)
+        weights.append(weight)
+        self._means, self._weights = means, weights
+
+        # Each centroid's mean sits at the middle of its weight; min and max anchor the ends.
+        xs, ranks = [self.min], [0.0]
+        cumulative = 0.0
+        for mean, weight in zip(means, weights):
+            xs.append(mean)
+            ranks.append(cumulative + weight / 2)
+            cumulative += weight
+        xs.append(self.max)
+        ranks.append(cumulative)
+        self._xs, self._ranks = xs, ranks
+
+    def cdf(self, value: float) -> float:
+        """Return the estimated fraction of values below *value* (ties count half)."""
+        if not self.count:
+            return math.nan
+        if self._buffer:
+            self._merge()
+        xs, ranks = self._xs, self._ranks
+        if value < xs[0]:
+            return 0.0
+        if value > xs[-1]:
+            return 1.0
+        low, high = bisect_left(xs, value), bisect_right(xs, value)
+        if low != high:
+            # value equals one or more points: take the middle of their ranks.
+            rank = (ranks[low] + ranks[high - 1]) / 2
+        else:
+            x0, x1 = xs[low - 1], xs[low]
+            rank = ranks[low - 1] + (ranks[low] - ranks[low - 1]) * (value - x0) / (x1 - x0)
+        return rank / ranks[-1]
+
+    def quantile(self, q: float) -> float:
+        """Return the estimated value at quantile *q* (0 to 1)."""
+        if not self.count:
+            return math.nan
+        if self._buffer:
+            self._merge()
+        target = min(max(q, 0.0), 1.0) * self._ranks[-1]
+        index = min(max(bisect_left(self._ranks, target), 1), len(self._ranks) - 1)
+        r0, r1 = self._ranks[index - 1], self._ranks[index]
+        x0, x1 = self._xs[index - 1], self._xs[index]
+        return x0 if r1 == r0 else x0 + (x1 - x0) * (target - r0) / (r1 - r0)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Fold the values summarized by *other* into this sketch."""
+        if not other.count:
+            return
+        if other._buffer:
+            other._merge()
+        self._means = [*self._means, *other._means]
+        self._weights = [*self._weights, *other._weights]
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._merge()
+
+    def to_list(self) -> list:
+        if self._buffer:
+            self._merge()
+        return [
+            self.count,
+            self.min,
+            self.max,
+            [round(mean, 4) for mean in self._means],
+            [round(weight, 4) for weight in self._weights],
+        ]
+
+    @classmethod
+    def from_list(cls, data: list, compression: int = 100) -> "QuantileSketch":
+        sketch = cls(compression)
+        sketch.count, sketch.min, sketch.max, sketch._means, sketch._weights = data
+        if sketch.count:
+            # Rebuild the interpolation table from the stored centroids.
+            sketch._merge()
+        return sketch
+
+
+class PercentileIndex:
+    """Quantile sketches of PERCENTILE_METRICS per champion x role, built from every collected lobby.
+
+    Each match is counted once, with its ten participants, plus once more
+    per role across all champions (ANY_CHAMPION) as a fallback for rarely
+    seen champions. Sketches and counted match IDs live in a SQLite file
+    shared by the bot and export.py: new lobbies are buffered and merged into
+    the stored sketches by save(), inside one exclusive transaction, so
+    processes writing the same *path* never drop each other's matches.
+    Lookups read the stored sketches, cached until the next save().
+    """
+
+    def __init__(
+        self, path: str = DEFAULT_PERCENTILE_PATH, compression: int = 100, autosave_lobbies: int = 200
+    ) -> None:
+        self.path = path
+        self.compression = compression
+        self.autosave_lobbies = autosave_lobbies
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit mode: save() opens its transaction explicitly with BEGIN IMMEDIATE.
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        # Lobbies added since the last save: match ID -> (sketch key, value) pairs.
+        self._pending: dict[str, list[tuple[str, float]]] = {}
+        self._cache: dict[str, QuantileSketch | None] = {}
+
+    @staticmethod
+    def _key(champion: str, role: str, metric: str) -> str:
+        return f"{champion}|{role or 'NONE'}|{metric}"
+
+    def add_lobby(self, match_id: str, lobby: Mapping[str, Mapping]) -> bool:
+        """Buffer the records of one match (by PUUID) unless it was already counted; return whether it was new."""
+        with self._lock:
+            if match_id in self._pending or self._conn.execute(
+                "SELECT 1 FROM matches WHERE match_id = ?", (match_id,)
+            ).fetchone():
+                return False
+            values: list[tuple[str, float]] = []
+            for record in lobby.values():
+                champion, role = record.get("champion", ""), record.get("team_position", "")
+                for metric in PERCENTILE_METRICS:
+                    value = record.get(metric)
+                    if value is None:
+                        continue
+                    values.append((self._key(champion, role, metric), float(value)))
+                    values.append((self._key(ANY_CHAMPION, role, metric), float(value)))
+            self._pending[match_id] = values
+            full = len(self._pending) >= self.autosave_lobbies
+        if full:
+            self.save()
+        return True
+
+    def save(self) -> None:
+        """Merge the buffered lobbies into the stored sketches, skipping matches another process already counted."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                deltas: dict[str, QuantileSketch] = defaultdict(lambda: QuantileSketch(self.compression))
+                for match_id, values in pending.items():
+                    inserted = self._conn.execute(
+                        "INSERT OR IGNORE INTO matches (match_id) VALUES (?)", (match_id,)
+                    ).rowcount
+                    if inserted:
+                        for key, value in values:
+                            deltas[key].add(value)
+                merged: dict[str, QuantileSketch] = {}
+                for key, delta in deltas.items():
+                    sketch = self._read(key) or QuantileSketch(self.compression)
+                    sketch.merge(delta)
+                    self._conn.execute(
+                        "INSERT INTO sketches (key, data) VALUES (?, ?)"
+                        " ON CONFLICT (key) DO UPDATE SET data = excluded.data",
+                        (key, json.dumps(sketch.to_list(), separators=(",", ":"))),
+                    )
+                    merged[key] = sketch
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                self._pending = pending
+                raise
+            self._conn.execute("COMMIT")
+            # Other processes may have updated any sketch, so cached ones are re-read on demand.
+            self._cache = dict(merged)
+
+    def _read(self, key: str) -> QuantileSketch | None:
+        row = self._conn.execute("SELECT data FROM sketches WHERE key = ?", (key,)).fetchone()
+        return QuantileSketch.from_list(json.loads(row[0]), self.compression) if row else None
+
+    def _sketch(self, champion: str, role: str, metric: str) -> tuple[QuantileSketch, str] | None:
+        # The champion's own distribution in that role when it has MIN_SAMPLES games, else the role's.
+        with self._lock:
+            for scope in (champion, ANY_CHAMPION):
+                key = self._key(scope, role, metric)
+                if key not in self._cache:
+                    self._cache[key] = self._read(key)
+                sketch = self._cache[key]
+                if sketch is not None and sketch.count >= MIN_SAMPLES:
+                    return sketch, scope
+        return None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0] + len(self._pending)
+
+    def percentile(self, champion: str, role: str, metric: str, value: float) -> tuple[int, str] | None:
+        """Return (percentile 0-100, scope) of one game's *value*, or None without enough games.
+
+        The champion's own distribution in that role is used when it has at
+        least MIN_SAMPLES games, else the role across all champions
+        (scope ANY_CHAMPION).
+        """
+        found = self._sketch(champion, role, metric)
+        if found is None:
+            return None
+        sketch, scope = found
+        return round(100 * sketch.cdf(value)), scope
+
+    def player_percentiles(self, games_data: Iterable[Mapping], max_groups: int = 5) -> list[dict]:
+        """Rank a player's games per champion x role against the index.
+
+        The sketches hold single-game values, so each game is ranked on its
+        own and ``<metric>_pct`` is the median of those percentiles (ranking
+        an average would pull every result toward p50). Returns one entry per
+        group (most played first) with the games count; ``vs`` is ``"role"``
+        when the role-wide distribution was used.
+        """
+        groups: dict[tuple[str, str], list[Mapping]] = defaultdict(list)
+        for record in games_data:
+            groups[(record.get("champion", ""), record.get("team_position", ""))].append(record)
+        ranked = sorted(groups.items(), key=lambda item: len(item[1]), reverse=True)[:max_groups]
+
+        summaries = []
+        for (champion, role), records in ranked:
+            entry: dict = {"champion": champion, "role": role or "NONE", "games": len(records)}
+            fallback = False
+            for metric in PERCENTILE_METRICS:
+                values = [record[metric] for record in records if record.get(metric) is not None]
+                if not values:
+                    continue
+                found = self._sketch(champion, role, metric)
+                if found is None:
+                    continue
+                sketch, scope = found
+                entry[f"{metric}_pct"] = round(100 * median([sketch.cdf(value) for value in values]))
+                fallback = fallback or scope == ANY_CHAMPION
+            if fallback:
+                entry["vs"] = "role"
+            summaries.append(entry)
+        return summaries
+
+    def close(self) -> None:
+        """Save the buffered lobbies and close the database."""
+        self.save()
+        with self._lock:
+            self._conn.close()
+
+
+def open_percentile_index(path: str | None = DEFAULT_PERCENTILE_PATH) -> PercentileIndex | None:
+    """Open the percentile index at *path*, or return None when *path* is empty (index disabled)."""
+    if not path:
+        return None
+    return PercentileIndex(path)
@@ -0,0 +1,268 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Mapping
+from dataclasses import asdict, dataclass, field, fields
+
+from .export_service import collect_games_data
+from .lobby import LobbyIndex
+from .metrics import METRICS
+from .rate_limit import RateLimiter
+from .riot_api import RiotClient
+from .shared_rate_limit import SharedRateLimiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFETCH_PATH = os.path.join(".cache", "prefetch.json")
+
+
+class RequestBudget:
+    """Rate limiter wrapper capping the requests made through it to *max_requests* per *window* seconds.
+
+    It only counts: the wrapped limiter still spaces the requests out, and
+    callers check remaining() before starting work.
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter | SharedRateLimiter,
+        max_requests: int,
+        window: float = 3600,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.limiter = limiter
+        self.max_requests = max_requests
+        self.window = window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stamps: deque[float] = deque()
+
+    def remaining(self) -> int:
+        """Return how many requests may still be made in the current window."""
+        with self._lock:
+            cutoff = self._clock() - self.window
+            while self._stamps and self._stamps[0] <= cutoff:
+                self._stamps.popleft()
+            return max(0, self.max_requests - len(self._stamps))
+
+    def acquire(self, method: str) -> float:
+        waited = self.limiter.acquire(method)
+        with self._lock:
+            self._stamps.append(self._clock())
+        METRICS.incr("prefetch_requests", method=method)
+        return waited
+
+    def update_from_headers(self, method: str, headers: Mapping[str, str]) -> None:
+        self.limiter.update_from_headers(method, headers)
+
+    def penalize(self, method: str, headers: Mapping[str, str]) -> float:
+        return self.limiter.penalize(method, headers)
+
+
+@dataclass
+class PrefetchPlayer:
+    puuid: str
+    riot_id: str
+    # Newest match already listed; later polls only look for newer ones.
+    last_match_id: str | None = None
+    # Listed matches left out for lack of budget or whose download failed, newest first; retried by the next polls.
+    deferred: list[str] = field(default_factory=list)
+    # Current poll interval in seconds; doubles on every poll that finds nothing new.
+    interval: float = 0.0
+    next_poll: float = 0.0
+
+
+class Prefetcher:
+    """Keeps the match cache and lobby index warm for players who opted in.
+
+    Each due player's newest match IDs are polled through *client* (meant to
+    use the lowest rate-limit priority and *budget*); new matches are fetched
+    and extracted into *lobby_index*, so a later /coach only lists its match
+    IDs and calls the LLM. A player is polled every *interval* seconds, with
+    ±*jitter* so polls spread out, and the interval doubles up to
+    *max_interval* while the account has no new match. No poll starts while
+    *budget* is spent or *is_busy* reports interactive work. Registrations
+    and schedules are persisted as JSON to *path*.
+    """
+
+    def __init__(
+        self,
+        client: RiotClient,
+        budget: RequestBudget,
+        lobby_index: LobbyIndex,
+        on_lobby: Callable[[str, dict[str, dict]], None] | None = None,
+        total_games: int = 20,
+        interval: float = 900,
+        max_interval: float = 24 * 3600,
+        jitter: float = 0.2,
+        max_players: int = 50,
+        path: str | None = DEFAULT_PREFETCH_PATH,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.client = client
+        self.budget = budget
+        self.lobby_index = lobby_index
+        self.on_lobby = on_lobby
+        self.total_games = total_games
+        self.interval = interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.max_players = max_players
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._players: dict[str, PrefetchPlayer] = {}
+        if path:
+            self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                raw = json.load(fh)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read prefetch registrations %s: %s", self.path, e)
+            return
+        now = self._clock()
+        # Keys written by another version of the bot are ignored rather than refused.
+        names = {f.name for f in fields(PrefetchPlayer)}
+        for entry in raw:
+            try:
+                player = PrefetchPlayer(**{key: value for key, value in entry.items() if key in names})
+                # Spread the polls that fell due while the bot was down instead of running them all at start.
+                player.next_poll = max(player.next_poll, now + random.uniform(0, self.interval))
+            except (AttributeError, TypeError) as e:
+                logger.warning("Skipping invalid prefetch registration in %s: %r (%s)", self.path, entry, e)
+                continue
+            self._players[player.puuid] = player
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump([asdict(player) for player in self._players.values()], fh)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not write prefetch registrations %s: %s", self.path, e)
+
+    def __contains__(self, puuid: str) -> bool:
+        with self._lock:
+            return puuid in self._players
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._players)
+
+    def register(self, puuid: str, riot_id: str) -> bool:
+        """Opt a player in, polled on the next pass; return False if already registered.
+
+        Raises ValueError when *max_players* are already registered.
+        """
+        with self._lock:
+            if puuid in self._players:
+                return False
+            if len(self._players) >= self.max_players:
+                raise ValueError(f"Prefetching is full ({self.max_players} players registered).")
+            self._players[puuid] = PrefetchPlayer(puuid, riot_id, interval=self.interval, next_poll=self._clock())
+            self._save()
+        return True
+
+    def unregister(self, puuid: str) -> bool:
+        """Opt a player out; return whether they were registered."""
+        with self._lock:
+            if self._players.pop(puuid, None) is None:
+                return False
+            self._save()
+        return True
+
+    def _reschedule(self, player: PrefetchPlayer, found_new: bool) -> None:
+        if found_new:
+            player.interval = self.interval
+        else:
+            player.interval = min(max(player.interval, self.interval) * 2, self.max_interval)
+        player.next_poll = self._clock() + player.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _missing(self, match_ids: list[str]) -> list[str]:
+        """Return the IDs of *match_ids* found neither in the match cache nor in the lobby index."""
+        cached = set(self.client.cache.metadata(match_ids)) if self.client.cache is not None else set()
+        return [match_id for match_id in match_ids if match_id not in cached and match_id not in self.lobby_index]
+
+    def _affordable(self, match_ids: list[str]) -> list[str]:
+        # Keep the newest matches whose downloads fit in the budget; cached or indexed ones are free.
+        missing = set(self._missing(match_ids))
+        allowed = self.budget.remaining()
+        kept: list[str] = []
+        for match_id in match_ids:
+            if match_id in missing:
+                if allowed <= 0:
+                    break
+                allowed -= 1
+            kept.append(match_id)
+        return kept
+
+    def poll(self, player: PrefetchPlayer) -> int:
+        """Fetch and extract *player*'s new and deferred matches; return how many were new since the last poll."""
+        METRICS.incr("prefetch_polls")
+        new_ids = self.client.get_match_ids(player.puuid, self.total_games, stop_at=player.last_match_id)
+        match_ids = list(dict.fromkeys([*new_ids, *player.deferred]))[: self.total_games]
+        if not match_ids:
+            return 0
+        kept = self._affordable(match_ids)
+        with METRICS.timer("prefetch"):
+            collect_games_data(kept, player.puuid, self.client, self.lobby_index, on_lobby=self.on_lobby)
+        if new_ids:
+            player.last_match_id = new_ids[0]
+        # Only set once the fetch returned, so a failed poll retries the same matches. Matches whose
+        # own download failed are not in the cache or the index either, and are retried with the rest.
+        player.deferred = self._missing(kept) + match_ids[len(kept) :]
+        if player.deferred:
+            METRICS.incr("prefetch_deferred_matches", len(player.deferred))
+        METRICS.incr("prefetched_matches", len(kept))
+        return len(new_ids)
+
+    def poll_due(self, is_busy: Callable[[], bool] | None = None) -> int:
+        """Poll every due player, least recently due first, while budget is left; return how many were polled."""
+        now = self._clock()
+        with self._lock:
+            due = sorted((p for p in self._players.values() if p.next_poll <= now), key=lambda p: p.next_poll)
+        polled = 0
+        for player in due:
+            if self.budget.remaining() <= 0 or (is_busy is not None and is_busy()):
+                break
+            try:
+                # Matches still deferred for lack of budget keep the player on the base interval.
+                found_new = self.poll(player) > 0 or bool(player.deferred)
+            except Exception as e:
+                # Treated like an inactive account, so a failing player is retried less and less often.
+                logger.warning("Prefetch failed for %s: %s", player.riot_id, e)
+                METRICS.incr("failures", stage="prefetch")
+                found_new = False
+            with self._lock:
+                self._reschedule(player, found_new)
+            polled += 1
+        if polled:
+            with self._lock:
+                self._save()
+        return polled
+
+    async def run(self, is_busy: Callable[[], bool] | None = None, tick: float = 30) -> None:
+        """Poll due players every *tick* seconds until cancelled."""
+        while True:
+            await asyncio.sleep(tick)
+            if is_busy is not None and is_busy():
+                continue
+            try:
+                await asyncio.to_thread(self.poll_due, is_busy)
+            except Exception:
+                logger.exception("Prefetch pass failed")
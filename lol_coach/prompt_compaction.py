@@ -0,0 +1,136 @@
+import math
+
+import numpy as np
+import pandas as pd
+from py_toon_format import encode
+
+from .record_table import RecordTable
+
+# Metrics offered to the model, most important first; the tail is dropped to fit the budget.
+PROMPT_METRICS: tuple[str, ...] = (
+    "kda",
+    "cs_per_min",
+    "gold_per_minute",
+    "damage_per_minute",
+    "kill_participation",
+    "deaths",
+    "vision_score_per_minute",
+    "team_damage_share",
+    "lane_gold_diff",
+    "lane_cs_diff",
+    "solo_kills",
+    "damage_taken_on_team_percentage",
+    "max_cs_advantage_on_lane_opponent",
+    "total_time_dead",
+    "wards_placed",
+    "wards_killed",
+    "vision_wards_bought",
+    "damage_dealt_to_objectives",
+    "dragon_kills",
+    "turret_takedowns",
+    "team_gold_share",
+    "lane_xp_diff",
+    "kills",
+    "assists",
+    "takedowns_first_25_minutes",
+    "enemy_champ_immobilizations",
+    "first_blood_kill",
+    "first_tower_kill",
+    "game_duration",
+)
+
+MIN_METRICS = 4
+MAX_GROUP_ROWS = 10
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budget checks (about four characters per token)."""
+    return math.ceil(len(text) / 4)
+
+
+def _games_frame(games_data: list[dict] | RecordTable) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Return (games, metrics) frames in chronological order; metrics are float-typed."""
+    if isinstance(games_data, RecordTable):
+        frame = games_data.to_pandas()
+    else:
+        frame = pd.DataFrame.from_records(games_data)
+    games = frame.iloc[::-1].reset_index(drop=True)
+    if "team_position" in games:
+        games["position"] = games["team_position"].replace("", "NONE")
+    else:
+        games["position"] = "NONE"
+    games["win"] = games["win"].astype(float)
+    present = [metric for metric in PROMPT_METRICS if metric in games]
+    return games, games[present].astype(float)
+
+
+def _group_rows(games: pd.DataFrame, metrics: pd.DataFrame, key: str, columns: list[str]) -> list[dict]:
+    grouped = metrics[columns].groupby(games[key])
+    table = grouped.mean().round(2)
+    table.insert(0, "win_rate", games["win"].groupby(games[key]).mean().round(3))
+    table.insert(0, "games", grouped.size())
+    table = table.sort_values("games", ascending=False).head(MAX_GROUP_ROWS)
+    return table.reset_index().to_dict(orient="records")
+
+
+def _trends(metrics: pd.DataFrame, columns: list[str]) -> dict:
+    """Least-squares change of each metric over the period, computed for all columns at once."""
+    values = metrics[columns].to_numpy()
+    if len(values) < 3:
+        return {}
+    x = np.arange(len(values), dtype=float)
+    x -= x.mean()
+    slopes = (x @ (values - values.mean(axis=0))) / (x @ x)
+    return {column: round(float(slope * (len(values) - 1)), 2) for column, slope in zip(columns, slopes)}
+
+
+def summarize_games(games_data: list[dict] | RecordTable) -> dict:
+    """Aggregate *games_data* into overall, per-champion, per-role, win/loss and trend summaries."""
+    games, metrics = _games_frame(games_data)
+    columns = list(metrics.columns)
+    win_loss = metrics.groupby(games["win"].map({1.0: "win", 0.0: "loss"})).mean().round(2)
+    return {
+        "overall": {
+            "games": len(games),
+            "win_rate": round(float(games["win"].mean()), 3),
+            **metrics.mean().round(2).to_dict(),
+        },
+        "by_champion": _group_rows(games, metrics, "champion", columns),
+        "by_role": _group_rows(games, metrics, "position", columns),
+        "wins_vs_losses": win_loss.reset_index(names="result").to_dict(orient="records"),
+        "trend_over_period": _trends(metrics, columns),
+    }
+
+
+def _drop_metrics(value, dropped: set[str]):
+    if isinstance(value, dict):
+        return {key: _drop_metrics(item, dropped) for key, item in value.items() if key not in dropped}
+    if isinstance(value, list):
+        return [_drop_metrics(item, dropped) for item in value]
+    return value
+
+
+def compact_games_data(
+    games_data: list[dict] | RecordTable,
+    token_budget: int = 4000,
+    history: list[dict] | None = None,
+    percentiles: list[dict] | None = None,
+) -> str:
+    """Serialize aggregated statistics as TOON, dropping low-priority metrics until the budget fits.
+
+    Unlike the raw rows, the result does not grow with the number of games.
+    *history* (a stats store period comparison) and *percentiles* (the
+    player's ranks from a PercentileIndex) are included when given.
+    """
+    summary = summarize_games(games_data)
+    if history:
+        summary["recent_vs_previous_period"] = history
+    if percentiles:
+        summary["percentiles_vs_same_champion_and_role"] = percentiles
+    available = [metric for metric in PROMPT_METRICS if metric in summary["overall"]]
+    text = encode(summary)
+    for keep in range(len(available) - 1, MIN_METRICS - 1, -1):
+        if estimate_tokens(text) <= token_budget:
+            break
+        text = encode(_drop_metrics(summary, set(available[keep:])))
+    return text
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import os
 
@@ -10,11 +11,39 @@ def read_prompt_template(prompt_path: str) -> str:
         return f.read()
 
 
-def build_prompt(games_data: list[dict], prompt_path: str) -> str:
-    """Inject serialized games_data into the prompt template."""
+def build_prompt(
+    games_data: list[dict],
+    prompt_path: str,
+    token_budget: int | None = 4000,
+    history: list[dict] | None = None,
+    percentiles: list[dict] | None = None,
+) -> str:
+    """Inject games_data into the prompt template.
+
+    With a *token_budget* the games are compacted into aggregated statistics
+    that fit the budget; with None the raw records are inlined as JSON.
+    *history* adds the player's longer-term period comparison and
+    *percentiles* their ranks against games collected on the same champion
+    and role.
+    """
     template = read_prompt_template(prompt_path)
-    data_text = json.dumps(games_data, ensure_ascii=True)
+    if token_budget is None:
+        extras = {"history": history, "percentiles": percentiles}
+        extras = {key: value for key, value in extras.items() if value}
+        data = {"games": games_data, **extras} if extras else games_data
+        data_text = json.dumps(data, ensure_ascii=True)
+    else:
+        # pandas is only loaded once a prompt is actually built.
+        from .prompt_compaction import compact_games_data
+
+        data_text = compact_games_data(games_data, token_budget, history, percentiles)
     marker = "[DATA]"
     if marker in template:
         return template.replace(marker, data_text)
     return f"{template}\n\n{data_text}"
+
+
+def prompt_version(prompt_path: str) -> str:
+    """Return a short digest of the prompt template, changing whenever the template is edited."""
+    template = read_prompt_template(prompt_path)
+    return hashlib.sha1(template.encode("utf-8")).hexdigest()[:12]
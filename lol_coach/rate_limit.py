@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Mapping
+
+# Development-key defaults; replaced by the limits Riot advertises in response headers.
+DEFAULT_APP_LIMITS: tuple[tuple[int, float], ...] = ((20, 1.0), (100, 120.0))
+
+
+def parse_rate_limit_header(value: str | None) -> list[tuple[int, float]]:
+    """Parse a Riot rate-limit header such as ``"20:1,100:120"`` into (count, seconds) pairs."""
+    limits: list[tuple[int, float]] = []
+    if not value:
+        return limits
+    for part in value.split(","):
+        count, _, seconds = part.strip().partition(":")
+        try:
+            limits.append((int(count), float(seconds)))
+        except ValueError:
+            continue
+    return limits
+
+
+def parse_retry_after(headers: Mapping[str, str], default: float = 1.0) -> float:
+    """Return the Retry-After delay in seconds, falling back to *default*."""
+    value = headers.get("Retry-After")
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return default
+
+
+class RateWindow:
+    """Sliding-window log allowing at most *limit* requests per *seconds*."""
+
+    def __init__(self, limit: int, seconds: float) -> None:
+        self.limit = limit
+        self.seconds = seconds
+        self._stamps: deque[float] = deque()
+
+    def _prune(self, now: float) -> None:
+        while self._stamps and self._stamps[0] <= now - self.seconds:
+            self._stamps.popleft()
+
+    def wait_time(self, now: float) -> float:
+        """Return how long to wait before one more request fits in the window."""
+        self._prune(now)
+        if len(self._stamps) < self.limit:
+            return 0.0
+        return self._stamps[len(self._stamps) - self.limit] + self.seconds - now
+
+    def record(self, now: float) -> None:
+        self._stamps.append(now)
+
+
+def _rebuild_windows(current: list[RateWindow], limits: list[tuple[int, float]]) -> list[RateWindow]:
+    """Return windows for *limits*, carrying over history from windows with the same span."""
+    by_span = {window.seconds: window for window in current}
+    windows: list[RateWindow] = []
+    for count, seconds in limits:
+        window = by_span.get(seconds) or RateWindow(count, seconds)
+        window.limit = count
+        windows.append(window)
+    return windows
+
+
+class RateLimiter:
+    """Thread-safe two-tier limiter modelling Riot's application and per-method limits.
+
+    Every request must fit in all application windows and in all windows of its
+    method. Limits start from *app_limits* and are updated from the
+    ``X-App-Rate-Limit`` / ``X-Method-Rate-Limit`` headers of each response; a
+    429 blocks the affected scope for the advertised ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        app_limits: tuple[tuple[int, float], ...] = DEFAULT_APP_LIMITS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._app_windows = [RateWindow(count, seconds) for count, seconds in app_limits]
+        self._method_windows: dict[str, list[RateWindow]] = {}
+        self._app_blocked_until = 0.0
+        self._method_blocked_until: dict[str, float] = {}
+
+    def _wait_time(self, method: str, now: float) -> float:
+        wait = max(self._app_blocked_until, self._method_blocked_until.get(method, 0.0)) - now
+        for window in self._app_windows + self._method_windows.get(method, []):
+            wait = max(wait, window.wait_time(now))
+        return wait
+
+    def acquire(self, method: str) -> float:
+        """Block until a request for *method* is allowed; return the time spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                wait = self._wait_time(method, now)
+                if wait <= 0:
+                    for window in self._app_windows + self._method_windows.get(method, []):
+                        window.record(now)
+                    return waited
+            self._sleep(wait)
+            waited += wait
+
+    def update_from_headers(self, method: str, headers: Mapping[str, str]) -> None:
+        """Adopt the limits advertised by Riot in a response's headers."""
+        app_limits = parse_rate_limit_header(headers.get("X-App-Rate-Limit"))
+        method_limits = parse_rate_limit_header(headers.get("X-Method-Rate-Limit"))
+        with self._lock:
+            if app_limits:
+                self._app_windows = _rebuild_windows(self._app_windows, app_limits)
+            if method_limits:
+                current = self._method_windows.get(method, [])
+                self._method_windows[method] = _rebuild_windows(current, method_limits)
+
+    def penalize(self, method: str, headers: Mapping[str, str]) -> float:
+        """Record a 429 response and block its scope for ``Retry-After``; return the delay."""
+        retry_after = parse_retry_after(headers)
+        limit_type = headers.get("X-Rate-Limit-Type", "application")
+        with self._lock:
+            until = self._clock() + retry_after
+            if limit_type == "method":
+                self._method_blocked_until[method] = max(self._method_blocked_until.get(method, 0.0), until)
+            else:
+                # "application" and "service" (Riot-side) limits both throttle every method.
+                self._app_blocked_until = max(self._app_blocked_until, until)
+        return retry_after
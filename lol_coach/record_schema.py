@@ -0,0 +1,227 @@
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """One output column of a game record.
+
+    *source* is a participant key, or ``"challenges.<key>"`` for the challenges
+    block. Derived fields set *expr* instead: a Python expression over ``p``
+    (participant), ``c`` (challenges), ``duration`` and earlier output names.
+    Required fields raise KeyError when absent; optional ones use *default*.
+    *kind* is the column type ("int", "float", "bool" or "str") used by typed
+    outputs; when empty it is inferred from *ndigits* and *default*.
+    """
+
+    name: str
+    source: str = ""
+    default: object = 0
+    ndigits: int | None = None
+    required: bool = False
+    expr: str = ""
+    kind: str = ""
+
+    @property
+    def column_kind(self) -> str:
+        if self.kind:
+            return self.kind
+        if self.ndigits is not None:
+            return "float"
+        if isinstance(self.default, bool):
+            return "bool"
+        if isinstance(self.default, str):
+            return "str"
+        return "int"
+
+
+def _field(name, source, default=0, ndigits=None):
+    return FieldSpec(name, source, default, ndigits)
+
+
+def _required(name, source, kind="int"):
+    return FieldSpec(name, source, required=True, kind=kind)
+
+
+def _derived(name, expr, kind="int"):
+    return FieldSpec(name, expr=expr, kind=kind)
+
+
+GAME_RECORD_FIELDS: tuple[FieldSpec, ...] = (
+    # Position
+    _required("champion", "championName", "str"),
+    _required("role", "role", "str"),
+    _required("lane", "lane", "str"),
+    _field("team_position", "teamPosition", ""),
+    _field("individual_position", "individualPosition", ""),
+    # Combat
+    _required("win", "win", "bool"),
+    _required("kills", "kills"),
+    _required("deaths", "deaths"),
+    _required("assists", "assists"),
+    _derived("kda", "round((kills + assists) / max(1, deaths), 2)", "float"),
+    _derived("cs", "p['totalMinionsKilled'] + p['neutralMinionsKilled']"),
+    _derived("cs_per_min", "round(cs / (duration / 60), 2)", "float"),
+    _field("champ_level", "champLevel"),
+    _field("champ_experience", "champExperience"),
+    _field("killing_sprees", "killingSprees"),
+    _field("largest_killing_spree", "largestKillingSpree"),
+    _field("pentakills", "pentaKills"),
+    _field("quadrakills", "quadraKills"),
+    _field("triplekills", "tripleKills"),
+    _field("doublekills", "doubleKills"),
+    _field("multikills", "largestMultiKill"),
+    _field("first_blood_kill", "firstBloodKill", False),
+    _field("first_blood_assist", "firstBloodAssist", False),
+    _field("largest_critical_strike", "largestCriticalStrike"),
+    # Damage
+    _required("damage_dealt", "totalDamageDealtToChampions"),
+    _field("physical_damage_to_champs", "physicalDamageDealtToChampions"),
+    _field("magic_damage_to_champs", "magicDamageDealtToChampions"),
+    _field("true_damage_to_champs", "trueDamageDealtToChampions"),
+    _field("physical_damage_dealt", "physicalDamageDealt"),
+    _field("magic_damage_dealt", "magicDamageDealt"),
+    _field("true_damage_dealt", "trueDamageDealt"),
+    _required("damage_taken", "totalDamageTaken"),
+    _field("physical_damage_taken", "physicalDamageTaken"),
+    _field("magic_damage_taken", "magicDamageTaken"),
+    _field("true_damage_taken", "trueDamageTaken"),
+    _field("damage_self_mitigated", "damageSelfMitigated"),
+    _field("true_mitigated_damage", "damageSelfMitigated"),
+    _required("total_heal", "totalHeal"),
+    _field("total_heal_on_teammates", "totalHealsOnTeammates"),
+    _field("damage_shielded_on_teammates", "totalDamageShieldedOnTeammates"),
+    _field("total_cc_dealt", "timeCCingOthers"),
+    _field("total_time_cc_dealt", "totalTimeCCDealt"),
+    # Economy
+    _required("gold", "goldEarned"),
+    _field("gold_spent", "goldSpent"),
+    *(_field(f"item{i}", f"item{i}") for i in range(7)),
+    _field("items_purchased", "itemsPurchased"),
+    _field("consumables_purchased", "consumablesPurchased"),
+    _field("summoner1_id", "summoner1Id"),
+    _field("summoner2_id", "summoner2Id"),
+    _field("summoner1_casts", "summoner1Casts"),
+    _field("summoner2_casts", "summoner2Casts"),
+    _field("spell1_casts", "spell1Casts"),
+    _field("spell2_casts", "spell2Casts"),
+    _field("spell3_casts", "spell3Casts"),
+    _field("spell4_casts", "spell4Casts"),
+    # Vision
+    _required("vision_score", "visionScore"),
+    _required("wards_placed", "wardsPlaced"),
+    _field("wards_killed", "wardsKilled"),
+    _field("sight_wards_bought", "sightWardsBoughtInGame"),
+    _field("vision_wards_bought", "visionWardsBoughtInGame"),
+    _field("detector_wards_placed", "detectorWardsPlaced"),
+    # Objectives
+    _field("damage_dealt_to_objectives", "damageDealtToObjectives"),
+    _field("damage_dealt_to_buildings", "damageDealtToBuildings"),
+    _field("dragon_kills", "dragonKills"),
+    _field("baron_kills", "baronKills"),
+    _field("turret_kills", "turretKills"),
+    _field("turret_takedowns", "turretTakedowns"),
+    _field("turrets_lost", "turretsLost"),
+    _field("inhibitor_kills", "inhibitorKills"),
+    _field("inhibitor_takedowns", "inhibitorTakedowns"),
+    _field("inhibitors_lost", "inhibitorsLost"),
+    _field("nexus_kills", "nexusKills"),
+    _field("nexus_takedowns", "nexusTakedowns"),
+    _field("total_ally_jungle_minions", "totalAllyJungleMinionsKilled"),
+    _field("total_enemy_jungle_minions", "totalEnemyJungleMinionsKilled"),
+    _field("first_tower_kill", "firstTowerKill", False),
+    _field("first_tower_assist", "firstTowerAssist", False),
+    # Challenges
+    _field("gold_per_minute", "challenges.goldPerMinute", ndigits=2),
+    _field("damage_per_minute", "challenges.damagePerMinute", ndigits=2),
+    _field("vision_score_per_minute", "challenges.visionScorePerMinute", ndigits=2),
+    _field("kill_participation", "challenges.killParticipation", ndigits=3),
+    _field("kda_challenge", "challenges.kda", ndigits=2),
+    _field("damage_taken_on_team_percentage", "challenges.damageTakenOnTeamPercentage", ndigits=3),
+    _field("max_level_lead_lane_opponent", "challenges.maxLevelLeadLaneOpponent"),
+    _field("max_cs_advantage_on_lane_opponent", "challenges.maxCsAdvantageOnLaneOpponent", ndigits=2),
+    _field("takedowns", "challenges.takedowns"),
+    _field("takedowns_first_25_minutes", "challenges.takedownsFirst25Minutes"),
+    _field("deaths_by_enemy_champs", "challenges.deathsByEnemyChamps"),
+    _field("enemy_champ_immobilizations", "challenges.enemyChampionImmobilizations"),
+    _field("solo_kills", "challenges.soloKills"),
+    _field("outnumbered_kills", "challenges.outnumberedKills"),
+    # Game state
+    _field("time_played", "timePlayed"),
+    _field("longest_time_alive", "longestTimeSpentLiving"),
+    _field("total_time_dead", "totalTimeSpentDead"),
+    _field("bounce_level", "bountyLevel"),
+    _field("unrealized_kills", "unrealKills"),
+    _field("game_ended_in_surrender", "gameEndedInSurrender", False),
+    _field("game_ended_in_early_surrender", "gameEndedInEarlySurrender", False),
+    _field("team_early_surrendered", "teamEarlySurrendered", False),
+    _derived("game_duration", "duration"),
+)
+
+GAME_RECORD_COLUMNS: tuple[str, ...] = tuple(spec.name for spec in GAME_RECORD_FIELDS)
+GAME_RECORD_KINDS: dict[str, str] = {spec.name: spec.column_kind for spec in GAME_RECORD_FIELDS}
+
+
+def _value_expr(spec: FieldSpec) -> str:
+    if spec.expr:
+        return spec.expr
+    scope, _, key = spec.source.rpartition(".")
+    container = "c" if scope == "challenges" else "p"
+    if spec.required:
+        value = f"{container}[{key!r}]"
+    else:
+        value = f"{container}.get({key!r}, {spec.default!r})"
+    if spec.ndigits is not None:
+        value = f"round({value}, {spec.ndigits})"
+    return value
+
+
+def _body_lines(fields: tuple[FieldSpec, ...], indent: str) -> list[str]:
+    lines = [f"{indent}c = p.get('challenges') or {{}}"]
+    lines.extend(f"{indent}{spec.name} = {_value_expr(spec)}" for spec in fields)
+    return lines
+
+
+def compile_record_extractor(fields: tuple[FieldSpec, ...]) -> Callable[[dict, int], dict]:
+    """Compile *fields* into one function ``(participant, duration) -> record``.
+
+    The generated code reads every source key exactly once and builds the
+    record in a single dict literal, with no per-field calls or merges.
+    """
+    record = ", ".join(f"{spec.name!r}: {spec.name}" for spec in fields)
+    source = "\n".join(
+        [
+            "def extract_record(p, duration):",
+            *_body_lines(fields, "    "),
+            f"    return {{{record}}}",
+        ]
+    )
+    namespace: dict = {}
+    exec(compile(source, "<record_schema>", "exec"), namespace)
+    return namespace["extract_record"]
+
+
+def compile_column_extractor(
+    fields: tuple[FieldSpec, ...],
+) -> Callable[[Iterable[tuple[dict, int]]], dict[str, list]]:
+    """Compile *fields* into one function filling a column list per field.
+
+    The function takes ``(participant, duration)`` pairs and appends directly
+    to the output lists, so no per-row dict is ever allocated.
+    """
+    appenders = [f"    append_{spec.name} = columns[{spec.name!r}].append" for spec in fields]
+    appends = [f"        append_{spec.name}({spec.name})" for spec in fields]
+    source = "\n".join(
+        [
+            "def extract_columns(rows):",
+            f"    columns = {{name: [] for name in {tuple(spec.name for spec in fields)!r}}}",
+            *appenders,
+            "    for p, duration in rows:",
+            *_body_lines(fields, "        "),
+            *appends,
+            "    return columns",
+        ]
+    )
+    namespace: dict = {}
+    exec(compile(source, "<record_schema>", "exec"), namespace)
+    return namespace["extract_columns"]
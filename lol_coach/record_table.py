@@ -0,0 +1,169 @@
+import sys
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .lobby import RECORD_COLUMNS, RECORD_KINDS
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+_DTYPES = {"int": np.int64, "float": np.float64, "bool": np.bool_, "str": object}
+# Stored in place of missing values, which typed arrays cannot hold.
+_FILL = {"int": 0, "float": np.nan, "bool": False, "str": ""}
+
+
+class RecordRow(Mapping):
+    """Read-only view of one row of a RecordTable, usable wherever a record dict is read."""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "RecordTable", index: int) -> None:
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, name: str):
+        if name not in self._table.kinds:
+            raise KeyError(name)
+        value = self._table.column(name)[self._index]
+        # Numeric cells come back as Python scalars, like in a record dict.
+        return value.item() if isinstance(value, np.generic) else value
+
+    def __getattr__(self, name: str):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table.columns)
+
+    def __len__(self) -> int:
+        return len(self._table.columns)
+
+    def to_dict(self) -> dict:
+        return {name: self[name] for name in self._table.columns}
+
+    def __repr__(self) -> str:
+        return f"RecordRow({self.to_dict()!r})"
+
+
+class RecordTable:
+    """Typed column store for game records: one NumPy array per column of a fixed schema.
+
+    A record costs a few bytes per numeric field instead of a ~120-key dict,
+    and columns reach pandas and Arrow without dtype inference. Arrays grow
+    geometrically on append. Slicing returns a table sharing the arrays (no
+    copy); appending to a slice reallocates, so its parent is never changed.
+    Missing values are stored as 0, NaN, False or "" according to the kind.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 64,
+        columns: Sequence[str] = RECORD_COLUMNS,
+        kinds: Mapping[str, str] = RECORD_KINDS,
+    ) -> None:
+        self.columns = tuple(columns)
+        self.kinds = {name: kinds[name] for name in self.columns}
+        self._arrays = {name: np.empty(capacity, dtype=_DTYPES[kind]) for name, kind in self.kinds.items()}
+        self._size = 0
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping], **kwargs) -> "RecordTable":
+        table = cls(**kwargs)
+        table.extend(records)
+        return table
+
+    @classmethod
+    def _from_arrays(cls, columns: tuple[str, ...], kinds: dict[str, str], arrays: dict, size: int) -> "RecordTable":
+        table = cls.__new__(cls)
+        table.columns, table.kinds, table._arrays, table._size = columns, kinds, arrays, size
+        return table
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(next(iter(self._arrays.values()))) if self._arrays else 0
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the used part of the columns (strings counted by pointer)."""
+        return sum(array[: self._size].nbytes for array in self._arrays.values())
+
+    def _reserve(self, needed: int) -> None:
+        capacity = self.capacity
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 16)
+        for name, array in self._arrays.items():
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[: self._size] = array[: self._size]
+            self._arrays[name] = grown
+
+    def append(self, record: Mapping) -> None:
+        """Add one record; keys outside the schema are ignored."""
+        self._reserve(self._size + 1)
+        index = self._size
+        for name, kind in self.kinds.items():
+            value = record.get(name)
+            if value is None:
+                value = _FILL[kind]
+            elif kind == "str":
+                # Champion, position and patch strings repeat on every row; share one object each.
+                value = sys.intern(str(value))
+            self._arrays[name][index] = value
+        self._size += 1
+
+    def extend(self, records: Iterable[Mapping]) -> None:
+        if isinstance(records, Sequence):
+            self._reserve(self._size + len(records))
+        for record in records:
+            self.append(record)
+
+    def column(self, name: str) -> np.ndarray:
+        """Return the used part of column *name* as an array view (no copy)."""
+        return self._arrays[name][: self._size]
+
+    def __getitem__(self, key: int | slice):
+        if isinstance(key, slice):
+            arrays = {name: self.column(name)[key] for name in self.columns}
+            size = len(range(*key.indices(self._size)))
+            return self._from_arrays(self.columns, self.kinds, arrays, size)
+        index = key + self._size if key < 0 else key
+        if not 0 <= index < self._size:
+            raise IndexError("record index out of range")
+        return RecordRow(self, index)
+
+    def __iter__(self) -> Iterator[RecordRow]:
+        for index in range(self._size):
+            yield RecordRow(self, index)
+
+    def iter_records(self, batch_size: int = 1024) -> Iterator[dict]:
+        """Yield the rows as plain dicts of Python values, e.g. for the record writers."""
+        for start in range(0, self._size, batch_size):
+            stop = min(start + batch_size, self._size)
+            values = [self._arrays[name][start:stop].tolist() for name in self.columns]
+            for row in zip(*values):
+                yield dict(zip(self.columns, row))
+
+    def to_pandas(self) -> "pd.DataFrame":
+        """Return a DataFrame over the columns; numeric columns are handed over without a copy."""
+        import pandas as pd
+
+        return pd.DataFrame({name: self.column(name) for name in self.columns}, copy=False)
+
+    def to_arrow(self) -> "pa.Table":
+        """Return an Arrow table; numeric and boolean columns are converted without Python objects."""
+        import pyarrow as pa
+
+        return pa.table(
+            {
+                name: pa.array(self.column(name), type=pa.string() if kind == "str" else None)
+                for name, kind in self.kinds.items()
+            }
+        )
@@ -1,6 +1,48 @@
-import time
+import heapq
+import logging
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import urlencode
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .account_cache import UNKNOWN_RIOT_ID, PuuidCache
+from .match_cache import MatchCache
+from .match_filter import MatchFilter
+from .metrics import METRICS
+from .rate_limit import RateLimiter
+from .shared_rate_limit import SharedRateLimiter
+from .timeline import MatchTimeline, TimelineStore, parse_timeline
+
+logger = logging.getLogger(__name__)
+
+# Shared by every client in the process so concurrent workers draw from one budget.
+DEFAULT_LIMITER = RateLimiter()
+
+
+def _match_order(match_id: str) -> int:
+    # Match IDs end with a platform sequence number that grows over time ("EUW1_6812345678").
+    number = match_id.rpartition("_")[2]
+    return int(number) if number.isdigit() else -1
+
+
+def _known_index(batch: list[str], stop_at: str) -> int | None:
+    """Return the index of *stop_at* in *batch*, or of the first match older than it; None if neither is there."""
+    if stop_at in batch:
+        return batch.index(stop_at)
+    stop_order = _match_order(stop_at)
+    if stop_order < 0:
+        return None
+    # A queue listing may not contain *stop_at* itself but still reach matches older than it.
+    for index, match_id in enumerate(batch):
+        if 0 <= _match_order(match_id) < stop_order:
+            return index
+    return None
 
 
 def build_headers(api_key: str) -> dict:
@@ -8,63 +50,344 @@ def build_headers(api_key: str) -> dict:
     return {"X-Riot-Token": api_key}
 
 
-def get_puuid(game_name: str, tag_line: str, headers: dict, region_routing: str = "europe") -> str:
-    """Resolve a Riot ID (game_name#tag_line) to a PUUID via the Account API."""
-    url = (
-        f"https://{region_routing}.api.riotgames.com/riot/account/v1/accounts"
-        f"/by-riot-id/{game_name}/{tag_line}"
-    )
-    response = requests.get(url, headers=headers, timeout=10)
-    if response.status_code == 200:
-        return response.json()["puuid"]
-    raise requests.exceptions.RequestException(
-        f"Error fetching PUUID: {response.status_code} - {response.text}"
-    )
-
-
-def get_match_ids(
-    puuid: str,
-    headers: dict,
-    total_games: int = 300,
-    batch_size: int = 100,
-    region_routing: str = "europe",
-    sleep_seconds: float = 1.0,
-) -> list[str]:
-    """Fetch up to *total_games* match IDs for the given PUUID in paginated batches."""
-    match_ids: list[str] = []
-    start = 0
-
-    while len(match_ids) < total_games:
-        url = (
-            f"https://{region_routing}.api.riotgames.com/lol/match/v5/matches"
-            f"/by-puuid/{puuid}/ids?start={start}&count={batch_size}"
+class RiotClient:
+    """Riot API client with a pooled keep-alive session per routing region.
+
+    Every request goes through the shared rate limiter, is retried on 429 after
+    its Retry-After until the key is no longer limited, and on transient 5xx/connection errors with exponential
+    backoff. Finished matches are served from *cache*, their timelines from
+    *timeline_store* and Riot ID resolutions from *puuid_cache* when they are
+    given. Pass a SharedRateLimiter as *limiter* to share the key's budget
+    with other processes. *base_url* replaces the regional Riot hosts, e.g. to target a local
+    stand-in server.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        region_routing: str = "europe",
+        limiter: RateLimiter | SharedRateLimiter | None = None,
+        cache: MatchCache | None = None,
+        puuid_cache: PuuidCache | None = None,
+        timeline_store: TimelineStore | None = None,
+        timeout: float = 10,
+        max_retries: int = 3,
+        max_workers: int = 8,
+        base_url: str | None = None,
+    ) -> None:
+        self.region_routing = region_routing
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.limiter = limiter or DEFAULT_LIMITER
+        self.cache = cache
+        self.puuid_cache = puuid_cache
+        self.timeline_store = timeline_store
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_workers = max_workers
+        self._headers = {**build_headers(api_key), "Accept-Encoding": "gzip, deflate"}
+        self._sessions: dict[str, requests.Session] = {}
+        self._sessions_lock = threading.Lock()
+
+    def _session(self, region_routing: str) -> requests.Session:
+        with self._sessions_lock:
+            session = self._sessions.get(region_routing)
+            if session is None:
+                retry = Retry(
+                    total=self.max_retries,
+                    backoff_factor=0.5,
+                    status_forcelist=(500, 502, 503, 504),
+                    allowed_methods=frozenset({"GET"}),
+                    raise_on_status=False,
+                )
+                # One pooled connection per fetch worker keeps every worker on a warm TLS connection.
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers, max_retries=retry)
+                session = requests.Session()
+                session.headers.update(self._headers)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[region_routing] = session
+            return session
+
+    def get(self, path: str, method: str, region_routing: str | None = None) -> requests.Response:
+        """GET *path* on the regional host under the rate limiter.
+
+        A 429 is retried after its Retry-After for as long as the key stays
+        rate limited, so throttling only delays a request and never drops it;
+        5xx responses get the *max_retries* retries of the session.
+        """
+        region_routing = region_routing or self.region_routing
+        session = self._session(region_routing)
+        host = self.base_url or f"https://{region_routing}.api.riotgames.com"
+        url = f"{host}{path}"
+        attempt = 0
+        while True:
+            if attempt:
+                METRICS.incr("riot_retries", method=method, reason="rate_limited")
+            METRICS.observe("rate_limit_wait", self.limiter.acquire(method), method=method)
+            response = session.get(url, timeout=self.timeout)
+            METRICS.incr("riot_requests", method=method, status=response.status_code)
+            # Transparent 5xx retries done by urllib3 are recorded in the raw response.
+            retries = getattr(response.raw, "retries", None)
+            if retries is not None and retries.history:
+                METRICS.incr("riot_retries", len(retries.history), method=method, reason="server_error")
+            self.limiter.update_from_headers(method, response.headers)
+            if response.status_code != 429:
+                return response
+            METRICS.incr("riot_throttled", method=method, scope=response.headers.get("X-Rate-Limit-Type", "unknown"))
+            retry_after = self.limiter.penalize(method, response.headers)
+            attempt += 1
+            if attempt % (self.max_retries + 1) == 0:
+                logger.warning(
+                    "%s still rate limited after %d attempts; retrying in %.0fs", method, attempt, retry_after
+                )
+
+    def get_puuid(self, game_name: str, tag_line: str, region_routing: str | None = None) -> str:
+        """Resolve a Riot ID (game_name#tag_line) to a PUUID via the Account API."""
+        if self.puuid_cache is not None:
+            cached = self.puuid_cache.get(game_name, tag_line)
+            if cached is not None:
+                METRICS.incr("cache_hits", cache="puuid")
+            else:
+                METRICS.incr("cache_misses", cache="puuid")
+            if cached == UNKNOWN_RIOT_ID:
+                raise requests.exceptions.RequestException(
+                    f"Error fetching PUUID: Riot ID {game_name}#{tag_line} not found (cached)"
+                )
+            if cached is not None:
+                return cached
+
+        path = f"/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
+        with METRICS.timer("account_lookup"):
+            response = self.get(path, "account-by-riot-id", region_routing)
+        if response.status_code == 200:
+            puuid = response.json()["puuid"]
+            if self.puuid_cache is not None:
+                self.puuid_cache.put(game_name, tag_line, puuid)
+            return puuid
+        if response.status_code == 404 and self.puuid_cache is not None:
+            self.puuid_cache.put_unknown(game_name, tag_line)
+        METRICS.incr("failures", stage="account_lookup")
+        raise requests.exceptions.RequestException(
+            f"Error fetching PUUID: {response.status_code} - {response.text}"
         )
-        response = requests.get(url, headers=headers, timeout=10)
-        batch = response.json()
 
-        if not batch:
-            break
+    def get_match_ids(
+        self,
+        puuid: str,
+        total_games: int = 300,
+        batch_size: int = 100,
+        stop_at: str | None = None,
+        region_routing: str | None = None,
+        match_filter: MatchFilter | None = None,
+    ) -> list[str]:
+        """Fetch up to *total_games* match IDs for the given PUUID in paginated batches.
+
+        IDs come newest first; when *stop_at* is given, pagination ends as soon as
+        that already-known match is reached and only the newer IDs are returned.
+        *match_filter* is sent to the endpoint, as one listing per queue merged
+        newest first when it has several queues, and IDs whose cached metadata
+        it rules out are dropped before any download.
+        """
+        queries = match_filter.queries() if match_filter else [{}]
+        listings = [
+            self._list_match_ids(puuid, total_games, batch_size, stop_at, region_routing, params, match_filter)
+            for params in queries
+        ]
+        if len(listings) == 1:
+            return listings[0]
+        # One listing per queue: interleave them back into a single newest-first list.
+        merged = heapq.merge(*listings, key=_match_order, reverse=True)
+        return list(islice(dict.fromkeys(merged), total_games))
+
+    def _list_match_ids(
+        self,
+        puuid: str,
+        total_games: int,
+        batch_size: int,
+        stop_at: str | None,
+        region_routing: str | None,
+        params: dict[str, int | str],
+        match_filter: MatchFilter | None,
+    ) -> list[str]:
+        match_ids: list[str] = []
+        start = 0
+        filter_params = urlencode(params)
+
+        while len(match_ids) < total_games:
+            path = f"/lol/match/v5/matches/by-puuid/{puuid}/ids?start={start}&count={batch_size}"
+            if filter_params:
+                path = f"{path}&{filter_params}"
+            with METRICS.timer("match_ids"):
+                response = self.get(path, "match-ids-by-puuid", region_routing)
+                response.raise_for_status()
+                batch = response.json()
+
+            if not batch:
+                break
+
+            complete = len(batch) < batch_size
+            known = _known_index(batch, stop_at) if stop_at is not None else None
+            if known is not None:
+                batch = batch[:known]
+                complete = True
+            match_ids.extend(self._prefilter(batch, match_filter))
+            if complete:
+                break
+            start += batch_size
 
-        match_ids.extend(batch)
-        start += batch_size
-        time.sleep(sleep_seconds)
+        return match_ids[:total_games]
 
-    return match_ids[:total_games]
+    def _prefilter(self, match_ids: list[str], match_filter: MatchFilter | None) -> list[str]:
+        # Only cached matches have known metadata; the others are kept and checked after extraction.
+        if not match_filter or self.cache is None:
+            return match_ids
+        metadata = self.cache.metadata(match_ids)
+        kept = [
+            match_id
+            for match_id in match_ids
+            if match_id not in metadata or match_filter.accepts(*metadata[match_id])
+        ]
+        if len(kept) < len(match_ids):
+            METRICS.incr("prefiltered_matches", len(match_ids) - len(kept))
+        return kept
 
+    def fetch_match(self, match_id: str, region_routing: str | None = None) -> dict | None:
+        """Fetch the full match-v5 payload of a single match, or return None on failure.
 
-def fetch_match_info(match_id: str, headers: dict, region_routing: str = "europe") -> dict | None:
-    """Fetch the 'info' block of a single match, or return None on failure."""
-    url = f"https://{region_routing}.api.riotgames.com/lol/match/v5/matches/{match_id}"
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        info = response.json().get("info")
+        Finished matches never change, so the cache is consulted before the
+        network and filled with every payload that carries an 'info' block.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(match_id)
+            if cached is not None:
+                METRICS.incr("cache_hits", cache="match")
+                return cached
+            METRICS.incr("cache_misses", cache="match")
+
+        try:
+            with METRICS.timer("match_fetch"):
+                response = self.get(f"/lol/match/v5/matches/{match_id}", "match-by-id", region_routing)
+                response.raise_for_status()
+                match = response.json()
+        except requests.exceptions.RequestException as e:
+            logger.warning("Error fetching match %s: %s", match_id, e)
+            return None
+        except ValueError as e:
+            logger.warning("Unexpected error processing %s: %s", match_id, e)
+            return None
+
+        if self.cache is not None and isinstance(match, dict) and match.get("info"):
+            self.cache.put(match_id, match)
+        if self.puuid_cache is not None and isinstance(match, dict):
+            self._observe_riot_ids(match.get("info") or {})
+        return match
+
+    def _observe_riot_ids(self, info: dict) -> None:
+        # Renamed accounts show up in new matches, so their stale cached Riot IDs are dropped early.
+        played_at = (info.get("gameEndTimestamp") or info.get("gameStartTimestamp") or 0) / 1000
+        for participant in info.get("participants", []):
+            puuid = participant.get("puuid")
+            game_name, tag_line = participant.get("riotIdGameName"), participant.get("riotIdTagline")
+            if puuid and game_name and tag_line and self.puuid_cache.observe(puuid, game_name, tag_line, played_at):
+                METRICS.incr("renamed_riot_ids")
+
+    def fetch_match_info(self, match_id: str, region_routing: str | None = None) -> dict | None:
+        """Fetch the 'info' block of a single match, or return None on failure."""
+        match = self.fetch_match(match_id, region_routing)
+        if match is None:
+            return None
+        try:
+            info = match.get("info")
+        except AttributeError as e:
+            logger.warning("Unexpected error processing %s: %s", match_id, e)
+            METRICS.incr("failures", stage="match_fetch")
+            return None
         if info is None:
-            print(f"  Warning: No 'info' in match data for {match_id}")
+            logger.warning("No 'info' in match data for %s", match_id)
+            METRICS.incr("failures", stage="match_fetch")
         return info
-    except requests.exceptions.RequestException as e:
-        print(f"  Error fetching match {match_id}: {e}")
-        return None
-    except (ValueError, KeyError, TypeError) as e:
-        print(f"  Unexpected error processing {match_id}: {e}")
-        return None
+
+    def fetch_match_timeline(self, match_id: str, region_routing: str | None = None) -> MatchTimeline | None:
+        """Fetch the per-minute timeline of a single match as arrays, or return None on failure.
+
+        Only the participant frames are kept; stored timelines are served from
+        *timeline_store* without a request.
+        """
+        if self.timeline_store is not None:
+            stored = self.timeline_store.get(match_id)
+            if stored is not None:
+                METRICS.incr("cache_hits", cache="timeline")
+                return stored
+            METRICS.incr("cache_misses", cache="timeline")
+
+        try:
+            with METRICS.timer("timeline_fetch"):
+                response = self.get(
+                    f"/lol/match/v5/matches/{match_id}/timeline", "timeline-by-match-id", region_routing
+                )
+                response.raise_for_status()
+                timeline = parse_timeline(response.json())
+        except requests.exceptions.RequestException as e:
+            logger.warning("Error fetching timeline %s: %s", match_id, e)
+            return None
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning("Unexpected error processing timeline %s: %s", match_id, e)
+            return None
+
+        if self.timeline_store is not None and timeline.minutes:
+            self.timeline_store.put(match_id, timeline)
+        return timeline
+
+    def _fetch_in_order(self, fetch, match_ids: Iterable[str]) -> Iterator[tuple[str, Future]]:
+        window = self.max_workers * 2
+        pending: deque[tuple[str, Future]] = deque()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for match_id in match_ids:
+                pending.append((match_id, pool.submit(fetch, match_id)))
+                if len(pending) >= window:
+                    yield pending.popleft()
+            while pending:
+                yield pending.popleft()
+
+    def fetch_match_infos(
+        self, match_ids: Iterable[str], region_routing: str | None = None
+    ) -> Iterator[tuple[str, dict | None]]:
+        """Fetch match infos concurrently, yielding (match_id, info) pairs in input order.
+
+        Workers share the rate limiter, so throughput follows the key's limits
+        rather than the pool size; the pool only has to hide network latency.
+        At most two fetches per worker are in flight or buffered at any time,
+        so memory stays bounded however many IDs are streamed in.
+        """
+        for match_id, future in self._fetch_in_order(
+            lambda match_id: self.fetch_match_info(match_id, region_routing), match_ids
+        ):
+            yield match_id, future.result()
+
+    def fetch_match_details(
+        self, match_ids: Iterable[str], region_routing: str | None = None
+    ) -> Iterator[tuple[str, dict | None, MatchTimeline | None]]:
+        """Like fetch_match_infos(), but also fetch each match's timeline in the same worker."""
+
+        def fetch(match_id: str) -> tuple[dict | None, MatchTimeline | None]:
+            info = self.fetch_match_info(match_id, region_routing)
+            if info is None:
+                return None, None
+            return info, self.fetch_match_timeline(match_id, region_routing)
+
+        for match_id, future in self._fetch_in_order(fetch, match_ids):
+            yield (match_id, *future.result())
+
+    def close(self) -> None:
+        """Close every pooled session."""
+        with self._sessions_lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def __enter__(self) -> "RiotClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,212 @@
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Mapping
+
+from .rate_limit import DEFAULT_APP_LIMITS, parse_rate_limit_header, parse_retry_after
+
+DEFAULT_RATE_LIMIT_PATH = os.path.join(".cache", "ratelimit.sqlite3")
+
+# Share of every rate-limit window a caller may fill while a higher priority is active.
+PRIORITIES: dict[str, float] = {"interactive": 1.0, "batch": 0.8, "prefetch": 0.5}
+# A priority counts as active for this long after it last asked for a permit.
+RESERVATION_SECONDS = 10.0
+APP_SCOPE = "app"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS grants (
+    scope TEXT NOT NULL,
+    stamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS grants_scope_stamp ON grants (scope, stamp);
+CREATE TABLE IF NOT EXISTS limits (
+    scope TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (scope, seconds)
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    scope TEXT PRIMARY KEY,
+    until REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS demand (
+    priority TEXT PRIMARY KEY,
+    last REAL NOT NULL
+);
+"""
+
+
+def _method_scope(method: str) -> str:
+    return f"method:{method}"
+
+
+class SharedRateLimiter:
+    """Rate limiter whose windows live in a SQLite file shared by every process using one API key.
+
+    A drop-in replacement for RateLimiter: the bot, export.py and any other
+    job pointing at the same *path* draw permits from the same sliding
+    windows, limits learned from response headers and 429 blocks, so together
+    they stay within the key's budget. Each permit is granted inside an
+    exclusive SQLite transaction, which serializes callers across processes.
+
+    Callers declare a *priority*. While a higher priority has asked for a
+    permit within RESERVATION_SECONDS, lower ones may only fill their
+    PRIORITIES share of each window, keeping the rest as headroom (e.g. for
+    interactive /coach requests during a batch export); otherwise every
+    priority may use the whole budget.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_RATE_LIMIT_PATH,
+        priority: str = "interactive",
+        app_limits: tuple[tuple[int, float], ...] = DEFAULT_APP_LIMITS,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        self.path = path
+        self.priority = priority
+        self._share = PRIORITIES[priority]
+        self._higher = [name for name, share in PRIORITIES.items() if share > self._share]
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._headers_seen: dict[str, str] = {}
+        self._grants = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE.
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        # Seed the application limits only if no process has learned the real ones yet.
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO limits (scope, seconds, count) VALUES (?, ?, ?)",
+            [(APP_SCOPE, seconds, count) for count, seconds in app_limits],
+        )
+
+    def _transaction(self, body: Callable[[float], float]) -> float:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = body(self._clock())
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return result
+
+    def _window_share(self, now: float) -> float:
+        if not self._higher:
+            return 1.0
+        placeholders = ", ".join("?" for _ in self._higher)
+        active = self._conn.execute(
+            f"SELECT 1 FROM demand WHERE priority IN ({placeholders}) AND last > ? LIMIT 1",
+            (*self._higher, now - RESERVATION_SECONDS),
+        ).fetchone()
+        return self._share if active else 1.0
+
+    def _wait_time(self, scopes: tuple[str, ...], now: float) -> float:
+        placeholders = ", ".join("?" for _ in scopes)
+        blocked = self._conn.execute(
+            f"SELECT MAX(until) FROM blocks WHERE scope IN ({placeholders})", scopes
+        ).fetchone()[0]
+        wait = (blocked or 0.0) - now
+        share = self._window_share(now)
+        for scope in scopes:
+            for seconds, count in self._conn.execute(
+                "SELECT seconds, count FROM limits WHERE scope = ?", (scope,)
+            ).fetchall():
+                allowed = max(1, int(count * share))
+                # The window is full while the allowed-th most recent grant is still inside it.
+                row = self._conn.execute(
+                    "SELECT stamp FROM grants WHERE scope = ? AND stamp > ? ORDER BY stamp DESC LIMIT 1 OFFSET ?",
+                    (scope, now - seconds, allowed - 1),
+                ).fetchone()
+                if row is not None:
+                    wait = max(wait, row[0] + seconds - now)
+        return wait
+
+    def acquire(self, method: str) -> float:
+        """Block until a request for *method* is allowed; return the time spent waiting."""
+        scopes = (APP_SCOPE, _method_scope(method))
+
+        def try_grant(now: float) -> float:
+            self._conn.execute(
+                "INSERT INTO demand (priority, last) VALUES (?, ?)"
+                " ON CONFLICT (priority) DO UPDATE SET last = excluded.last",
+                (self.priority, now),
+            )
+            wait = self._wait_time(scopes, now)
+            if wait <= 0:
+                self._conn.executemany("INSERT INTO grants (scope, stamp) VALUES (?, ?)", [(s, now) for s in scopes])
+                self._grants += 1
+                if self._grants % 100 == 0:
+                    self._prune(now)
+            return wait
+
+        waited = 0.0
+        while True:
+            wait = self._transaction(try_grant)
+            if wait <= 0:
+                return waited
+            self._sleep(wait)
+            waited += wait
+
+    def _prune(self, now: float) -> None:
+        longest = self._conn.execute("SELECT MAX(seconds) FROM limits").fetchone()[0] or 0.0
+        self._conn.execute("DELETE FROM grants WHERE stamp <= ?", (now - longest,))
+
+    def update_from_headers(self, method: str, headers: Mapping[str, str]) -> None:
+        """Adopt the limits advertised by Riot in a response's headers."""
+        changed = []
+        for scope, header in ((APP_SCOPE, "X-App-Rate-Limit"), (_method_scope(method), "X-Method-Rate-Limit")):
+            value = headers.get(header)
+            limits = parse_rate_limit_header(value)
+            if limits and self._headers_seen.get(scope) != value:
+                changed.append((scope, value, limits))
+        if not changed:
+            return
+
+        def store(now: float) -> float:
+            for scope, _, limits in changed:
+                self._conn.execute("DELETE FROM limits WHERE scope = ?", (scope,))
+                self._conn.executemany(
+                    "INSERT INTO limits (scope, seconds, count) VALUES (?, ?, ?)",
+                    [(scope, seconds, count) for count, seconds in limits],
+                )
+            return 0.0
+
+        self._transaction(store)
+        self._headers_seen.update((scope, value) for scope, value, _ in changed)
+
+    def penalize(self, method: str, headers: Mapping[str, str]) -> float:
+        """Record a 429 response and block its scope for every process; return the delay."""
+        retry_after = parse_retry_after(headers)
+        # "application" and "service" (Riot-side) limits both throttle every method.
+        scope = _method_scope(method) if headers.get("X-Rate-Limit-Type") == "method" else APP_SCOPE
+
+        def block(now: float) -> float:
+            self._conn.execute(
+                "INSERT INTO blocks (scope, until) VALUES (?, ?)"
+                " ON CONFLICT (scope) DO UPDATE SET until = MAX(until, excluded.until)",
+                (scope, now + retry_after),
+            )
+            return retry_after
+
+        return self._transaction(block)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_rate_limiter(path: str | None, priority: str) -> SharedRateLimiter | None:
+    """Open the shared limiter at *path* with *priority*, or return None when *path* is empty (per-process limiting)."""
+    if not path:
+        return None
+    return SharedRateLimiter(path, priority=priority)
@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+
+DEFAULT_STATS_PATH = os.path.join(".cache", "stats.sqlite3")
+DAY_MS = 86_400_000
+
+# Record fields whose daily sums are maintained; averages are sum / games.
+STATS_METRICS: tuple[str, ...] = (
+    "kda",
+    "kills",
+    "deaths",
+    "assists",
+    "cs_per_min",
+    "gold_per_minute",
+    "damage_per_minute",
+    "kill_participation",
+    "vision_score_per_minute",
+    "team_damage_share",
+    "lane_gold_diff",
+    "lane_cs_diff",
+    "gold_diff_at_10",
+    "cs_diff_at_10",
+    "solo_kills",
+    "game_duration",
+)
+SCOPES = ("all", "champion", "role")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    puuid TEXT PRIMARY KEY,
+    riot_id TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS players_riot_id ON players (riot_id);
+CREATE TABLE IF NOT EXISTS games (
+    puuid TEXT NOT NULL,
+    match_id TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (puuid, match_id)
+);
+CREATE TABLE IF NOT EXISTS daily (
+    puuid TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    games INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (puuid, scope, key, day)
+);
+"""
+
+
+def _day(game_start_ms: int) -> int:
+    return int(game_start_ms // DAY_MS)
+
+
+def _scope_keys(record: dict) -> tuple[tuple[str, str], ...]:
+    return (
+        ("all", ""),
+        ("champion", str(record.get("champion", ""))),
+        ("role", str(record.get("team_position") or "NONE")),
+    )
+
+
+class StatsStore:
+    """SQLite store of game records with incrementally maintained daily aggregates.
+
+    Every new record updates one daily bucket per scope (overall, its
+    champion, its role) with game/win counts and metric sums, so period
+    queries only sum a few dozen pre-aggregated rows per group. Records
+    already stored for a player are ignored, so overlapping exports are safe.
+    """
+
+    def __init__(self, path: str = DEFAULT_STATS_PATH) -> None:
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(daily)")}
+        for metric in STATS_METRICS:
+            if f"sum_{metric}" not in existing:
+                # Metrics added later start at zero for days aggregated before they existed.
+                self._conn.execute(f"ALTER TABLE daily ADD COLUMN sum_{metric} REAL NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+        sums = ", ".join(f"sum_{metric}" for metric in STATS_METRICS)
+        placeholders = ", ".join("?" for _ in STATS_METRICS)
+        updates = ", ".join(f"sum_{metric} = sum_{metric} + excluded.sum_{metric}" for metric in STATS_METRICS)
+        self._upsert_daily = (
+            f"INSERT INTO daily (puuid, scope, key, day, games, wins, {sums})"
+            f" VALUES (?, ?, ?, ?, 1, ?, {placeholders})"
+            " ON CONFLICT (puuid, scope, key, day) DO UPDATE SET"
+            f" games = games + 1, wins = wins + excluded.wins, {updates}"
+        )
+
+    def add_records(self, puuid: str, records: Iterable[dict], riot_id: str = "") -> int:
+        """Store the new *records* of *puuid* and fold them into the daily aggregates; return how many were new."""
+        added = 0
+        with self._lock:
+            with self._conn:
+                if riot_id:
+                    self._conn.execute(
+                        "INSERT INTO players (puuid, riot_id) VALUES (?, ?)"
+                        " ON CONFLICT (puuid) DO UPDATE SET riot_id = excluded.riot_id",
+                        (puuid, riot_id),
+                    )
+                for record in records:
+                    day = _day(record.get("game_start") or 0)
+                    inserted = self._conn.execute(
+                        "INSERT OR IGNORE INTO games (puuid, match_id, day, record) VALUES (?, ?, ?, ?)",
+                        (puuid, record["match_id"], day, json.dumps(record, separators=(",", ":"))),
+                    ).rowcount
+                    if not inserted:
+                        continue
+                    values = [float(record.get(metric) or 0) for metric in STATS_METRICS]
+                    win = 1 if record.get("win") else 0
+                    self._conn.executemany(
+                        self._upsert_daily,
+                        [(puuid, scope, key, day, win, *values) for scope, key in _scope_keys(record)],
+                    )
+                    added += 1
+        return added
+
+    def resolve(self, riot_id: str) -> str | None:
+        """Return the PUUID last stored under *riot_id* ("Name#TAG", case-insensitive), if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT puuid FROM players WHERE riot_id = ? COLLATE NOCASE", (riot_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def aggregate(self, puuid: str, since_day: int, until_day: int, scope: str = "all") -> list[dict]:
+        """Return games, win rate and metric averages per *scope* key over the inclusive day range."""
+        if scope not in SCOPES:
+            raise ValueError(f"Unsupported scope: {scope}")
+        sums = ", ".join(f"SUM(sum_{metric})" for metric in STATS_METRICS)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, SUM(games), SUM(wins), {sums} FROM daily"
+                " WHERE puuid = ? AND scope = ? AND day BETWEEN ? AND ?"
+                " GROUP BY key ORDER BY SUM(games) DESC",
+                (puuid, scope, since_day, until_day),
+            ).fetchall()
+        groups = []
+        for key, games, wins, *totals in rows:
+            group = {"key": key, "games": games, "win_rate": round(wins / games, 3)}
+            group.update((metric, round(total / games, 2)) for metric, total in zip(STATS_METRICS, totals))
+            groups.append(group)
+        return groups
+
+    def compare_periods(
+        self, puuid: str, days: int = 30, scope: str = "all", now: float | None = None
+    ) -> list[dict]:
+        """Compare the last *days* days with the *days* before them, per *scope* key.
+
+        Each entry has the key, both periods' aggregates (None when a period
+        has no games) and the change of every average between them.
+        """
+        today = _day((time.time() if now is None else now) * 1000)
+        current = {group["key"]: group for group in self.aggregate(puuid, today - days + 1, today, scope)}
+        previous = {
+            group["key"]: group for group in self.aggregate(puuid, today - 2 * days + 1, today - days, scope)
+        }
+        comparison = []
+        for key in [*current, *(key for key in previous if key not in current)]:
+            now_group, before = current.get(key), previous.get(key)
+            change = {}
+            if now_group and before:
+                change = {
+                    name: round(now_group[name] - before[name], 3)
+                    for name in ("win_rate", *STATS_METRICS)
+                }
+            comparison.append({"key": key, "current": now_group, "previous": before, "change": change})
+        return comparison
+
+    def stats(self) -> dict:
+        """Return the number of players, games and daily buckets stored."""
+        with self._lock:
+            players = self._conn.execute("SELECT COUNT(DISTINCT puuid) FROM games").fetchone()[0]
+            games = self._conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+            buckets = self._conn.execute("SELECT COUNT(*) FROM daily").fetchone()[0]
+        return {"path": self.path, "players": players, "games": games, "daily_buckets": buckets}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_stats_store(path: str | None = DEFAULT_STATS_PATH) -> StatsStore | None:
+    """Open the stats store at *path*, or return None when *path* is empty (store disabled)."""
+    if not path:
+        return None
+    return StatsStore(path)
+
+
+def record_stream(
+    store: StatsStore, puuid: str, records: Iterable[dict], riot_id: str = "", batch_size: int = 500
+) -> Iterator[dict]:
+    """Pass *records* through unchanged while adding them to *store* in batches."""
+    batch: list[dict] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            store.add_records(puuid, batch, riot_id)
+            batch = []
+        yield record
+    if batch:
+        store.add_records(puuid, batch, riot_id)
+
+
+def main() -> None:
+    from .config import get_optional_env_var, load_env
+
+    load_env()
+    parser = argparse.ArgumentParser(description="Inspect the local historical stats store.")
+    subcommands = parser.add_subparsers(dest="action", required=True)
+    subcommands.add_parser("stats", help="show what the store contains")
+    compare = subcommands.add_parser("compare", help="compare the last N days with the N days before")
+    compare.add_argument("player", help="Riot ID (Name#TAG) or PUUID")
+    compare.add_argument("--days", type=int, default=30)
+    compare.add_argument("--scope", choices=SCOPES, default="all")
+    parser.add_argument("--path", default=get_optional_env_var("STATS_DB_PATH", DEFAULT_STATS_PATH))
+    args = parser.parse_args()
+
+    store = StatsStore(args.path)
+    if args.action == "stats":
+        print(json.dumps(store.stats(), indent=2))
+    else:
+        puuid = store.resolve(args.player) or args.player
+        print(json.dumps(store.compare_periods(puuid, args.days, args.scope), indent=2))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,76 @@
+def _cut_point(line: str, width: int) -> int:
+    """Return where to cut *line* to keep at most *width* characters, preferring the last space."""
+    cut = line.rfind(" ", 0, width + 1)
+    return cut if cut > 0 else width
+
+
+def _split_long_line(line: str, width: int) -> list[str]:
+    """Split *line* into pieces of at most *width* characters, preferring to cut at spaces."""
+    pieces: list[str] = []
+    while len(line) > width:
+        cut = _cut_point(line, width)
+        pieces.append(line[:cut])
+        line = line[cut:].lstrip(" ")
+    pieces.append(line)
+    return pieces
+
+
+class TextChunker:
+    """Incrementally split streamed text into chunks that each fit within *limit* characters.
+
+    feed() returns every chunk completed by the new text, so a chunk can be
+    delivered as soon as it fills up; flush() returns the remainder. Lines are
+    kept whole when possible, lines longer than the limit are split, and
+    whitespace-only chunks are never returned.
+    """
+
+    def __init__(self, limit: int = 1900) -> None:
+        self.limit = limit
+        self._pending = ""
+        self._current: list[str] = []
+        self._current_len = 0
+
+    def _emit(self, ready: list[str]) -> None:
+        chunk = "\n".join(self._current)
+        self._current = []
+        self._current_len = 0
+        # Discord rejects empty messages, so blank chunks are dropped.
+        if chunk.strip():
+            ready.append(chunk)
+
+    def _add_line(self, line: str, ready: list[str]) -> None:
+        for piece in _split_long_line(line, self.limit - 1):
+            piece_len = len(piece) + 1
+            if self._current and self._current_len + piece_len > self.limit:
+                self._emit(ready)
+            self._current.append(piece)
+            self._current_len += piece_len
+
+    def feed(self, text: str) -> list[str]:
+        """Consume streamed *text* and return the chunks it completed."""
+        ready: list[str] = []
+        *lines, self._pending = (self._pending + text).split("\n")
+        for line in lines:
+            self._add_line(line.rstrip("\r"), ready)
+        # A partial line that already exceeds the limit cannot fit any chunk whole.
+        while len(self._pending) >= self.limit:
+            cut = _cut_point(self._pending, self.limit - 1)
+            self._add_line(self._pending[:cut], ready)
+            self._pending = self._pending[cut:].lstrip(" ")
+        return ready
+
+    def flush(self) -> list[str]:
+        """Return the remaining buffered text as final chunks."""
+        ready: list[str] = []
+        if self._pending:
+            self._add_line(self._pending.rstrip("\r"), ready)
+            self._pending = ""
+        if self._current:
+            self._emit(ready)
+        return ready
+
+
 def chunk_text(text: str, limit: int = 1900) -> list[str]:
     """Split *text* into chunks that each fit within *limit* characters."""
-    chunks: list[str] = []
-    current: list[str] = []
-    current_len = 0
-
-    for line in text.splitlines():
-        line_len = len(line) + 1
-        if current_len + line_len > limit:
-            chunks.append("\n".join(current))
-            current = [line]
-            current_len = line_len
-        else:
-            current.append(line)
-            current_len += line_len
-
-    if current:
-        chunks.append("\n".join(current))
-
-    return chunks
+    chunker = TextChunker(limit)
+    return chunker.feed(text) + chunker.flush()
@@ -0,0 +1,136 @@
+import logging
+import os
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+# numpy is imported where arrays are built, so importing the Riot client stays cheap.
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMELINE_DIR = ".cache/timelines"
+
+# Per-minute values kept for every participant, in array order along the last axis.
+TIMELINE_CHANNELS: tuple[str, ...] = ("gold", "xp", "cs", "x", "y")
+LANING_MINUTES: tuple[int, ...] = (10, 15)
+
+# Laning columns added to each record; 0 when no timeline or lane opponent is known.
+LANING_KINDS: dict[str, str] = {
+    f"{stat}_diff_at_{minute}": "int" for minute in LANING_MINUTES for stat in ("gold", "xp", "cs")
+}
+LANING_COLUMNS: tuple[str, ...] = tuple(LANING_KINDS)
+
+
+class MatchTimeline:
+    """Per-minute gold, XP, CS and position of every participant of a match.
+
+    ``frames`` has shape (participants, minutes, channels), where row *i*
+    belongs to ``puuids[i]`` and minute 0 is the start of the game.
+    """
+
+    __slots__ = ("puuids", "frames", "_rows")
+
+    def __init__(self, puuids: Sequence[str], frames: "np.ndarray") -> None:
+        self.puuids = tuple(puuids)
+        self.frames = frames
+        self._rows = {puuid: row for row, puuid in enumerate(self.puuids)}
+
+    @property
+    def minutes(self) -> int:
+        return self.frames.shape[1]
+
+    def series(self, puuid: str, channel: str) -> "np.ndarray":
+        """Return the per-minute values of *channel* for *puuid*."""
+        return self.frames[self._rows[puuid], :, TIMELINE_CHANNELS.index(channel)]
+
+    def laning_diffs(self, puuid: str, opponent_puuid: str) -> dict[str, int]:
+        """Return the gold/XP/CS differences of *puuid* over its opponent at each laning minute."""
+        row = self._rows.get(puuid)
+        opponent_row = self._rows.get(opponent_puuid)
+        if row is None or opponent_row is None:
+            return dict.fromkeys(LANING_COLUMNS, 0)
+        diffs: dict[str, int] = {}
+        for minute in LANING_MINUTES:
+            if minute < self.minutes:
+                gold, xp, cs = (self.frames[row, minute, :3] - self.frames[opponent_row, minute, :3]).tolist()
+            else:
+                # The game ended before this minute.
+                gold = xp = cs = 0
+            diffs[f"gold_diff_at_{minute}"] = gold
+            diffs[f"xp_diff_at_{minute}"] = xp
+            diffs[f"cs_diff_at_{minute}"] = cs
+        return diffs
+
+
+def parse_timeline(timeline: dict) -> MatchTimeline:
+    """Convert a match-v5 timeline payload into a MatchTimeline, discarding the event lists."""
+    import numpy as np
+
+    info = timeline["info"]
+    participants = info.get("participants")
+    if participants:
+        ordered = sorted(participants, key=lambda participant: participant["participantId"])
+        puuids = [participant.get("puuid", "") for participant in ordered]
+    else:
+        puuids = list(timeline.get("metadata", {}).get("participants", []))
+
+    frames = info.get("frames", [])
+    values = np.zeros((len(puuids), len(frames), len(TIMELINE_CHANNELS)), dtype=np.int32)
+    for minute, frame in enumerate(frames):
+        for participant_id, stats in frame.get("participantFrames", {}).items():
+            row = int(participant_id) - 1
+            if not 0 <= row < len(puuids):
+                continue
+            position = stats.get("position") or {}
+            values[row, minute] = (
+                stats.get("totalGold", 0),
+                stats.get("xp", 0),
+                stats.get("minionsKilled", 0) + stats.get("jungleMinionsKilled", 0),
+                position.get("x", 0),
+                position.get("y", 0),
+            )
+    return MatchTimeline(puuids, values)
+
+
+class TimelineStore:
+    """Directory of compressed per-match timeline arrays (one ``.npz`` file per match).
+
+    A stored timeline is a few kilobytes instead of the megabyte-sized JSON
+    payload, and loading it skips JSON parsing entirely.
+    """
+
+    def __init__(self, root: str = DEFAULT_TIMELINE_DIR) -> None:
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, match_id: str) -> str:
+        return os.path.join(self.root, f"{match_id}.npz")
+
+    def get(self, match_id: str) -> MatchTimeline | None:
+        import numpy as np
+
+        try:
+            with np.load(self._path(match_id)) as stored:
+                return MatchTimeline(stored["puuids"].tolist(), stored["frames"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable timeline for %s: %s", match_id, e)
+            return None
+
+    def put(self, match_id: str, timeline: MatchTimeline) -> None:
+        import numpy as np
+
+        path = self._path(match_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as fh:
+            np.savez_compressed(fh, puuids=np.array(timeline.puuids, dtype=str), frames=timeline.frames)
+        os.replace(tmp_path, path)
+
+
+def open_timeline_store(root: str | None = DEFAULT_TIMELINE_DIR) -> TimelineStore | None:
+    """Return the timeline store at *root*, or None when *root* is empty (storage disabled)."""
+    if not root:
+        return None
+    return TimelineStore(root)
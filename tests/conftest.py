@@ -0,0 +1,30 @@
+import importlib
+
+import pytest
+
+from benchmarks.mock_riot import MockRiotConfig, MockRiotServer
+from lol_coach.rate_limit import RateLimiter
+from lol_coach.riot_api import RiotClient
+
+MOCK_MATCHES = 12
+
+
+@pytest.fixture(scope="session")
+def mock_riot():
+    """A mock Riot server with MOCK_MATCHES matches (MOCK_12 newest) and no latency."""
+    with MockRiotServer(MockRiotConfig(total_matches=MOCK_MATCHES, latency=0.0)) as server:
+        yield server
+
+
+@pytest.fixture
+def export(mock_riot, tmp_path, monkeypatch):
+    """The export.py module, writing into *tmp_path* and fetching from the mock Riot server."""
+    monkeypatch.setenv("RIOT_API_KEY", "test-key")
+    monkeypatch.chdir(tmp_path)
+    module = importlib.import_module("export")
+    monkeypatch.setattr(
+        module,
+        "build_client",
+        lambda: RiotClient("test-key", limiter=RateLimiter(), base_url=mock_riot.base_url, max_workers=2),
+    )
+    return module
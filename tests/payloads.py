@@ -0,0 +1,114 @@
+"""Small hand-written match-v5 payloads, and a Riot API stand-in serving them, shared by the tests."""
+
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+POSITIONS = ("TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY")
+
+
+def participant(puuid, team_id=100, position="MIDDLE", **stats):
+    """Return a participant with every required record field, overridden by *stats*."""
+    return {
+        "puuid": puuid,
+        "teamId": team_id,
+        "teamPosition": position,
+        "championName": "Ahri",
+        "role": "SOLO",
+        "lane": "MIDDLE",
+        "win": team_id == 100,
+        "kills": 5,
+        "deaths": 3,
+        "assists": 7,
+        "totalMinionsKilled": 150,
+        "neutralMinionsKilled": 10,
+        "totalDamageDealtToChampions": 20000,
+        "totalDamageTaken": 15000,
+        "totalHeal": 3000,
+        "goldEarned": 11000,
+        "champExperience": 12000,
+        "visionScore": 20,
+        "wardsPlaced": 8,
+        **stats,
+    }
+
+
+def lobby_participants():
+    """Return ten participants: "blue-<POSITION>" on team 100 and "red-<POSITION>" on team 200."""
+    players = []
+    for team_index, (side, team_id) in enumerate((("blue", 100), ("red", 200))):
+        for slot, position in enumerate(POSITIONS):
+            players.append(
+                participant(
+                    f"{side}-{position}",
+                    team_id,
+                    position,
+                    participantId=team_index * 5 + slot + 1,
+                    championName=f"{side.title()}{position.title()}",
+                    kills=slot + 1 + team_index,
+                    goldEarned=10000 + 500 * slot + 1000 * team_index,
+                )
+            )
+    return players
+
+
+def match_info(participants=None, duration=1800, queue_id=420, start=1_700_000_000_000):
+    """Return a match-v5 'info' block; a full ten-player lobby unless *participants* is given."""
+    return {
+        "gameDuration": duration,
+        "gameStartTimestamp": start,
+        "gameVersion": "14.3.555.1234",
+        "queueId": queue_id,
+        "participants": lobby_participants() if participants is None else participants,
+    }
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        self.text = str(body)
+        self.raw = None
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error")
+
+    def json(self):
+        return self.body
+
+
+class FakeRiot:
+    """requests.Session stand-in answering the account, match-ID and match endpoints.
+
+    It lists *total_matches* IDs "<prefix>_<n>", newest (highest n) first, and
+    serves every match as a match_info() lobby lasting 1200 + n seconds. Each
+    Riot ID except "Nobody" resolves to *puuid*.
+    """
+
+    def __init__(self, total_matches=250, prefix="EUW1", puuid="blue-MIDDLE"):
+        self.match_ids = [f"{prefix}_{n}" for n in range(total_matches, 0, -1)]
+        self.puuid = puuid
+        self.urls = []
+
+    def close(self):
+        pass
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        parts = urlsplit(url)
+        path = parts.path.split("/")
+        if path[2] == "account":
+            if path[-2] == "Nobody":
+                return FakeResponse(404, {"status": {"message": "Not found"}})
+            return FakeResponse(200, {"puuid": self.puuid})
+        if path[-1] == "ids":
+            query = parse_qs(parts.query)
+            start, count = int(query["start"][0]), int(query["count"][0])
+            return FakeResponse(200, self.match_ids[start : start + count])
+        match_id = path[-1]
+        if match_id not in self.match_ids:
+            return FakeResponse(404, {"status": {"message": "Not found"}})
+        duration = 1200 + int(match_id.rpartition("_")[2])
+        return FakeResponse(200, {"metadata": {"matchId": match_id}, "info": match_info(duration=duration)})
@@ -0,0 +1,54 @@
+from lol_coach.account_cache import UNKNOWN_RIOT_ID, PuuidCache
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_their_ttl():
+    clock = Clock()
+    cache = PuuidCache(ttl=100, negative_ttl=10, clock=clock)
+    cache.put("Name", "EUW", "puuid-1")
+    cache.put_unknown("Ghost", "EUW")
+    assert cache.get("name ", "euw") == "puuid-1"
+    assert cache.get("Ghost", "EUW") == UNKNOWN_RIOT_ID
+    clock.now += 50
+    assert cache.get("Ghost", "EUW") is None
+    assert cache.get("Name", "EUW") == "puuid-1"
+    clock.now += 51
+    assert cache.get("Name", "EUW") is None
+
+
+def test_resolving_a_new_riot_id_drops_the_old_one():
+    cache = PuuidCache(clock=Clock())
+    cache.put("Old", "EUW", "puuid-1")
+    cache.put("New", "EUW", "puuid-1")
+    assert cache.get("Old", "EUW") is None
+    assert cache.get("New", "EUW") == "puuid-1"
+
+
+def test_newer_match_with_another_riot_id_invalidates():
+    clock = Clock()
+    cache = PuuidCache(ttl=1000, clock=clock)
+    cache.put("Old", "EUW", "puuid-1")
+    # A game played before the resolution may still show the previous name.
+    assert not cache.observe("puuid-1", "Older", "EUW", clock.now - 1)
+    assert not cache.observe("puuid-1", "Old", "EUW", clock.now + 1)
+    assert cache.get("Old", "EUW") == "puuid-1"
+    assert cache.observe("puuid-1", "New", "EUW", clock.now + 1)
+    assert cache.get("Old", "EUW") is None
+    assert not cache.observe("puuid-2", "Anyone", "EUW", clock.now + 1)
+
+
+def test_entries_persist(tmp_path):
+    path = str(tmp_path / "puuids.json")
+    clock = Clock()
+    PuuidCache(path=path, clock=clock).put("Name", "EUW", "puuid-1")
+    reloaded = PuuidCache(path=path, clock=clock)
+    assert reloaded.get("Name", "EUW") == "puuid-1"
+    reloaded.observe("puuid-1", "Renamed", "EUW", clock.now + 1)
+    assert PuuidCache(path=path, clock=clock).get("Name", "EUW") is None
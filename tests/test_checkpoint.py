@@ -0,0 +1,50 @@
+import os
+
+from lol_coach.checkpoint import ExportJournal
+
+
+def test_journal_resumes_finished_matches(tmp_path):
+    path = str(tmp_path / "journal.ndjson")
+    journal = ExportJournal(path)
+    journal.start(puuid="p1", match_ids=["M2", "M1"])
+    journal.add("M2", {"p1": {"match_id": "M2", "kills": 3}})
+    journal.close()
+
+    resumed = ExportJournal(path, resume=True)
+    assert resumed.run == {"puuid": "p1", "match_ids": ["M2", "M1"]}
+    assert "M2" in resumed and "M1" not in resumed and len(resumed) == 1
+    assert resumed.get("M2", "p1")["kills"] == 3
+    resumed.discard()
+    assert not os.path.exists(path)
+
+
+def test_torn_last_line_is_skipped_and_terminated(tmp_path):
+    path = str(tmp_path / "journal.ndjson")
+    journal = ExportJournal(path)
+    journal.start(puuid="p1", match_ids=["M3", "M2", "M1"])
+    journal.add("M3", {})
+    journal.close()
+    # A run killed halfway through writing its last entry.
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write('{"match_id":"M2","rec')
+
+    resumed = ExportJournal(path, resume=True)
+    assert "M3" in resumed and "M2" not in resumed
+    resumed.add("M2", {"p1": {"match_id": "M2"}})
+    resumed.close()
+
+    again = ExportJournal(path, resume=True)
+    assert "M2" in again and again.records("M2") == {"p1": {"match_id": "M2"}}
+    again.close()
+
+
+def test_without_resume_the_journal_starts_over(tmp_path):
+    path = str(tmp_path / "journal.ndjson")
+    journal = ExportJournal(path)
+    journal.start(puuid="p1", match_ids=["M1"])
+    journal.add("M1", {})
+    journal.close()
+
+    fresh = ExportJournal(path)
+    assert fresh.run == {} and len(fresh) == 0
+    fresh.close()
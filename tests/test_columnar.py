@@ -0,0 +1,36 @@
+from lol_coach.columnar import read_dataset, write_parquet_dataset
+from lol_coach.lobby import build_lobby_records
+
+from .payloads import match_info
+
+DAY = 86_400_000
+
+
+def records(start, count=3):
+    # One record per game; games are a day apart from *start* (epoch milliseconds).
+    return [
+        build_lobby_records(f"EUW1_{n}", match_info(start=start + n * DAY))["blue-MIDDLE"] for n in range(count)
+    ]
+
+
+def test_dataset_round_trip_with_pruned_columns_and_filters(tmp_path):
+    root = str(tmp_path / "dataset")
+    assert write_parquet_dataset(records(1_700_000_000_000), root, "Bench_MOCK") == 3
+    assert write_parquet_dataset(records(1_700_000_000_000, 2), root, "Other_EUW") == 2
+
+    table = read_dataset(root, columns=["match_id", "kills", "player"])
+    assert table.column_names == ["match_id", "kills", "player"] and table.num_rows == 5
+
+    table = read_dataset(root, columns=["match_id"], players=["Bench_MOCK"], since="2023-11-15")
+    assert sorted(table.column("match_id").to_pylist()) == ["EUW1_1", "EUW1_2"]
+
+
+def test_patch_partitions_and_rewrites_replace_the_player(tmp_path):
+    root = str(tmp_path / "dataset")
+    write_parquet_dataset(records(1_700_000_000_000), root, "Bench_MOCK", partition_by="patch")
+    assert (tmp_path / "dataset" / "player=Bench_MOCK" / "patch=14.3").is_dir()
+    # Patch values stay strings ("14.3", not 14.3) when read back.
+    assert read_dataset(root, columns=["patch"], patches=["14.3"]).column("patch").to_pylist() == ["14.3"] * 3
+
+    write_parquet_dataset(records(1_700_000_000_000, 1), root, "Bench_MOCK", partition_by="patch")
+    assert read_dataset(root, columns=["match_id"]).num_rows == 1
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from lol_coach.export_service import merge_games_data, read_exported_games
+
+NDJSON = "recent_games_Bench_MOCK.ndjson"
+TOON = "recent_games_Bench_MOCK.txt"
+
+
+def match_ids(path):
+    return [record["match_id"] for record in read_exported_games(path)]
+
+
+def test_merge_games_data_drops_duplicates_and_caps():
+    new = [{"match_id": "M3"}, {"match_id": "M2"}]
+    old = [{"match_id": "M2"}, {"match_id": "M1"}, {"match_id": "M0"}]
+    assert [r["match_id"] for r in merge_games_data(new, old, 3)] == ["M3", "M2", "M1"]
+
+
+def test_export_writes_formats(export):
+    assert export.run_export("Bench", "MOCK", 5, formats=["csv", "ndjson", "toon"]) == {"Bench#MOCK": 5}
+    assert match_ids(NDJSON) == ["MOCK_12", "MOCK_11", "MOCK_10", "MOCK_9", "MOCK_8"]
+    with open("recent_games_Bench_MOCK.csv", encoding="utf-8") as fh:
+        assert len(fh.readlines()) == 6
+    assert os.path.getsize(TOON) > 100
+
+
+def test_default_formats_are_streamed(export):
+    # TOON keeps every game in memory, so it is only written when asked for.
+    export.run_export("Bench", "MOCK", 3)
+    assert len(match_ids(NDJSON)) == 3
+    assert not os.path.exists(TOON)
+
+
+def test_incremental_export_merges_new_matches(export):
+    export.run_export("Bench", "MOCK", 5, incremental=True, formats=["ndjson", "toon"])
+    # Pretend the two newest matches were played after that export.
+    with open(NDJSON, encoding="utf-8") as fh:
+        lines = fh.readlines()
+    with open(NDJSON, "w", encoding="utf-8") as fh:
+        fh.writelines(lines[2:])
+
+    export.run_export("Bench", "MOCK", 5, incremental=True, formats=["ndjson", "toon"])
+    assert match_ids(NDJSON) == ["MOCK_12", "MOCK_11", "MOCK_10", "MOCK_9", "MOCK_8"]
+    assert not os.path.exists(f"{NDJSON}.prev")
+    # TOON is built from the merged records, not only the newly fetched ones.
+    with open(TOON, encoding="utf-8") as fh:
+        toon = fh.read()
+    assert all(f"MOCK_{n}" in toon for n in range(8, 13))
+
+
+def test_incremental_export_without_ndjson_is_rejected(export):
+    export.run_export("Bench", "MOCK", 5, incremental=True, formats=["csv", "ndjson"])
+    with pytest.raises(ValueError):
+        export.run_export("Bench", "MOCK", 5, incremental=True, formats=["csv", "toon"])
+    assert len(match_ids(NDJSON)) == 5
+
+
+def test_toon_without_ndjson(export):
+    export.run_export("Bench", "MOCK", 3, formats=["toon"])
+    assert not os.path.exists(NDJSON)
+    with open(TOON, encoding="utf-8") as fh:
+        assert "MOCK_12" in fh.read()
+
+
+def test_resume_replays_journal(export):
+    journal = export.open_journal("recent_games_Bench_MOCK", resume=False)
+    journal.start(puuid="bench-player-puuid", match_ids=["MOCK_12", "MOCK_11"])
+    journal.add("MOCK_12", {"bench-player-puuid": {"match_id": "MOCK_12", "from_journal": True}})
+    journal.close()
+
+    export.run_export("Bench", "MOCK", 5, formats=["ndjson"], resume=True)
+    records = list(read_exported_games(NDJSON))
+    assert [r["match_id"] for r in records] == ["MOCK_12", "MOCK_11"]
+    assert records[0].get("from_journal") is True
+    assert not os.listdir(export.CHECKPOINT_DIR)
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from lol_coach.jobs import JobRejectedError, JobScheduler
+
+
+def test_guilds_are_served_round_robin():
+    order = []
+
+    def job(name):
+        async def run():
+            order.append(name)
+            await asyncio.sleep(0)
+            return name
+
+        return run
+
+    async def main():
+        scheduler = JobScheduler(workers=1, max_queued=10, max_per_user=10)
+        submissions = [
+            scheduler.submit("busy", "u1", job("busy-1")),
+            scheduler.submit("busy", "u1", job("busy-2")),
+            scheduler.submit("busy", "u1", job("busy-3")),
+            scheduler.submit("quiet", "u2", job("quiet-1")),
+        ]
+        tasks = [asyncio.ensure_future(submission) for submission in submissions]
+        await asyncio.sleep(0)
+        scheduler.start()
+        results = await asyncio.gather(*tasks)
+        await scheduler.stop()
+        return results
+
+    assert asyncio.run(main()) == ["busy-1", "busy-2", "busy-3", "quiet-1"]
+    assert order == ["busy-1", "quiet-1", "busy-2", "busy-3"]
+
+
+def test_per_user_and_queue_limits():
+    async def main():
+        scheduler = JobScheduler(workers=1, max_queued=2, max_per_user=1)
+        release = asyncio.Event()
+
+        async def blocked():
+            await release.wait()
+            return "done"
+
+        scheduler.start()
+        first = asyncio.ensure_future(scheduler.submit("g", "u1", blocked))
+        await asyncio.sleep(0)
+        with pytest.raises(JobRejectedError):
+            await scheduler.submit("g", "u1", blocked)
+
+        queued = []
+        waiting = [
+            asyncio.ensure_future(scheduler.submit("g", f"u{i}", blocked, on_queued=queued.append)) for i in (2, 3)
+        ]
+        await asyncio.sleep(0)
+        with pytest.raises(JobRejectedError):
+            await scheduler.submit("g", "u4", blocked)
+        assert (scheduler.running, scheduler.queued) == (1, 2)
+        assert queued == [0, 1]
+
+        release.set()
+        assert await asyncio.gather(first, *waiting) == ["done"] * 3
+        await scheduler.stop()
+
+    asyncio.run(main())
+
+
+def test_job_errors_reach_the_submitter():
+    async def failing():
+        raise ValueError("bad")
+
+    async def main():
+        scheduler = JobScheduler(workers=1)
+        scheduler.start()
+        with pytest.raises(ValueError):
+            await scheduler.submit("g", "u", failing)
+        await scheduler.stop()
+
+    asyncio.run(main())
+
+
+def test_enqueue_decides_admission_before_returning():
+    async def main():
+        scheduler = JobScheduler(workers=1, max_per_user=1)
+
+        async def job():
+            return "done"
+
+        future = scheduler.enqueue("g", "u", job)
+        # Rejected synchronously, before anything is awaited.
+        with pytest.raises(JobRejectedError):
+            scheduler.enqueue("g", "u", job)
+        scheduler.start()
+        assert await future == "done"
+        await asyncio.sleep(0)
+        assert await scheduler.submit("g", "u", job) == "done"
+        await scheduler.stop()
+
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+import pytest
+
+from lol_coach.lobby import LobbyIndex, build_lobby_records, patch_from_version
+
+from .payloads import POSITIONS, match_info
+
+
+def test_one_pass_extracts_every_participant():
+    lobby = build_lobby_records("EUW1_1", match_info())
+    assert len(lobby) == 10
+    record = lobby["blue-MIDDLE"]
+    assert (record["match_id"], record["patch"], record["queue_id"]) == ("EUW1_1", "14.3", 420)
+    assert record["game_start"] == 1_700_000_000_000
+    assert record["champion"] == "BlueMiddle"
+
+
+def test_team_shares_and_lane_opponent():
+    lobby = build_lobby_records("EUW1_1", match_info())
+    blue = [lobby[f"blue-{position}"] for position in POSITIONS]
+    assert sum(record["team_gold_share"] for record in blue) == pytest.approx(1, abs=0.01)
+    assert sum(record["team_kill_share"] for record in blue) == pytest.approx(1, abs=0.01)
+    mid, enemy_mid = lobby["blue-MIDDLE"], lobby["red-MIDDLE"]
+    assert mid["lane_opponent"] == "RedMiddle"
+    assert mid["lane_gold_diff"] == mid["gold"] - enemy_mid["gold"] == -1000
+    assert mid["lane_gold_diff"] == -enemy_mid["lane_gold_diff"]
+
+
+def test_participants_without_required_fields_are_skipped():
+    info = match_info()
+    del info["participants"][0]["goldEarned"]
+    lobby = build_lobby_records("EUW1_1", info)
+    assert len(lobby) == 9 and "blue-TOP" not in lobby
+    # Without a lane opponent, the diffs are zero rather than missing.
+    assert lobby["red-TOP"]["lane_opponent"] == "" and lobby["red-TOP"]["lane_gold_diff"] == 0
+
+
+def test_patch_from_version():
+    assert patch_from_version("14.3.555.1234") == "14.3"
+    assert patch_from_version("") == ""
+
+
+def test_index_is_lru_by_match():
+    index = LobbyIndex(max_matches=2)
+    index.add("EUW1_1", {"a": {"kills": 1}})
+    index.add("EUW1_2", {"a": {"kills": 2}})
+    assert index.get("EUW1_1", "a") == {"kills": 1}
+    index.add("EUW1_3", {"a": {"kills": 3}})
+    # EUW1_1 was read last, so EUW1_2 is the one evicted.
+    assert "EUW1_1" in index and "EUW1_2" not in index and len(index) == 2
+    assert index.get("EUW1_3", "b") is None and index.lobby("EUW1_2") is None
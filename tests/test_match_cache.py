@@ -0,0 +1,33 @@
+import os
+
+from lol_coach.match_cache import MatchCache, open_match_cache
+
+
+def payload(n):
+    # Hex of random bytes only halves when compressed: every payload takes about 9 KB in the database.
+    return {"info": {"queueId": 420, "gameStartTimestamp": n}, "blob": os.urandom(8192).hex()}
+
+
+def test_put_get_and_metadata(tmp_path):
+    cache = MatchCache(str(tmp_path / "matches.sqlite3"))
+    cache.put("EUW1_1", {"info": {"queueId": 450, "gameCreation": 7}})
+    assert cache.get("EUW1_1") == {"info": {"queueId": 450, "gameCreation": 7}}
+    assert cache.get("EUW1_2") is None
+    assert cache.metadata(["EUW1_1", "EUW1_2"]) == {"EUW1_1": (450, 7)}
+    cache.delete("EUW1_1")
+    assert cache.stats()["entries"] == 0
+    cache.close()
+    assert open_match_cache("", 512) is None and open_match_cache("x", 0) is None
+
+
+def test_processes_sharing_the_file_stay_under_the_budget(tmp_path):
+    path = str(tmp_path / "matches.sqlite3")
+    max_bytes = 200 * 1024
+    # Two connections stand in for the bot and an export writing to the same cache.
+    first, second = MatchCache(path, max_bytes), MatchCache(path, max_bytes)
+    for n in range(30):
+        (first if n % 2 else second).put(f"EUW1_{n}", payload(n))
+    assert first.stats()["size_bytes"] <= max_bytes
+    assert first.get("EUW1_29") is not None and first.get("EUW1_0") is None
+    first.close()
+    second.close()
@@ -0,0 +1,79 @@
+import pytest
+
+from lol_coach.match_cache import MatchCache
+from lol_coach.match_filter import QUEUE_PRESETS, MatchFilter, parse_match_filter
+from lol_coach.rate_limit import RateLimiter
+from lol_coach.riot_api import RiotClient
+
+from .payloads import FakeResponse
+
+
+def test_query_params():
+    assert QUEUE_PRESETS["solo"].query_params() == {"queue": 420}
+    # The endpoint takes a single queue, so several queues are listed one query each.
+    assert QUEUE_PRESETS["ranked"].query_params() == {"type": "ranked"}
+    assert QUEUE_PRESETS["ranked"].queries() == [{"type": "ranked", "queue": 420}, {"type": "ranked", "queue": 440}]
+    assert MatchFilter().queries() == [{}]
+    match_filter = parse_match_filter("440", start="2024-01-01", end="1704153600")
+    assert match_filter.query_params() == {"queue": 440, "startTime": 1704067200, "endTime": 1704153600}
+
+
+def test_accepts_and_filter_records():
+    match_filter = MatchFilter(frozenset({420, 440}), start_time=1000)
+    assert match_filter.accepts(420, 2_000_000)
+    assert not match_filter.accepts(450, 2_000_000)
+    assert not match_filter.accepts(420, 999_000)
+    assert match_filter.accepts(None, None)
+    records = [{"queue_id": 420, "game_start": 2_000_000}, {"queue_id": 450, "game_start": 2_000_000}]
+    assert list(match_filter.filter_records(records)) == records[:1]
+    assert not MatchFilter() and match_filter
+
+
+def test_parse_match_filter():
+    assert parse_match_filter("Ranked") == QUEUE_PRESETS["ranked"]
+    assert parse_match_filter("400, 430").queues == frozenset({400, 430})
+    assert parse_match_filter(None, match_type="normal").match_type == "normal"
+    assert parse_match_filter(since_days=7).start_time is not None
+    with pytest.raises(ValueError):
+        parse_match_filter("ranked-ish")
+
+
+def test_get_match_ids_sends_the_filter(mock_riot):
+    with RiotClient("test-key", limiter=RateLimiter(), base_url=mock_riot.base_url) as client:
+        paths = []
+        get = client.get
+        client.get = lambda path, method, region=None: paths.append(path) or get(path, method, region)
+        match_ids = client.get_match_ids("puuid", 3, match_filter=QUEUE_PRESETS["solo"])
+    assert match_ids == ["MOCK_12", "MOCK_11", "MOCK_10"]
+    assert paths[0].endswith("&queue=420")
+
+
+def test_multi_queue_filter_lists_each_queue(mock_riot):
+    # Odd matches are solo queue games, even ones flex games, all newest first.
+    by_queue = {"420": [f"EUW1_{n}" for n in range(11, 0, -2)], "440": [f"EUW1_{n}" for n in range(12, 0, -2)]}
+    paths = []
+
+    def get(path, method, region=None):
+        paths.append(path)
+        query = dict(part.split("=") for part in path.partition("?")[2].split("&"))
+        start, count = int(query["start"]), int(query["count"])
+        return FakeResponse(200, by_queue[query["queue"]][start : start + count])
+
+    with RiotClient("test-key", limiter=RateLimiter(), base_url=mock_riot.base_url) as client:
+        client.get = get
+        match_ids = client.get_match_ids("puuid", 5, batch_size=2, match_filter=QUEUE_PRESETS["ranked"])
+        assert match_ids == ["EUW1_12", "EUW1_11", "EUW1_10", "EUW1_9", "EUW1_8"]
+        assert {path.rpartition("queue=")[2] for path in paths} == {"420", "440"}
+        # A queue listing without the known match still stops at older ones.
+        match_ids = client.get_match_ids("puuid", 5, stop_at="EUW1_9", match_filter=QUEUE_PRESETS["ranked"])
+        assert match_ids == ["EUW1_12", "EUW1_11", "EUW1_10"]
+
+
+def test_cached_matches_outside_the_filter_are_dropped(mock_riot, tmp_path):
+    cache = MatchCache(str(tmp_path / "matches.sqlite3"))
+    cache.put("MOCK_11", {"info": {"queueId": 450, "gameStartTimestamp": 1}})
+    cache.put("MOCK_10", {"info": {"queueId": 440, "gameStartTimestamp": 1}})
+    with RiotClient("test-key", limiter=RateLimiter(), cache=cache, base_url=mock_riot.base_url) as client:
+        match_ids = client.get_match_ids("puuid", 4, match_filter=QUEUE_PRESETS["ranked"])
+    assert match_ids == ["MOCK_12", "MOCK_10", "MOCK_9", "MOCK_8"]
+    cache.close()
@@ -0,0 +1,40 @@
+import pytest
+
+from lol_coach.metrics import Metrics
+
+
+def test_counters_and_timers_are_summarized():
+    metrics = Metrics()
+    metrics.incr("riot_requests", method="match-by-id", status=200)
+    metrics.incr("riot_requests", 2, method="match-by-id", status=200)
+    metrics.observe("extraction", 0.02)
+    metrics.observe("extraction", 0.04)
+    with pytest.raises(ValueError):
+        with metrics.timer("match_fetch"):
+            raise ValueError("boom")
+
+    summary = metrics.summary()
+    counters = {(c["name"], c.get("stage")): c["value"] for c in summary["counters"]}
+    assert counters[("riot_requests", None)] == 3
+    # A failing timed block is still timed, and counted as a failure of its stage.
+    assert counters[("failures", "match_fetch")] == 1
+    stages = {s["stage"]: s for s in summary["stages"]}
+    assert stages["extraction"]["count"] == 2
+    assert stages["extraction"]["mean_seconds"] == pytest.approx(0.03)
+    assert stages["match_fetch"]["count"] == 1
+
+    metrics.reset()
+    assert metrics.summary()["counters"] == []
+
+
+def test_prometheus_exposition():
+    metrics = Metrics(namespace="test")
+    metrics.incr("cache_hits", cache='match "v5"')
+    metrics.observe("llm", 0.3)
+    metrics.observe("llm", 45)
+    text = metrics.render_prometheus()
+    assert '# TYPE test_cache_hits_total counter\ntest_cache_hits_total{cache="match \\"v5\\""} 1\n' in text
+    assert 'test_stage_seconds_bucket{stage="llm",le="0.25"} 0' in text
+    assert 'test_stage_seconds_bucket{stage="llm",le="0.5"} 1' in text
+    assert 'test_stage_seconds_bucket{stage="llm",le="+Inf"} 2' in text
+    assert 'test_stage_seconds_count{stage="llm"} 2' in text
@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from lol_coach.percentiles import PercentileIndex, QuantileSketch
+
+
+def exact_cdf(values, x):
+    below = sum(v < x for v in values)
+    equal = sum(v == x for v in values)
+    return (below + equal / 2) / len(values)
+
+
+def test_sketch_cdf_and_quantile_are_accurate():
+    rng = random.Random(1)
+    values = [rng.lognormvariate(0, 1) for _ in range(20_000)]
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    ordered = sorted(values)
+    for q in (0.01, 0.1, 0.5, 0.9, 0.99):
+        x = ordered[int(q * len(ordered))]
+        assert sketch.cdf(x) == pytest.approx(q, abs=0.01)
+        assert exact_cdf(values, sketch.quantile(q)) == pytest.approx(q, abs=0.01)
+    assert sketch.cdf(ordered[0] - 1) == 0.0
+    assert sketch.cdf(ordered[-1] + 1) == 1.0
+    assert len(sketch.to_list()[3]) < 200
+
+
+def test_sketch_merge_and_round_trip():
+    rng = random.Random(2)
+    left, right, whole = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i in range(5000):
+        value = rng.gauss(0, 1)
+        (left if i % 2 else right).add(value)
+        whole.add(value)
+    left.merge(right)
+    restored = QuantileSketch.from_list(left.to_list())
+    assert restored.count == whole.count == 5000
+    for x in (-2, -1, 0, 1, 2):
+        assert restored.cdf(x) == pytest.approx(whole.cdf(x), abs=0.01)
+
+
+def lobby(seed, champion="Jinx", role="BOTTOM", cs=None):
+    rng = random.Random(seed)
+    return {
+        f"p{seed}-{i}": {
+            "champion": champion if i == 0 else f"Other{i}",
+            "team_position": role if i == 0 else "TOP",
+            "cs_per_min": cs if cs is not None else rng.uniform(4, 10),
+        }
+        for i in range(10)
+    }
+
+
+def test_index_processes_sharing_a_file_keep_each_others_lobbies(tmp_path):
+    path = str(tmp_path / "percentiles.sqlite3")
+    bot, exporter = PercentileIndex(path), PercentileIndex(path)
+    for seed in range(30):
+        assert bot.add_lobby(f"A{seed}", lobby(seed))
+        assert exporter.add_lobby(f"B{seed}", lobby(100 + seed))
+    # The same match seen by both is only counted once.
+    assert exporter.add_lobby("A0", lobby(0))
+    bot.save()
+    exporter.save()
+    assert not bot.add_lobby("A0", lobby(0))
+
+    reader = PercentileIndex(path)
+    assert len(reader) == 60
+    sketch, scope = reader._sketch("Jinx", "BOTTOM", "cs_per_min")
+    assert (sketch.count, scope) == (60, "Jinx")
+    for index in (bot, exporter, reader):
+        index.close()
+
+
+def test_player_percentiles_rank_each_game(tmp_path):
+    index = PercentileIndex(str(tmp_path / "percentiles.sqlite3"))
+    for seed in range(200):
+        index.add_lobby(f"M{seed}", lobby(seed))
+    index.save()
+
+    # Games at roughly p90 stay near p90 instead of being averaged toward p50.
+    games = [{"champion": "Jinx", "team_position": "BOTTOM", "cs_per_min": cs} for cs in (9.2, 9.4, 9.5, 9.6)]
+    [entry] = index.player_percentiles(games)
+    assert entry["games"] == 4 and "vs" not in entry
+    assert 85 <= entry["cs_per_min_pct"] <= 95
+
+    # A champion without MIN_SAMPLES games falls back to the role across champions.
+    index.add_lobby("rare", lobby(999, champion="Rare"))
+    index.save()
+    [entry] = index.player_percentiles([{"champion": "Rare", "team_position": "BOTTOM", "cs_per_min": 7.0}])
+    assert entry["vs"] == "role"
+    assert index.percentile("Nobody", "JUNGLE", "cs_per_min", 5.0) is None
+    index.close()
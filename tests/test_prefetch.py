@@ -0,0 +1,134 @@
+import pytest
+
+from benchmarks.fixtures import BENCH_PUUID
+from lol_coach.lobby import LobbyIndex
+from lol_coach.prefetch import Prefetcher, RequestBudget
+from lol_coach.rate_limit import RateLimiter
+from lol_coach.riot_api import RiotClient
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self, method):
+        self.acquired += 1
+        return 0.0
+
+
+def test_request_budget_counts_in_a_sliding_window():
+    clock = Clock()
+    limiter = CountingLimiter()
+    budget = RequestBudget(limiter, max_requests=3, window=60, clock=clock)
+    for _ in range(3):
+        budget.acquire("match-by-id")
+        clock.now += 10
+    assert (budget.remaining(), limiter.acquired) == (0, 3)
+    clock.now += 31
+    assert budget.remaining() == 1
+
+
+@pytest.fixture
+def prefetcher(mock_riot, tmp_path):
+    clock = Clock()
+    budget = RequestBudget(RateLimiter(), max_requests=5, clock=clock)
+    client = RiotClient("test-key", limiter=budget, base_url=mock_riot.base_url, max_workers=2)
+    prefetcher = Prefetcher(
+        client,
+        budget,
+        LobbyIndex(),
+        total_games=6,
+        interval=60,
+        max_interval=600,
+        path=str(tmp_path / "prefetch.json"),
+        clock=clock,
+    )
+    yield prefetcher
+    client.close()
+
+
+def test_matches_over_budget_are_deferred_not_skipped(prefetcher):
+    clock = prefetcher._clock
+    assert prefetcher.register(BENCH_PUUID, "Bench#MOCK")
+    assert prefetcher.poll_due() == 1
+    # One request lists the IDs; the other four fetch the newest matches.
+    assert all(f"MOCK_{n}" in prefetcher.lobby_index for n in (12, 11, 10, 9))
+    player = prefetcher._players[BENCH_PUUID]
+    assert (player.last_match_id, player.deferred) == ("MOCK_12", ["MOCK_8", "MOCK_7"])
+    assert player.interval == 60
+
+    clock.now += 3600
+    assert prefetcher.poll_due() == 1
+    assert "MOCK_8" in prefetcher.lobby_index and "MOCK_7" in prefetcher.lobby_index
+    assert player.deferred == []
+
+
+def test_inactive_players_back_off_with_jitter(prefetcher):
+    clock = prefetcher._clock
+    prefetcher.budget.max_requests = 1000
+    prefetcher.register(BENCH_PUUID, "Bench#MOCK")
+    prefetcher.poll_due()
+    player = prefetcher._players[BENCH_PUUID]
+    intervals = []
+    for _ in range(6):
+        clock.now = player.next_poll
+        prefetcher.poll_due()
+        intervals.append(player.interval)
+        assert 0.8 * player.interval <= player.next_poll - clock.now <= 1.2 * player.interval
+    assert intervals == [120, 240, 480, 600, 600, 600]
+
+
+def test_no_poll_while_busy_or_out_of_budget(prefetcher):
+    prefetcher.register(BENCH_PUUID, "Bench#MOCK")
+    assert prefetcher.poll_due(is_busy=lambda: True) == 0
+    prefetcher.budget.max_requests = 0
+    assert prefetcher.poll_due() == 0
+
+
+def test_registrations_persist_and_are_capped(prefetcher):
+    prefetcher.max_players = 1
+    assert prefetcher.register("puuid-1", "A#1")
+    assert not prefetcher.register("puuid-1", "A#1")
+    with pytest.raises(ValueError):
+        prefetcher.register("puuid-2", "B#1")
+    reloaded = Prefetcher(prefetcher.client, prefetcher.budget, LobbyIndex(), path=prefetcher.path)
+    assert "puuid-1" in reloaded and len(reloaded) == 1
+    assert reloaded.unregister("puuid-1") and not reloaded.unregister("puuid-1")
+
+
+def test_invalid_registrations_are_skipped(tmp_path):
+    path = tmp_path / "prefetch.json"
+    path.write_text(
+        '[{"puuid": "puuid-1", "riot_id": "A#1", "added_by": "newer version"},'
+        ' {"riot_id": "no puuid"}, "not an entry", {"puuid": "puuid-2", "riot_id": "B#1", "next_poll": "soon"}]'
+    )
+    prefetcher = Prefetcher(None, None, LobbyIndex(), path=str(path))
+    assert "puuid-1" in prefetcher and len(prefetcher) == 1
+
+
+def test_failed_downloads_are_deferred(prefetcher):
+    prefetcher.budget.max_requests = 1000
+    fetch_match = prefetcher.client.fetch_match
+
+    def flaky_fetch(match_id, region_routing=None):
+        return None if match_id == "MOCK_11" else fetch_match(match_id, region_routing)
+
+    prefetcher.client.fetch_match = flaky_fetch
+    prefetcher.register(BENCH_PUUID, "Bench#MOCK")
+    prefetcher.poll_due()
+    player = prefetcher._players[BENCH_PUUID]
+    assert player.last_match_id == "MOCK_12"
+    assert player.deferred == ["MOCK_11"] and "MOCK_11" not in prefetcher.lobby_index
+
+    del prefetcher.client.fetch_match
+    prefetcher._clock.now = player.next_poll
+    prefetcher.poll_due()
+    assert player.deferred == [] and "MOCK_11" in prefetcher.lobby_index
@@ -0,0 +1,39 @@
+from lol_coach.lobby import build_lobby_records
+from lol_coach.prompt_compaction import PROMPT_METRICS, compact_games_data, estimate_tokens, summarize_games
+
+from .payloads import match_info
+
+
+def games(count):
+    """Return *count* records newest first; kills grow over time and every third game is on Zed."""
+    records = []
+    for n in range(count):
+        info = match_info()
+        player = info["participants"][2]
+        player.update(kills=n, championName="Zed" if n % 3 == 0 else "Ahri", win=n % 2 == 0)
+        records.append(build_lobby_records(f"EUW1_{n}", info)[player["puuid"]])
+    return records[::-1]
+
+
+def test_summary_aggregates_by_champion_and_trend():
+    summary = summarize_games(games(9))
+    assert summary["overall"]["games"] == 9
+    assert summary["overall"]["win_rate"] == round(5 / 9, 3)
+    assert summary["overall"]["kills"] == 4
+    by_champion = {row["champion"]: row for row in summary["by_champion"]}
+    assert (by_champion["Ahri"]["games"], by_champion["Zed"]["games"]) == (6, 3)
+    assert by_champion["Zed"]["kills"] == 3
+    assert [row["position"] for row in summary["by_role"]] == ["MIDDLE"]
+    # Games are read oldest first, so growing kills give a positive trend over the period.
+    assert summary["trend_over_period"]["kills"] == 8
+
+
+def test_compaction_fits_the_budget_whatever_the_game_count():
+    few, many = compact_games_data(games(5), token_budget=100_000), compact_games_data(games(60), 100_000)
+    assert abs(len(many) - len(few)) < len(few) * 0.2
+
+    budget = estimate_tokens(few) // 2
+    compacted = compact_games_data(games(5), token_budget=budget)
+    assert estimate_tokens(compacted) <= budget
+    # The lowest-priority metrics are dropped first.
+    assert PROMPT_METRICS[0] in compacted and PROMPT_METRICS[-1] not in compacted
@@ -0,0 +1,60 @@
+from lol_coach.rate_limit import RateLimiter, RateWindow, parse_rate_limit_header, parse_retry_after
+
+
+class FakeTime:
+    """Clock whose sleep() advances it instantly."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_parse_headers():
+    assert parse_rate_limit_header("20:1,100:120") == [(20, 1.0), (100, 120.0)]
+    assert parse_rate_limit_header("bad,5:10") == [(5, 10.0)]
+    assert parse_rate_limit_header(None) == []
+    assert parse_retry_after({"Retry-After": "7"}) == 7.0
+    assert parse_retry_after({}, default=2.0) == 2.0
+
+
+def test_window_slides():
+    window = RateWindow(2, 10)
+    window.record(0)
+    window.record(4)
+    assert window.wait_time(5) == 5
+    assert window.wait_time(10) == 0
+
+
+def test_acquire_respects_every_app_window():
+    time = FakeTime()
+    limiter = RateLimiter(app_limits=((3, 1.0), (5, 10.0)), clock=time.clock, sleep=time.sleep)
+    grants = []
+    for _ in range(7):
+        limiter.acquire("match-by-id")
+        grants.append(time.now)
+    assert grants[:3] == [0.0, 0.0, 0.0]
+    assert grants[3] == 1.0
+    # The 10-second window allows five requests, so the sixth waits for the first to leave it.
+    assert grants[5] == 10.0
+    for index, stamp in enumerate(grants):
+        assert sum(stamp - 10 < other <= stamp for other in grants[: index + 1]) <= 5
+
+
+def test_headers_and_429_update_limits():
+    time = FakeTime()
+    limiter = RateLimiter(app_limits=((100, 1.0),), clock=time.clock, sleep=time.sleep)
+    limiter.update_from_headers("match-by-id", {"X-Method-Rate-Limit": "1:5"})
+    limiter.acquire("match-by-id")
+    limiter.acquire("match-by-id")
+    assert time.now == 5.0
+    # Other methods are not held back by a method limit.
+    limiter.acquire("match-ids-by-puuid")
+    assert time.now == 5.0
+
+    assert limiter.penalize("x", {"Retry-After": "3", "X-Rate-Limit-Type": "application"}) == 3.0
+    assert limiter.acquire("match-ids-by-puuid") == 3.0
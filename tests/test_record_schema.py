@@ -0,0 +1,79 @@
+import zlib
+
+import pytest
+
+from lol_coach.match_processing import build_game_columns, build_game_record
+from lol_coach.record_schema import GAME_RECORD_COLUMNS
+
+from . import baseline_records
+
+REQUIRED = {
+    "championName": "Ahri",
+    "role": "SOLO",
+    "lane": "MIDDLE",
+    "win": True,
+    "kills": 7,
+    "deaths": 0,
+    "assists": 9,
+    "totalMinionsKilled": 180,
+    "neutralMinionsKilled": 12,
+    "totalDamageDealtToChampions": 24000,
+    "totalDamageTaken": 15000,
+    "totalHeal": 3000,
+    "goldEarned": 12500,
+    "visionScore": 22,
+    "wardsPlaced": 9,
+}
+
+
+class EveryKey(dict):
+    """Payload answering every key with its own value, so a field read from the wrong key shows up."""
+
+    def __init__(self, salt):
+        super().__init__()
+        self.salt = salt
+
+    def __bool__(self):
+        return True
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def get(self, key, default=None):
+        if key == "challenges":
+            return EveryKey("challenges")
+        # Non-integer values also exercise the rounding of every field.
+        return zlib.crc32(f"{self.salt}.{key}".encode()) % 100_000 + 0.123456
+
+
+def typed(record):
+    return [(name, type(value), value) for name, value in record.items()]
+
+
+@pytest.mark.parametrize(
+    "participant",
+    [EveryKey("participant"), REQUIRED, {**REQUIRED, "challenges": {"kda": 3.14159}}],
+    ids=["every-field", "required-only", "some-challenges"],
+)
+def test_compiled_extractor_matches_the_baseline(participant):
+    expected = baseline_records.build_game_record(participant, 1834)
+    record = build_game_record(participant, 1834)
+    # Same fields, in the same order, with the same values and types.
+    assert typed(record) == typed(expected)
+    assert tuple(record) == GAME_RECORD_COLUMNS
+
+
+def test_column_extractor_matches_the_records():
+    rows = [(EveryKey("participant"), 1834), (REQUIRED, 1200)]
+    columns = build_game_columns(rows)
+    assert tuple(columns) == GAME_RECORD_COLUMNS
+    records = [baseline_records.build_game_record(participant, duration) for participant, duration in rows]
+    assert columns == {name: [record[name] for record in records] for name in GAME_RECORD_COLUMNS}
+
+
+def test_missing_required_fields_raise_like_the_baseline():
+    participant = {key: value for key, value in REQUIRED.items() if key != "goldEarned"}
+    with pytest.raises(KeyError):
+        baseline_records.build_game_record(participant, 1834)
+    with pytest.raises(KeyError):
+        build_game_record(participant, 1834)
@@ -0,0 +1,65 @@
+import math
+
+import pytest
+
+from benchmarks.fixtures import synthetic_match
+from lol_coach.lobby import build_lobby_records
+from lol_coach.record_table import RecordTable
+
+
+@pytest.fixture(scope="module")
+def records():
+    return [
+        record
+        for seed in range(5)
+        for record in build_lobby_records(f"M{seed}", synthetic_match(seed)["info"]).values()
+    ]
+
+
+def same(value, expected):
+    if isinstance(expected, float) and math.isnan(expected):
+        return isinstance(value, float) and math.isnan(value)
+    return value == expected
+
+
+def test_rows_read_like_the_records(records):
+    table = RecordTable.from_records(records, capacity=4)
+    assert len(table) == len(records) == 50
+    for row, record in zip(table, records):
+        for name, value in record.items():
+            if value is not None and name in table.kinds:
+                assert same(row[name], value), name
+    assert table[-1]["match_id"] == "M4"
+    assert isinstance(table[0]["kills"], int)
+    with pytest.raises(KeyError):
+        table[0]["not_a_column"]
+    with pytest.raises(IndexError):
+        table[50]
+
+
+def test_slices_share_columns_without_changing_the_parent(records):
+    table = RecordTable.from_records(records)
+    head = table[:10]
+    assert len(head) == 10 and head.column("kills").base is not None
+    head.append(records[-1])
+    assert len(head) == 11 and len(table) == 50
+    assert table[10]["match_id"] == records[10]["match_id"]
+
+
+def test_iter_records_and_missing_values(records):
+    table = RecordTable.from_records(records)
+    assert [r["match_id"] for r in table.iter_records(batch_size=7)] == [r["match_id"] for r in records]
+    sparse = RecordTable.from_records([{"match_id": "M9"}])
+    row = sparse[0]
+    assert (row["kills"], row["champion"]) == (0, "")
+
+
+def test_arrow_matches_the_dict_path(records):
+    pytest.importorskip("pyarrow")
+    from lol_coach.columnar import record_table_to_arrow, records_to_table
+
+    from_table = record_table_to_arrow(RecordTable.from_records(records), "Bench_MOCK")
+    from_dicts = records_to_table(records, "Bench_MOCK")
+    assert from_table.schema == from_dicts.schema
+    assert from_table.column("champion").to_pylist() == from_dicts.column("champion").to_pylist()
+    assert from_table.column("date").to_pylist() == from_dicts.column("date").to_pylist()
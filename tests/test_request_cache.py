@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from lol_coach.request_cache import SingleFlight, TTLCache, match_set_digest
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    calls = 0
+
+    async def job():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "analysis"
+
+    async def main():
+        flight: SingleFlight[str] = SingleFlight()
+        results = await asyncio.gather(*(flight.run("key", job) for _ in range(5)))
+        assert "key" not in flight
+        return results
+
+    assert asyncio.run(main()) == ["analysis"] * 5
+    assert calls == 1
+
+
+def test_single_flight_shares_errors_and_survives_a_cancelled_caller():
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        flight: SingleFlight[str] = SingleFlight()
+        first = asyncio.ensure_future(flight.run("key", failing))
+        second = asyncio.ensure_future(flight.run("key", failing))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(RuntimeError):
+            await second
+
+    asyncio.run(main())
+
+
+def test_ttl_cache_expires_and_evicts():
+    now = [0.0]
+    cache: TTLCache[str] = TTLCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+    # "b" was the least recently used entry.
+    assert cache.get("b") is None and len(cache) == 2
+    now[0] = 10
+    assert cache.get("a") is None
+
+
+def test_match_set_digest_depends_on_order_and_content():
+    assert match_set_digest(["A", "B"]) == match_set_digest(["A", "B"])
+    assert match_set_digest(["A", "B"]) != match_set_digest(["B", "A"])
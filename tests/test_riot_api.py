@@ -0,0 +1,79 @@
+import pytest
+import requests
+
+from lol_coach.match_cache import MatchCache
+from lol_coach.rate_limit import RateLimiter
+from lol_coach.riot_api import RiotClient
+
+from .payloads import FakeResponse, FakeRiot
+from .test_rate_limit import FakeTime
+
+
+@pytest.fixture
+def client():
+    client = RiotClient("test-key", limiter=RateLimiter(app_limits=((1000, 1),)))
+    client._sessions["europe"] = FakeRiot()
+    yield client
+    client.close()
+
+
+def test_sessions_are_pooled_per_region():
+    with RiotClient("test-key", limiter=RateLimiter(), max_workers=4) as client:
+        session = client._session("europe")
+        assert client._session("europe") is session and client._session("asia") is not session
+        assert session.headers["X-Riot-Token"] == "test-key"
+        assert session.get_adapter("https://europe.api.riotgames.com")._pool_maxsize == 4
+    assert client._sessions == {}
+
+
+def test_get_puuid(client):
+    assert client.get_puuid("Bench", "MOCK") == "blue-MIDDLE"
+    with pytest.raises(requests.exceptions.RequestException):
+        client.get_puuid("Nobody", "MOCK")
+
+
+def test_match_ids_are_paged_and_stop_at_the_known_match(client):
+    match_ids = client._sessions["europe"].match_ids
+    assert client.get_match_ids("puuid", 120) == match_ids[:120]
+    assert len(client._sessions["europe"].urls) == 2
+    assert client.get_match_ids("puuid", 300, batch_size=100, stop_at="EUW1_140") == match_ids[:110]
+
+
+def test_match_infos_keep_input_order_and_fill_the_cache(client, tmp_path):
+    client.cache = MatchCache(str(tmp_path / "matches.sqlite3"))
+    match_ids = [f"EUW1_{n}" for n in range(1, 40)] + ["EUW1_404"]
+    assert [(match_id, info and info["gameDuration"]) for match_id, info in client.fetch_match_infos(match_ids)] == [
+        (match_id, 1200 + n) for n, match_id in enumerate(match_ids[:-1], 1)
+    ] + [("EUW1_404", None)]
+    requests_made = len(client._sessions["europe"].urls)
+    assert client.fetch_match_info("EUW1_7")["gameDuration"] == 1207
+    assert len(client._sessions["europe"].urls) == requests_made
+    client.cache.close()
+
+
+class ThrottlingSession:
+    """Answers 429 *throttled* times, then the match payload."""
+
+    def __init__(self, throttled):
+        self.throttled = throttled
+        self.calls = 0
+
+    def close(self):
+        pass
+
+    def get(self, url, timeout=None):
+        self.calls += 1
+        if self.calls <= self.throttled:
+            return FakeResponse(429, headers={"Retry-After": "5", "X-Rate-Limit-Type": "application"})
+        return FakeResponse(200, {"metadata": {}, "info": {"participants": []}})
+
+
+def test_rate_limited_match_is_waited_for_not_dropped():
+    fake_time = FakeTime()
+    client = RiotClient("test-key", limiter=RateLimiter(clock=fake_time.clock, sleep=fake_time.sleep), max_retries=2)
+    session = ThrottlingSession(throttled=7)
+    client._sessions["europe"] = session
+    # More 429s than max_retries: the request keeps waiting out Retry-After instead of giving up.
+    assert client.fetch_match("EUW1_1") == {"metadata": {}, "info": {"participants": []}}
+    assert session.calls == 8
+    assert fake_time.now >= 7 * 5
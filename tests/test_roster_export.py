@@ -0,0 +1,27 @@
+from lol_coach.export_service import collect_roster_records
+
+from .payloads import match_info
+
+
+class FakeClient:
+    """Serves the same ten-player lobby for every match and records which matches were fetched."""
+
+    def __init__(self):
+        self.fetched = []
+
+    def fetch_match_infos(self, match_ids):
+        for match_id in match_ids:
+            self.fetched.append(match_id)
+            yield match_id, None if match_id == "EUW1_404" else match_info()
+
+
+def test_shared_matches_are_fetched_once():
+    players = {"blue-MIDDLE": ["EUW1_3", "EUW1_2", "EUW1_1"], "red-TOP": ["EUW1_3", "EUW1_1", "EUW1_404"]}
+    unique_ids = list(dict.fromkeys(match_id for match_ids in players.values() for match_id in match_ids))
+    client = FakeClient()
+    records = collect_roster_records(unique_ids, list(players), client, processes=1)
+    assert client.fetched == ["EUW1_3", "EUW1_2", "EUW1_1", "EUW1_404"]
+    # Only the roster's records are kept, and a failed fetch yields none.
+    assert set(records) == {"EUW1_3", "EUW1_2", "EUW1_1"}
+    assert all(set(lobby) == {"blue-MIDDLE", "red-TOP"} for lobby in records.values())
+    assert records["EUW1_2"]["red-TOP"]["match_id"] == "EUW1_2"
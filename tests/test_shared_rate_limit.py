@@ -0,0 +1,72 @@
+import pytest
+
+from lol_coach.shared_rate_limit import SharedRateLimiter
+
+
+class FakeTime:
+    """Clock whose sleep() advances it instantly."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def limiters(tmp_path):
+    time = FakeTime()
+    path = str(tmp_path / "ratelimit.sqlite3")
+    opened = []
+
+    def open_limiter(priority):
+        limiter = SharedRateLimiter(
+            path, priority=priority, app_limits=((10, 10.0),), clock=time.clock, sleep=time.sleep
+        )
+        opened.append(limiter)
+        return limiter
+
+    yield time, open_limiter
+    for limiter in opened:
+        limiter.close()
+
+
+def test_processes_share_one_window(limiters):
+    time, open_limiter = limiters
+    first, second = open_limiter("batch"), open_limiter("batch")
+    for _ in range(5):
+        first.acquire("match-by-id")
+        second.acquire("match-by-id")
+    assert time.now == 1000.0
+    assert second.acquire("match-by-id") == 10.0
+
+
+def test_lower_priority_leaves_headroom_while_higher_is_active(limiters):
+    time, open_limiter = limiters
+    interactive, batch = open_limiter("interactive"), open_limiter("batch")
+    interactive.acquire("match-by-id")
+    for _ in range(7):
+        batch.acquire("match-by-id")
+    # Batch may only fill 80% of the window while /coach traffic is recent; interactive gets the rest.
+    interactive.acquire("match-by-id")
+    assert time.now == 1000.0
+    assert batch.acquire("match-by-id") == 10.0
+
+
+def test_learned_limits_and_blocks_are_shared(limiters):
+    time, open_limiter = limiters
+    first, second = open_limiter("batch"), open_limiter("batch")
+    first.update_from_headers("match-by-id", {"X-Method-Rate-Limit": "1:5"})
+    second.acquire("match-by-id")
+    assert second.acquire("match-by-id") == 5.0
+
+    first.penalize("match-by-id", {"Retry-After": "3", "X-Rate-Limit-Type": "application"})
+    assert second.acquire("match-ids-by-puuid") == 3.0
+
+
+def test_unknown_priority_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        SharedRateLimiter(str(tmp_path / "ratelimit.sqlite3"), priority="urgent")
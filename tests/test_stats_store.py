@@ -0,0 +1,58 @@
+import pytest
+
+from lol_coach.stats_store import DAY_MS, StatsStore, record_stream
+
+NOW = 1_700_000_000.0
+TODAY = int(NOW * 1000 // DAY_MS)
+
+
+def record(match_id, days_ago, champion="Jinx", win=True, kills=5):
+    return {
+        "match_id": match_id,
+        "game_start": (TODAY - days_ago) * DAY_MS,
+        "champion": champion,
+        "team_position": "BOTTOM",
+        "win": win,
+        "kills": kills,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StatsStore(str(tmp_path / "stats.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_duplicate_records_are_ignored(store):
+    assert store.add_records("p1", [record("M1", 0), record("M2", 1)], riot_id="Name#EUW") == 2
+    assert store.add_records("p1", [record("M2", 1), record("M3", 2)]) == 1
+    assert store.stats()["games"] == 3
+    assert store.resolve("name#euw") == "p1"
+
+
+def test_aggregates_per_scope(store):
+    store.add_records("p1", [record("M1", 0, kills=4), record("M2", 0, "Ashe", win=False, kills=8)])
+    [all_games] = store.aggregate("p1", TODAY, TODAY)
+    assert (all_games["games"], all_games["win_rate"], all_games["kills"]) == (2, 0.5, 6.0)
+    by_champion = {group["key"]: group for group in store.aggregate("p1", TODAY, TODAY, "champion")}
+    assert by_champion["Ashe"]["kills"] == 8.0
+    with pytest.raises(ValueError):
+        store.aggregate("p1", TODAY, TODAY, "patch")
+
+
+def test_compare_periods(store):
+    store.add_records(
+        "p1",
+        [record("M1", 1, kills=10), record("M2", 2, kills=6), record("M3", 10, win=False, kills=2)],
+    )
+    [entry] = store.compare_periods("p1", days=7, now=NOW)
+    assert entry["current"]["games"] == 2 and entry["previous"]["games"] == 1
+    assert entry["change"]["kills"] == 6.0
+    assert entry["change"]["win_rate"] == 1.0
+
+
+def test_record_stream_passes_records_through(store):
+    records = [record(f"M{i}", 0) for i in range(7)]
+    assert list(record_stream(store, "p1", records, batch_size=3)) == records
+    assert store.stats()["games"] == 7
@@ -0,0 +1,39 @@
+from lol_coach.text_utils import TextChunker, chunk_text
+
+
+def test_chunks_fit_the_limit_and_keep_lines_whole():
+    text = "\n".join(f"line {i} " + "word " * 20 for i in range(200))
+    chunks = chunk_text(text, limit=500)
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    assert "\n".join(chunks) == text
+
+
+def test_long_line_is_split_at_spaces():
+    chunks = chunk_text("word " * 1000, limit=100)
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert all(not chunk.startswith(" ") for chunk in chunks)
+    assert "".join(chunks).replace(" ", "") == "word" * 1000
+
+
+def test_blank_chunks_are_dropped():
+    assert chunk_text("\n" + "x" * 1899) == ["x" * 1899]
+    assert chunk_text("   \n\n  \n") == []
+    assert chunk_text("") == []
+
+
+def test_streamed_feed_matches_whole_text():
+    text = "".join(f"Paragraph {i}.\n" + "a b c " * 150 + "\n\n" for i in range(20))
+    chunker = TextChunker(limit=300)
+    streamed = []
+    for start in range(0, len(text), 7):
+        streamed.extend(chunker.feed(text[start : start + 7]))
+    streamed.extend(chunker.flush())
+    assert streamed == chunk_text(text, limit=300)
+    assert all(chunk.strip() and len(chunk) <= 300 for chunk in streamed)
+
+
+def test_feed_returns_chunks_as_soon_as_they_fill():
+    chunker = TextChunker(limit=20)
+    assert chunker.feed("0123456789\n") == []
+    assert chunker.feed("0123456789\n") == ["0123456789"]
+    assert chunker.flush() == ["0123456789"]
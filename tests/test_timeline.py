@@ -0,0 +1,69 @@
+import numpy as np
+
+from lol_coach.lobby import build_lobby_records
+from lol_coach.timeline import TimelineStore, open_timeline_store, parse_timeline
+
+from .payloads import lobby_participants, match_info
+
+
+def timeline_payload(minutes=16):
+    """Timeline where participant *i* has i * 100 gold, i * 50 XP and i CS more each minute."""
+    participants = lobby_participants()
+    frames = [
+        {
+            "timestamp": minute * 60_000,
+            "events": [{"type": "ITEM_PURCHASED"}],
+            "participantFrames": {
+                str(p["participantId"]): {
+                    "totalGold": minute * p["participantId"] * 100,
+                    "xp": minute * p["participantId"] * 50,
+                    "minionsKilled": minute * p["participantId"],
+                    "jungleMinionsKilled": 0,
+                    "position": {"x": p["participantId"], "y": minute},
+                }
+                for p in participants
+            },
+        }
+        for minute in range(minutes)
+    ]
+    # Listed out of order: rows follow participantId, not the payload order.
+    ids = [{"participantId": p["participantId"], "puuid": p["puuid"]} for p in reversed(participants)]
+    return {"metadata": {}, "info": {"frames": frames, "participants": ids}}
+
+
+def test_parse_keeps_per_minute_arrays():
+    timeline = parse_timeline(timeline_payload())
+    assert timeline.puuids[0] == "blue-TOP" and timeline.minutes == 16
+    assert timeline.frames.shape == (10, 16, 5)
+    assert timeline.series("blue-MIDDLE", "gold")[10] == 10 * 3 * 100
+    assert timeline.series("red-TOP", "y").tolist() == list(range(16))
+
+
+def test_laning_diffs_at_10_and_15():
+    timeline = parse_timeline(timeline_payload())
+    # blue-MIDDLE is participant 3, red-MIDDLE participant 8.
+    diffs = timeline.laning_diffs("blue-MIDDLE", "red-MIDDLE")
+    assert diffs["gold_diff_at_10"] == 10 * (3 - 8) * 100
+    assert diffs["cs_diff_at_15"] == 15 * (3 - 8)
+    assert set(timeline.laning_diffs("blue-MIDDLE", "nobody").values()) == {0}
+    # Games ending before 15 minutes only have 10-minute diffs.
+    short = parse_timeline(timeline_payload(minutes=12)).laning_diffs("blue-MIDDLE", "red-MIDDLE")
+    assert short["xp_diff_at_10"] == 10 * (3 - 8) * 50 and short["xp_diff_at_15"] == 0
+
+
+def test_lobby_records_get_laning_diffs():
+    lobby = build_lobby_records("EUW1_1", match_info(), parse_timeline(timeline_payload()))
+    assert lobby["red-MIDDLE"]["gold_diff_at_10"] == 10 * (8 - 3) * 100
+    assert build_lobby_records("EUW1_1", match_info())["red-MIDDLE"]["gold_diff_at_10"] == 0
+
+
+def test_store_round_trip(tmp_path):
+    store = TimelineStore(str(tmp_path / "timelines"))
+    timeline = parse_timeline(timeline_payload())
+    store.put("EUW1_1", timeline)
+    stored = store.get("EUW1_1")
+    assert stored.puuids == timeline.puuids and np.array_equal(stored.frames, timeline.frames)
+    assert store.get("EUW1_2") is None
+    (tmp_path / "timelines" / "EUW1_3.npz").write_bytes(b"not an archive")
+    assert store.get("EUW1_3") is None
+    assert open_timeline_store("") is None